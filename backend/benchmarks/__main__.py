@@ -0,0 +1,139 @@
+"""Reproducible API benchmarks.
+
+    python -m backend.benchmarks run --output results.json
+    python -m backend.benchmarks compare results.json
+    python -m backend.benchmarks startup
+
+`run` builds a throwaway SQLite database seeded with synthetic data
+(`--users` x `--years`, fixed `--seed`), then times every analytics
+endpoint, transaction listing, CSV upload, a Plaid sync against the
+fake transport, and single-row against batch transaction writes.
+`compare` checks a results file against the committed baseline and
+exits 1 when any benchmark regressed past its threshold.
+`startup` times a cold `import backend.main` and exits 1 when it is over
+`--budget` seconds or pulls in a module that should load lazily.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+from .harness import BenchmarkSuite, compare, print_comparison, write_results
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+BENCH_EMAIL = "bench@example.com"
+BENCH_PASSWORD = "bench-password"
+STARTUP_BUDGET = float(os.getenv("STARTUP_BUDGET", "1.5"))
+
+def run(args: argparse.Namespace) -> int:
+    workdir = tempfile.mkdtemp(prefix="finance-bench-")
+    # Configure the app before it is imported: a private database, the fake
+    # Plaid transport, and no response cache so repeated requests do real work
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["PLAID_ENV"] = "fake"
+    os.environ["RESPONSE_CACHE_SIZE"] = "0"
+    os.environ["JOB_FILES_DIR"] = os.path.join(workdir, "job_files")
+
+    from fastapi.testclient import TestClient
+    from backend.database import Base, SessionLocal, engine
+    from backend.main import app, hash_password
+    from backend.models import User
+    from .data import generate_transactions, seed_database
+    from .suites import SUITES, BenchContext, run_suites
+
+    config = {
+        "users": args.users,
+        "years": args.years,
+        "seed": args.seed,
+        "rounds": args.rounds,
+        "upload_rows": args.upload_rows,
+        "plaid_transactions": args.plaid_transactions
+    }
+    try:
+        Base.metadata.create_all(bind=engine)
+        db = SessionLocal()
+        try:
+            user = User(email=BENCH_EMAIL, password_hash=hash_password(BENCH_PASSWORD))
+            db.add(user)
+            db.flush()
+            # The benchmark user is one of the generated users; the rest are
+            # other tenants sharing the tables
+            user_ids = [user.id] + list(range(user.id + 1000, user.id + 1000 + args.users - 1))
+            seeded = seed_database(db, generate_transactions(args.users, args.years, seed=args.seed, user_ids=user_ids))
+            user_id = user.id
+        finally:
+            db.close()
+        config["transactions"] = seeded
+        print(f"Seeded {seeded} transactions for {args.users} users over {args.years} years", flush=True)
+
+        suite = BenchmarkSuite(rounds=args.rounds, warmup=args.warmup, only=args.only)
+        with TestClient(app) as client:
+            token = client.post("/api/auth/login", data={"username": BENCH_EMAIL, "password": BENCH_PASSWORD}).json()["access_token"]
+            ctx = BenchContext(client, {"Authorization": f"Bearer {token}"}, user_id, workdir, config)
+            run_suites(ctx, suite, args.suites or list(SUITES))
+
+        if args.output:
+            write_results(args.output, suite.results, config)
+            print(f"Results written to {args.output}")
+    finally:
+        engine.dispose()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+def compare_results(args: argparse.Namespace) -> int:
+    with open(args.results) as handle:
+        results = json.load(handle)
+    with open(args.baseline) as handle:
+        baseline = json.load(handle)
+    if results.get("config", {}) != baseline.get("config", {}):
+        print("warning: results and baseline were run with different configs", file=sys.stderr)
+
+    rows = compare(results, baseline, threshold=args.threshold, min_delta=args.min_delta)
+    print_comparison(rows)
+    regressions = [row["name"] for row in rows if row["status"] == "REGRESSION"]
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed: {', '.join(regressions)}")
+        return 1
+    return 0
+
+def startup(args: argparse.Namespace) -> int:
+    from .startup import check_startup
+
+    return check_startup(args.rounds, args.budget)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m backend.benchmarks", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="seed a scratch database and time the API")
+    run_parser.add_argument("--users", type=int, default=5)
+    run_parser.add_argument("--years", type=float, default=3)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--rounds", type=int, default=5)
+    run_parser.add_argument("--warmup", type=int, default=1)
+    run_parser.add_argument("--upload-rows", type=int, default=5000)
+    run_parser.add_argument("--plaid-transactions", type=int, default=1000)
+    run_parser.add_argument("--suites", nargs="+", choices=["analytics", "listing", "upload", "plaid", "writes"])
+    run_parser.add_argument("--only", nargs="+", help="only run benchmarks whose name contains one of these")
+    run_parser.add_argument("--output", "-o", help="write results JSON here")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="check results against the baseline")
+    compare_parser.add_argument("results")
+    compare_parser.add_argument("--baseline", default=BASELINE_PATH)
+    compare_parser.add_argument("--threshold", type=float, default=0.25, help="allowed median slowdown as a fraction")
+    compare_parser.add_argument("--min-delta", type=float, default=0.002, help="ignore slowdowns smaller than this many seconds")
+    compare_parser.set_defaults(handler=compare_results)
+
+    startup_parser = commands.add_parser("startup", help="check cold import time against a budget")
+    startup_parser.add_argument("--rounds", type=int, default=5)
+    startup_parser.add_argument("--budget", type=float, default=STARTUP_BUDGET, help="median import time limit in seconds")
+    startup_parser.set_defaults(handler=startup)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""Seeded synthetic transactions for benchmarks.
+
+Every user gets a salary, rent and utilities on fixed days each month plus
+a random stream of everyday spending (food, transport, entertainment,
+health, shopping), using the same categories as transactions.csv. The
+same seed always produces the same rows.
+"""
+import csv
+import random
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+# category -> (expected occurrences per month, median amount, spread)
+EVERYDAY_SPENDING = {
+    "Food": (30, 14.0, 0.6),
+    "Transport": (18, 6.0, 0.7),
+    "Entertainment": (6, 25.0, 0.8),
+    "Health": (2, 40.0, 0.9),
+    "Shopping": (5, 45.0, 0.9),
+}
+
+DESCRIPTIONS = {
+    "Income": ["Salary", "Bonus", "Refund"],
+    "Rent": ["Monthly rent"],
+    "Utilities": ["Electricity", "Internet", "Water", "Phone"],
+    "Food": ["Groceries", "Lunch", "Coffee", "Dinner", "Takeaway"],
+    "Transport": ["Bus", "Train", "Fuel", "Taxi", "Parking"],
+    "Entertainment": ["Cinema", "Concert", "Streaming", "Books"],
+    "Health": ["Pharmacy", "Dentist", "Gym"],
+    "Shopping": ["Clothes", "Electronics", "Home"],
+}
+
+def _months(start: date, end: date) -> Iterator[date]:
+    month = start.replace(day=1)
+    while month <= end:
+        yield month
+        month = date(month.year + 1, 1, 1) if month.month == 12 else date(month.year, month.month + 1, 1)
+
+def _month_end(month: date) -> date:
+    following = date(month.year + 1, 1, 1) if month.month == 12 else date(month.year, month.month + 1, 1)
+    return following - timedelta(days=1)
+
+def generate_transactions(
+    users: int,
+    years: float,
+    seed: int = 0,
+    end: date = date(2025, 12, 31),
+    user_ids: Optional[List[int]] = None
+) -> Iterator[Dict[str, Any]]:
+    """Yield transaction rows (user_id, date, category, amount, description)"""
+    start = end - timedelta(days=int(round(365.25 * years)) - 1)
+    user_ids = user_ids or list(range(1, users + 1))
+    for user_id in user_ids[:users]:
+        rng = random.Random(f"{seed}:{user_id}")
+        salary = round(rng.uniform(2200, 6500), -1)
+        rent = round(salary * rng.uniform(0.25, 0.4), -1)
+
+        for month in _months(start, end):
+            last_day = _month_end(month)
+            fixed = [
+                (month, "Income", salary, "Salary"),
+                (month, "Rent", rent, "Monthly rent"),
+                (month.replace(day=min(15, last_day.day)), "Utilities", round(rng.uniform(60, 220), 2), None),
+            ]
+            if rng.random() < 0.1:
+                fixed.append((month.replace(day=rng.randint(1, last_day.day)), "Income", round(rng.uniform(50, 800), 2), None))
+            for day, category, amount, description in fixed:
+                if start <= day <= end:
+                    yield {
+                        "user_id": user_id,
+                        "date": day,
+                        "category": category,
+                        "amount": amount,
+                        "description": description or rng.choice(DESCRIPTIONS[category])
+                    }
+
+            for category, (per_month, median, spread) in EVERYDAY_SPENDING.items():
+                count = max(0, int(rng.gauss(per_month, per_month ** 0.5)))
+                for _ in range(count):
+                    day = month + timedelta(days=rng.randrange(last_day.day))
+                    if not start <= day <= end:
+                        continue
+                    yield {
+                        "user_id": user_id,
+                        "date": day,
+                        "category": category,
+                        "amount": round(max(0.5, rng.lognormvariate(0, spread) * median), 2),
+                        "description": rng.choice(DESCRIPTIONS[category])
+                    }
+
+def write_csv(path: str, rows: Iterator[Dict[str, Any]]) -> int:
+    """Write rows in the upload CSV format; returns the row count"""
+    count = 0
+    with open(path, "w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["Date", "Category", "Description", "Amount"])
+        for row in rows:
+            writer.writerow([row["date"].isoformat(), row["category"], row["description"], row["amount"]])
+            count += 1
+    return count
+
+def seed_database(db: Any, rows: Iterator[Dict[str, Any]], batch_size: int = 20000) -> int:
+    """Bulk insert generated rows (amounts become cents, categories ids) and rebuild the rollups and category stats; commits"""
+    from sqlalchemy import insert
+    from backend.models import Transaction
+    from backend.schemas import to_cents
+    from backend.services.anomaly_service import AnomalyService
+    from backend.services.category_dictionary import category_dictionary
+    from backend.services.rollup_service import RollupService
+
+    # Every generated category has descriptions
+    category_ids = category_dictionary.ids(db, DESCRIPTIONS, create=True)
+    count = 0
+    batch: List[Dict[str, Any]] = []
+    for row in rows:
+        row = dict(row, amount_cents=to_cents(row["amount"]), category_id=category_ids[row["category"]])
+        del row["amount"], row["category"]
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.execute(insert(Transaction), batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        db.execute(insert(Transaction), batch)
+        count += len(batch)
+    RollupService().rebuild(db)
+    AnomalyService().rebuild(db)
+    db.commit()
+    return count
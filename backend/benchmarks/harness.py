@@ -0,0 +1,129 @@
+"""Minimal pytest-benchmark style timing harness and baseline comparison."""
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+class BenchmarkSuite:
+    """Times named callables over several rounds after warm-up runs.
+
+    `setup` runs before every round (warm-ups included) and is not timed;
+    its return value is passed to the benchmarked function.
+    """
+
+    def __init__(self, rounds: int = 5, warmup: int = 1, only: Optional[List[str]] = None):
+        self.rounds = rounds
+        self.warmup = warmup
+        self.only = only
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    def bench(
+        self,
+        group: str,
+        name: str,
+        fn: Callable[..., Any],
+        setup: Optional[Callable[[], Any]] = None,
+        rounds: Optional[int] = None,
+        warmup: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        full_name = f"{group}/{name}"
+        if self.only and not any(pattern in full_name for pattern in self.only):
+            return None
+        rounds = rounds or self.rounds
+        warmup = self.warmup if warmup is None else warmup
+
+        timings = []
+        for index in range(warmup + rounds):
+            argument = setup() if setup else None
+            started = time.perf_counter()
+            if setup:
+                fn(argument)
+            else:
+                fn()
+            elapsed = time.perf_counter() - started
+            if index >= warmup:
+                timings.append(elapsed)
+
+        stats = summarize(timings)
+        stats["group"] = group
+        self.results[full_name] = stats
+        print(f"  {full_name:<45} median {stats['median'] * 1000:9.2f} ms   p95 {stats['p95'] * 1000:9.2f} ms", flush=True)
+        return stats
+
+def summarize(timings: List[float]) -> Dict[str, Any]:
+    ordered = sorted(timings)
+    return {
+        "rounds": len(ordered),
+        "min": ordered[0],
+        "max": ordered[-1],
+        "mean": statistics.fmean(ordered),
+        "median": statistics.median(ordered),
+        "stddev": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        "p95": ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    }
+
+def write_results(path: str, benchmarks: Dict[str, Dict[str, Any]], config: Dict[str, Any]) -> None:
+    document = {
+        "version": 1,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.machine()
+        },
+        "config": config,
+        "benchmarks": benchmarks
+    }
+    with open(path, "w") as handle:
+        json.dump(document, handle, indent=2, sort_keys=True)
+        handle.write("\n")
+
+def compare(
+    results: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = 0.25,
+    min_delta: float = 0.002
+) -> List[Dict[str, Any]]:
+    """Compare medians against the baseline.
+
+    A benchmark regresses when its median grows by more than `threshold`
+    (a fraction; per-benchmark overrides live in the baseline's
+    "thresholds") and by more than `min_delta` seconds, so sub-millisecond
+    jitter doesn't fail the comparison. Returns one row per benchmark.
+    """
+    overrides = baseline.get("thresholds", {})
+    rows = []
+    for name, expected in sorted(baseline.get("benchmarks", {}).items()):
+        actual = results.get("benchmarks", {}).get(name)
+        if actual is None:
+            rows.append({"name": name, "status": "missing"})
+            continue
+        limit = overrides.get(name, threshold)
+        change = actual["median"] / expected["median"] - 1 if expected["median"] else 0.0
+        regressed = change > limit and actual["median"] - expected["median"] > min_delta
+        rows.append({
+            "name": name,
+            "baseline": expected["median"],
+            "current": actual["median"],
+            "change": change,
+            "threshold": limit,
+            "status": "REGRESSION" if regressed else "ok"
+        })
+    for name in sorted(set(results.get("benchmarks", {})) - set(baseline.get("benchmarks", {}))):
+        rows.append({"name": name, "status": "new"})
+    return rows
+
+def print_comparison(rows: List[Dict[str, Any]], out=sys.stdout) -> None:
+    print(f"{'benchmark':<45}{'baseline ms':>13}{'current ms':>13}{'change':>9}  status", file=out)
+    for row in rows:
+        if "current" not in row:
+            print(f"{row['name']:<45}{'':>13}{'':>13}{'':>9}  {row['status']}", file=out)
+            continue
+        print(
+            f"{row['name']:<45}{row['baseline'] * 1000:>13.2f}{row['current'] * 1000:>13.2f}"
+            f"{row['change'] * 100:>8.1f}%  {row['status']}",
+            file=out
+        )
@@ -0,0 +1,130 @@
+"""Latency under mixed load.
+
+Fires concurrent analytics and listing requests at the app in-process while
+probing cheap endpoints, and reports p50/p99 latency per route. Handlers
+that block the event loop show up as inflated /health latency.
+
+Usage:
+    python -m backend.benchmarks.mixed_load [--rows N] [--concurrency C] [--seconds S]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+CATEGORIES = ["Food", "Rent", "Transport", "Utilities", "Entertainment", "Health", "Shopping", "Travel"]
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def seed(rows: int, user_id: int) -> None:
+    from sqlalchemy import insert
+    from backend.database import SessionLocal
+    from backend.models import Transaction
+    from backend.services.anomaly_service import AnomalyService
+    from backend.services.category_dictionary import category_dictionary
+    from backend.services.rollup_service import RollupService
+
+    rng = random.Random(42)
+    start = date(2022, 1, 1)
+    db = SessionLocal()
+    try:
+        category_ids = category_dictionary.ids(db, CATEGORIES, create=True)
+        records = [{
+            "user_id": user_id,
+            "date": start + timedelta(days=rng.randrange(3 * 365)),
+            "category_id": category_ids[rng.choice(CATEGORIES)],
+            "amount_cents": round(rng.uniform(1, 500) * 100),
+            "description": None
+        } for _ in range(rows)]
+        db.execute(insert(Transaction), records)
+        RollupService().rebuild(db, user_id)
+        AnomalyService().rebuild(db, user_id)
+        db.commit()
+    finally:
+        db.close()
+
+async def run(rows: int, concurrency: int, seconds: float) -> dict:
+    import httpx
+    from jose import jwt
+    from backend.database import Base, engine
+    from backend.main import app
+
+    Base.metadata.create_all(bind=engine)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.post("/api/auth/register", json={
+            "email": "bench@example.com", "password": "benchmark"
+        })
+        response.raise_for_status()
+        token = response.json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        user_id = int(jwt.get_unverified_claims(token)["sub"])
+        seed(rows, user_id)
+
+        routes = {
+            "dashboard": "/api/analytics/dashboard",
+            "chart-data": "/api/analytics/chart-data?chart_type=area",
+            "transactions": "/api/transactions?limit=100",
+            "health": "/health"
+        }
+        latencies = {name: [] for name in routes}
+        deadline = time.perf_counter() + seconds
+
+        async def worker(names):
+            while time.perf_counter() < deadline:
+                for name in names:
+                    started = time.perf_counter()
+                    result = await client.get(routes[name], headers=headers)
+                    latencies[name].append((time.perf_counter() - started) * 1000)
+                    if result.status_code >= 400:
+                        raise RuntimeError(f"{routes[name]} returned {result.status_code}")
+
+        async def prober():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                await client.get(routes["health"])
+                latencies["health"].append((time.perf_counter() - started) * 1000)
+                await asyncio.sleep(0.01)
+
+        heavy = [worker(["dashboard", "chart-data", "transactions"]) for _ in range(concurrency)]
+        await asyncio.gather(prober(), *heavy)
+
+    return {
+        name: {
+            "requests": len(values),
+            "p50_ms": round(percentile(values, 50), 2) if values else None,
+            "p99_ms": round(percentile(values, 99), 2) if values else None
+        }
+        for name, values in latencies.items()
+    }
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m backend.benchmarks.mixed_load")
+    parser.add_argument("--rows", type=int, default=50000, help="Synthetic transactions to seed")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent heavy clients")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Duration of the run")
+    args = parser.parse_args(argv)
+
+    # Benchmark against a throwaway database with response caching off so
+    # every request does real work
+    workdir = tempfile.mkdtemp(prefix="finance-bench-")
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    os.environ.setdefault("RESPONSE_CACHE_SIZE", "0")
+
+    results = asyncio.run(run(args.rows, args.concurrency, args.seconds))
+    print(f"{'route':<14}{'requests':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, stats in results.items():
+        print(f"{name:<14}{stats['requests']:>10}{stats['p50_ms']!s:>10}{stats['p99_ms']!s:>10}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""Cold import time of the API against a budget.
+
+Each round imports backend.main in a fresh interpreter, the way a worker
+boots or a test run collects, and reports how long it took and whether
+any module that should load lazily (pandas, numpy, the Plaid SDK) came
+in with it.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Any, Dict, List
+
+# Only needed by CSV import, chart data and Plaid calls; never at import time
+LAZY_MODULES = ("pandas", "numpy", "plaid", "uvicorn")
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import backend.main
+elapsed = time.perf_counter() - started
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (LAZY_MODULES,)
+
+def measure_import(rounds: int = 5) -> Dict[str, Any]:
+    """Import backend.main in `rounds` fresh interpreters"""
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    samples: List[float] = []
+    loaded: List[str] = []
+    with tempfile.TemporaryDirectory(prefix="finance-startup-") as workdir:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'startup.db')}")
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+        for _ in range(rounds):
+            output = subprocess.run(
+                [sys.executable, "-c", PROBE], cwd=workdir, env=env, capture_output=True, text=True, check=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            samples.append(result["seconds"])
+            loaded = sorted(set(loaded) | set(result["loaded"]))
+    return {
+        "rounds": rounds,
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "max": max(samples),
+        "lazy_modules_loaded": loaded
+    }
+
+def check_startup(rounds: int, budget: float) -> int:
+    result = measure_import(rounds)
+    print(f"import backend.main: median {result['median'] * 1000:.0f} ms "
+          f"(min {result['min'] * 1000:.0f}, max {result['max'] * 1000:.0f}) over {rounds} runs, budget {budget * 1000:.0f} ms")
+    failed = False
+    if result["lazy_modules_loaded"]:
+        print(f"Imported at startup but should load lazily: {', '.join(result['lazy_modules_loaded'])}")
+        failed = True
+    if result["median"] > budget:
+        print("Import time is over budget")
+        failed = True
+    return 1 if failed else 0
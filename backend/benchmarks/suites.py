@@ -0,0 +1,159 @@
+"""Benchmark suites for the HTTP API, run in-process through TestClient.
+
+Each suite takes a BenchContext (client, auth headers and a scratch
+directory against a seeded database) and a BenchmarkSuite to record into.
+"""
+import itertools
+import os
+import time
+from typing import Any, Dict, List
+
+from .data import generate_transactions, write_csv
+from .harness import BenchmarkSuite
+
+ANALYTICS_ENDPOINTS = ["metrics", "monthly-stats", "daily-averages", "percentage-changes", "trends", "dashboard", "anomalies"]
+CHART_TYPES = ["bar", "line", "area", "trend", "pie", "comparison"]
+WRITE_ROWS = 100
+
+class BenchContext:
+    def __init__(self, client: Any, headers: Dict[str, str], user_id: int, workdir: str, config: Dict[str, Any]):
+        self.client = client
+        self.headers = headers
+        self.user_id = user_id
+        self.workdir = workdir
+        self.config = config
+        self._counter = itertools.count(1)
+
+    def get(self, path: str, **params: Any) -> Dict[str, Any]:
+        response = self.client.get(path, params=params or None, headers=self.headers)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {path} returned {response.status_code}: {response.text[:200]}")
+        return response.json()
+
+    def post(self, path: str, **kwargs: Any) -> Dict[str, Any]:
+        return self.request("POST", path, **kwargs)
+
+    def request(self, method: str, path: str, **kwargs: Any) -> Dict[str, Any]:
+        response = self.client.request(method, path, headers=self.headers, **kwargs)
+        if response.status_code >= 300:
+            raise RuntimeError(f"{method} {path} returned {response.status_code}: {response.text[:200]}")
+        return response.json()
+
+    def wait_for_job(self, job_id: int, timeout: float = 300.0) -> Dict[str, Any]:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            job = self.get(f"/api/jobs/{job_id}")
+            if job["status"] == "succeeded":
+                return job
+            if job["status"] == "failed":
+                raise RuntimeError(f"job {job_id} failed: {job['error']}")
+            time.sleep(0.005)
+        raise TimeoutError(f"job {job_id} did not finish in {timeout}s")
+
+    def unique(self) -> int:
+        return next(self._counter)
+
+def analytics_suite(ctx: BenchContext, suite: BenchmarkSuite) -> None:
+    """Every /api/analytics/* endpoint over the full history, plus a filtered year"""
+    for endpoint in ANALYTICS_ENDPOINTS:
+        suite.bench("analytics", endpoint, lambda endpoint=endpoint: ctx.get(f"/api/analytics/{endpoint}"))
+    suite.bench("analytics", "metrics-year-food", lambda: ctx.get(
+        "/api/analytics/metrics", start_date="2025-01-01", end_date="2025-12-31", categories="Food,Transport"
+    ))
+    for chart_type in CHART_TYPES:
+        suite.bench("analytics", f"chart-{chart_type}", lambda chart_type=chart_type: ctx.get(
+            "/api/analytics/chart-data", chart_type=chart_type
+        ))
+    suite.bench("analytics", "cache-stats", lambda: ctx.get("/api/analytics/cache-stats"))
+
+def listing_suite(ctx: BenchContext, suite: BenchmarkSuite) -> None:
+    """First page, a deep page reached by cursor and a filtered page of /api/transactions, plus a search"""
+    suite.bench("listing", "first-page", lambda: ctx.get("/api/transactions", limit=100))
+
+    # Walk up to 10,000 rows in to find a cursor deep in the history
+    cursor = None
+    for _ in range(10):
+        params = {"limit": 1000, "cursor": cursor} if cursor else {"limit": 1000}
+        next_cursor = ctx.get("/api/transactions", **params)["next_cursor"]
+        if next_cursor is None:
+            break
+        cursor = next_cursor
+    if cursor:
+        suite.bench("listing", "deep-page", lambda: ctx.get("/api/transactions", limit=100, cursor=cursor))
+    suite.bench("listing", "filtered-page", lambda: ctx.get(
+        "/api/transactions", limit=100, start_date="2025-01-01", end_date="2025-06-30", categories="Food,Health"
+    ))
+    suite.bench("listing", "search-page", lambda: ctx.get("/api/transactions/search", q="coffee", limit=100))
+
+def upload_suite(ctx: BenchContext, suite: BenchmarkSuite) -> None:
+    """CSV upload through the background job, from POST until the job succeeds"""
+    rows = ctx.config["upload_rows"]
+    path = os.path.join(ctx.workdir, "upload.csv")
+    generated = itertools.islice(generate_transactions(1, 10, seed=ctx.config["seed"] + 1), rows)
+    write_csv(path, generated)
+
+    def upload() -> None:
+        with open(path, "rb") as handle:
+            # Upload into a fresh user id each round so the benchmark user's data is unchanged
+            job = ctx.post("/api/upload-csv", files={"file": ("upload.csv", handle, "text/csv")},
+                           data={"user_id": str(100000 + ctx.unique())})
+        ctx.wait_for_job(job["job_id"])
+
+    suite.bench("upload", f"csv-{rows}-rows", upload)
+
+def plaid_suite(ctx: BenchContext, suite: BenchmarkSuite) -> None:
+    """Link a new fake Plaid item and run a full initial sync through the job runner"""
+    from backend.services.plaid_transport import get_plaid_transport
+
+    transport = get_plaid_transport()
+    transport.history_size = ctx.config["plaid_transactions"]
+
+    def sync() -> None:
+        ctx.post("/api/plaid/exchange", json={"public_token": f"public-bench-{ctx.unique()}"})
+        job = ctx.post("/api/plaid/sync")
+        ctx.wait_for_job(job["job_id"])
+
+    suite.bench("plaid", f"sync-{transport.history_size}-transactions", sync)
+
+def writes_suite(ctx: BenchContext, suite: BenchmarkSuite) -> None:
+    """Create, update and delete WRITE_ROWS transactions one request each, then as three batch requests"""
+    rows = [
+        {"date": f"2025-06-{day % 28 + 1:02d}", "category": "Food", "amount": 12.5, "description": f"Bench lunch {day}"}
+        for day in range(WRITE_ROWS)
+    ]
+
+    def single() -> None:
+        ids = [ctx.post("/api/transactions", json=row)["id"] for row in rows]
+        for transaction_id in ids:
+            ctx.request("PUT", f"/api/transactions/{transaction_id}", json={"amount": 13.75})
+        for transaction_id in ids:
+            ctx.request("DELETE", f"/api/transactions/{transaction_id}")
+
+    def batch() -> None:
+        created = ctx.post("/api/transactions/batch", json={
+            "operations": [{"op": "create", "transaction": row} for row in rows]
+        })["results"]
+        ids = [result["id"] for result in created]
+        ctx.post("/api/transactions/batch", json={
+            "operations": [{"op": "update", "id": transaction_id, "transaction": {"amount": 13.75}} for transaction_id in ids]
+        })
+        ctx.post("/api/transactions/batch", json={
+            "operations": [{"op": "delete", "id": transaction_id} for transaction_id in ids]
+        })
+
+    # Each round leaves the benchmark user's data as it found it
+    suite.bench("writes", f"single-{WRITE_ROWS}-rows", single)
+    suite.bench("writes", f"batch-{WRITE_ROWS}-rows", batch)
+
+SUITES = {
+    "analytics": analytics_suite,
+    "listing": listing_suite,
+    "upload": upload_suite,
+    "plaid": plaid_suite,
+    "writes": writes_suite,
+}
+
+def run_suites(ctx: BenchContext, suite: BenchmarkSuite, names: List[str]) -> None:
+    for name in names:
+        print(f"{name}:", flush=True)
+        SUITES[name](ctx, suite)
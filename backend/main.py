@@ -1,35 +1,38 @@
-from fastapi import FastAPI, HTTPException, Depends, status, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, Depends, status, UploadFile, File, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
-from typing import List, Optional
-import uvicorn
-from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Awaitable, Callable, List, Optional
+from datetime import datetime, timedelta, timezone
 import os
+import shutil
+import tempfile
 from dotenv import load_dotenv
 
-from backend.database import get_db, engine, Base
-from backend.models import Transaction, User
-from backend.schemas import TransactionCreate, TransactionUpdate, TransactionResponse, MetricsResponse, UserCreate, UserLogin, TokenResponse
+from backend.database import get_db, get_async_db, engine, async_engine, SessionLocal
+from backend.metrics import MetricsMiddleware, instrument_engine, render_metrics
+from backend.models import Job, Transaction, User
+from backend.schemas import TransactionCreate, TransactionUpdate, TransactionResponse, TransactionPage, TransactionBatchRequest, TransactionBatchResponse, MetricsResponse, DashboardResponse, AnomaliesResponse, UserCreate, UserLogin, TokenResponse, JobCreatedResponse, JobResponse
 from backend.services.transaction_service import TransactionService
-from backend.services.analytics_service import AnalyticsService
-import plaid
-from plaid.api import plaid_api
-from plaid.model.products import Products
-from plaid.model.country_code import CountryCode
-from plaid.model.link_token_create_request import LinkTokenCreateRequest
-from plaid.model.link_token_create_request_user import LinkTokenCreateRequestUser
-from plaid.model.item_public_token_exchange_request import ItemPublicTokenExchangeRequest
-from plaid.model.transactions_sync_request import TransactionsSyncRequest
-import pandas as pd
+from backend.services.analytics_service import AnalyticsService, GRANULARITIES
+from backend.services.anomaly_service import AnomalyService
+from backend.services.import_service import ImportService, CSVImportError, MAX_REPORTED_ERRORS
+from backend.services.job_runner import JobRunner, JobQueueFull, LeaseLost
+from backend.services.plaid_sync_service import PlaidSyncService
+from backend.services.plaid_transport import PlaidNotConfigured, get_plaid_transport
+from backend.services.analytics_cache import analytics_cache
+from backend.services.response_cache import response_cache, get_data_version, make_etag
+from backend.services.user_cache import user_cache
 
 # Load environment variables
 load_dotenv()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
 # Initialize FastAPI app
 app = FastAPI(
     title="Personal Finance Tracker API",
@@ -48,6 +51,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency and DB query metrics, served at /metrics
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+app.add_middleware(MetricsMiddleware)
+
 # Security
 security = HTTPBearer()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
@@ -55,75 +63,22 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 # Initialize services
 transaction_service = TransactionService()
 analytics_service = AnalyticsService()
+anomaly_service = AnomalyService()
+import_service = ImportService()
+plaid_sync_service = PlaidSyncService()
+job_runner = JobRunner(SessionLocal)
 
-PLAID_CLIENT_ID = os.getenv('PLAID_CLIENT_ID')
-PLAID_SECRET = os.getenv('PLAID_SECRET')
-PLAID_ENV = os.getenv('PLAID_ENV', 'sandbox')
-PLAID_PRODUCTS = os.getenv('PLAID_PRODUCTS', 'transactions').split(',')
-PLAID_COUNTRY_CODES = os.getenv('PLAID_COUNTRY_CODES', 'US').split(',')
-PLAID_REDIRECT_URI = os.getenv('PLAID_REDIRECT_URI') or None
-
-host = plaid.Environment.Sandbox if PLAID_ENV == 'sandbox' else plaid.Environment.Production
-configuration = plaid.Configuration(
-    host=host,
-    api_key={
-        'clientId': PLAID_CLIENT_ID,
-        'secret': PLAID_SECRET,
-        'plaidVersion': '2020-09-14'
-    }
-)
-api_client = plaid.ApiClient(configuration)
-plaid_client = plaid_api.PlaidApi(api_client)
-plaid_products = [Products(p) for p in PLAID_PRODUCTS]
+# Uploaded files wait here until their import job finishes
+JOB_FILES_DIR = os.getenv("JOB_FILES_DIR", "./job_files")
 
 @app.on_event("startup")
-def seed_db_on_startup():
-    try:
-        from sqlalchemy import select, func
-        with next(get_db()) as db:
-            # Create a demo user if none exists
-            demo_user = db.query(User).filter(User.email == "demo@example.com").first()
-            if not demo_user:
-                demo_user = User(email="demo@example.com", password_hash=hash_password("demo123"))
-                db.add(demo_user)
-                db.commit()
-                db.refresh(demo_user)
-            
-            # Seed transactions for demo user
-            count = db.execute(select(func.count()).select_from(Transaction).where(Transaction.user_id == demo_user.id)).scalar() or 0
-            if count == 0:
-                csv_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'transactions.csv')
-                if os.path.exists(csv_path):
-                    df = pd.read_csv(csv_path)
-                    # Handle both lowercase and capitalized column names
-                    df.columns = df.columns.str.lower()
-                    required_cols = {'date', 'category', 'amount'}
-                    if required_cols.issubset(set(df.columns)):
-                        rows = []
-                        for _, row in df.iterrows():
-                            try:
-                                # Handle different date formats
-                                date_str = str(row['date'])
-                                if '/' in date_str:
-                                    date_obj = datetime.strptime(date_str, "%Y/%m/%d").date()
-                                else:
-                                    date_obj = datetime.strptime(date_str[:10], "%Y-%m-%d").date()
-                                
-                                rows.append(Transaction(
-                                    user_id=demo_user.id,
-                                    date=date_obj,
-                                    category=str(row['category']) if pd.notna(row['category']) else 'Uncategorized',
-                                    amount=float(row['amount']),
-                                    description=str(row['description']) if 'description' in df.columns and pd.notna(row.get('description')) else None
-                                ))
-                            except Exception as e:
-                                print(f"Error processing row: {e}")
-                                continue
-                        if rows:
-                            db.add_all(rows)
-                            db.commit()
-    except Exception:
-        pass
+def start_job_runner():
+    # Resume imports and syncs interrupted by a restart
+    job_runner.start()
+
+@app.on_event("shutdown")
+def stop_job_runner():
+    job_runner.shutdown(wait=False)
 
 @app.get("/")
 async def root():
@@ -146,43 +101,54 @@ def create_access_token(user_id: int, email: str) -> str:
     payload = {"sub": str(user_id), "email": email, "exp": datetime.utcnow() + timedelta(hours=12)}
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALG)
 
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> User:
+async def get_current_user(db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)) -> User:
     try:
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALG])
-        user_id = int(payload.get("sub"))
+        subject = payload.get("sub")
+        user_id = int(subject)
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid token")
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
+    user = user_cache.get(subject)
+    if user is None:
+        user = await db.get(User, user_id)
+        if not user:
+            raise HTTPException(status_code=401, detail="User not found")
+        # Detach so the cached record can be shared across requests and sessions
+        db.expunge(user)
+        user_cache.set(subject, user)
+    return user
+
+async def authenticate(db: AsyncSession, email: str, password: str) -> User:
+    result = await db.execute(select(User).where(User.email == email))
+    user = result.scalars().first()
+    # bcrypt is deliberately slow; keep it off the event loop
+    if not user or not await run_in_threadpool(verify_password, password, user.password_hash):
+        raise HTTPException(status_code=401, detail="Invalid credentials")
     return user
 
 # Auth endpoints
 @app.post("/api/auth/register", response_model=TokenResponse)
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    if db.query(User).filter(User.email == user.email).first():
+async def register(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(select(User.id).where(User.email == user.email))
+    if result.first():
         raise HTTPException(status_code=400, detail="Email already registered")
-    db_user = User(email=user.email, password_hash=hash_password(user.password))
+    password_hash = await run_in_threadpool(hash_password, user.password)
+    db_user = User(email=user.email, password_hash=password_hash)
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
     token = create_access_token(db_user.id, db_user.email)
     return TokenResponse(access_token=token)
 
 @app.post("/api/auth/login", response_model=TokenResponse)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.password_hash):
-        raise HTTPException(status_code=401, detail="Invalid credentials")
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = await authenticate(db, form_data.username, form_data.password)
     token = create_access_token(user.id, user.email)
     return TokenResponse(access_token=token)
 
 # Alternative login endpoint for easier testing
 @app.post("/api/auth/login-simple", response_model=TokenResponse)
-def login_simple(email: str, password: str, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == email).first()
-    if not user or not verify_password(password, user.password_hash):
-        raise HTTPException(status_code=401, detail="Invalid credentials")
+async def login_simple(email: str, password: str, db: AsyncSession = Depends(get_async_db)):
+    user = await authenticate(db, email, password)
     token = create_access_token(user.id, user.email)
     return TokenResponse(access_token=token)
 
@@ -190,82 +156,145 @@ def login_simple(email: str, password: str, db: Session = Depends(get_db)):
 async def health_check():
     return {"status": "OK", "timestamp": datetime.now().isoformat()}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Request, latency and database metrics in Prometheus text format"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 # Transaction endpoints
-@app.get("/api/transactions", response_model=List[TransactionResponse])
+@app.get("/api/transactions", response_model=TransactionPage)
 async def get_transactions(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     categories: Optional[str] = None,
-    db: Session = Depends(get_db),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get a page of transactions with optional filtering; pass next_cursor back as cursor for the next page"""
+    try:
+        category_list = categories.split(',') if categories else None
+        page = await transaction_service.get_transactions_page(
+            db, start_date, end_date, category_list, current_user.id, limit, cursor
+        )
+        return page
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/transactions/search", response_model=TransactionPage)
+async def search_transactions(
+    q: str = Query(..., min_length=1, max_length=200),
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    categories: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all transactions with optional filtering"""
+    """Search transaction descriptions, best matches first, with the same filters and cursor paging as the listing"""
     try:
         category_list = categories.split(',') if categories else None
-        transactions = await transaction_service.get_transactions(
-            db, start_date, end_date, category_list, current_user.id
+        return await transaction_service.search_transactions(
+            db, q, start_date, end_date, category_list, current_user.id, limit, cursor
         )
-        return transactions
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/transactions/export")
+async def export_transactions(
+    format: str = 'ndjson',
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    categories: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Stream transactions as NDJSON or CSV"""
+    media_types = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+    if format not in media_types:
+        raise HTTPException(status_code=400, detail="format must be ndjson or csv")
+    category_list = categories.split(',') if categories else None
+    # The stream outlives this handler, so it owns its own session; its sync
+    # I/O runs in the threadpool (StreamingResponse iterates `stream` there too)
+    db = SessionLocal()
+    try:
+        chunks = await run_in_threadpool(
+            transaction_service.export_transactions,
+            db, format, start_date, end_date, category_list, current_user.id
+        )
+    except ValueError as e:
+        db.close()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def stream():
+        try:
+            yield from chunks
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type=media_types[format],
+        headers={"Content-Disposition": f'attachment; filename="transactions.{format}"'}
+    )
+
 # Plaid endpoints
 @app.post("/api/plaid/link-token")
 async def create_link_token():
-    req = LinkTokenCreateRequest(
-        products=plaid_products,
-        client_name="Personal Finance Manager",
-        country_codes=[CountryCode(c) for c in PLAID_COUNTRY_CODES],
-        language='en',
-        user=LinkTokenCreateRequestUser(client_user_id=str(int(datetime.now().timestamp())))
-    )
-    if PLAID_REDIRECT_URI:
-        req.redirect_uri = PLAID_REDIRECT_URI
-    resp = plaid_client.link_token_create(req)
-    return resp.to_dict()
+    try:
+        return await run_in_threadpool(get_plaid_transport().link_token_create, str(int(datetime.now().timestamp())))
+    except PlaidNotConfigured as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Plaid request failed: {e}")
 
 @app.post("/api/plaid/exchange")
-async def exchange_public_token(payload: dict, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def exchange_public_token(payload: dict, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     public_token = payload.get("public_token")
     if not public_token:
         raise HTTPException(status_code=400, detail="public_token required")
-    exchange_req = ItemPublicTokenExchangeRequest(public_token=public_token)
-    exchange_resp = plaid_client.item_public_token_exchange(exchange_req).to_dict()
+    try:
+        exchange_resp = await run_in_threadpool(get_plaid_transport().item_public_token_exchange, public_token)
+    except PlaidNotConfigured as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Plaid request failed: {e}")
     access_token = exchange_resp.get("access_token")
     if access_token:
-        user = db.query(User).filter(User.id == current_user.id).first()
-        user.plaid_access_token = access_token
-        db.commit()
+        await db.run_sync(plaid_sync_service.link_item, current_user.id, access_token, exchange_resp.get("item_id"))
+        await db.execute(update(User).where(User.id == current_user.id).values(plaid_access_token=access_token))
+        await db.commit()
+        user_cache.invalidate(str(current_user.id))
     return {"item_id": exchange_resp.get("item_id")}
 
-@app.post("/api/plaid/sync")
+def run_plaid_sync_job(db: Session, job: Job) -> None:
+    """Background Plaid sync; each page commits with its cursor, which is the checkpoint"""
+    def record_page(counts: dict) -> None:
+        job.rows_processed += counts["added"] + counts["modified"] + counts["removed"]
+        job_runner.check_lease(db, job)
+
+    plaid_sync_service.sync_user(db, job.user_id, get_plaid_transport(), on_page=record_page)
+
+@app.post("/api/plaid/sync", response_model=JobCreatedResponse, status_code=status.HTTP_202_ACCEPTED)
 async def plaid_sync(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    access_token = current_user.plaid_access_token
-    if not access_token:
+    """Start a background Plaid sync; poll /api/jobs/{job_id} for progress"""
+    if not current_user.plaid_access_token:
         raise HTTPException(status_code=400, detail="No access token configured")
-    cursor = ''
-    added = []
-    has_more = True
-    while has_more:
-        req = TransactionsSyncRequest(access_token=access_token, cursor=cursor)
-        resp = plaid_client.transactions_sync(req).to_dict()
-        cursor = resp['next_cursor']
-        added.extend(resp['added'])
-        has_more = resp['has_more']
-        if cursor == '':
-            break
-    # Upsert latest transactions into DB
-    for t in added:
-        db_transaction = Transaction(
-            user_id=current_user.id,
-            date=datetime.strptime(t['date'], "%Y-%m-%d").date(),
-            category=t['personal_finance_category']['detailed'] if t.get('personal_finance_category') else (t.get('category', ['Uncategorized'])[0] if t.get('category') else 'Uncategorized'),
-            amount=abs(float(t['amount'])),
-            description=t.get('name')
-        )
-        db.add(db_transaction)
+    # Syncs of the same items must not overlap; join the one in progress
+    active = await run_in_threadpool(job_runner.find_active, db, current_user.id, "plaid_sync")
+    if active:
+        return JobCreatedResponse(job_id=active.id, status=active.status)
+    return await enqueue_job(db, current_user.id, "plaid_sync")
+
+def import_csv_and_commit(db: Session, source, user_id: Optional[int] = None) -> dict:
+    report = import_service.import_csv(db, source, user_id)
     db.commit()
-    return {"imported": len(added)}
+    return report
 
 @app.post("/api/seed-from-csv")
 async def seed_from_csv(db: Session = Depends(get_db)):
@@ -273,61 +302,105 @@ async def seed_from_csv(db: Session = Depends(get_db)):
     if not os.path.exists(csv_path):
         raise HTTPException(status_code=404, detail="transactions.csv not found in /data")
     try:
-        df = pd.read_csv(csv_path)
-        required_cols = {'date', 'category', 'amount'}
-        if not required_cols.issubset(set(df.columns)):
-            raise HTTPException(status_code=400, detail=f"CSV must include columns: {required_cols}")
-        count = 0
-        for _, row in df.iterrows():
-            try:
-                db_transaction = Transaction(
-                    date=datetime.strptime(str(row['date'])[:10], "%Y-%m-%d").date(),
-                    category=str(row['category']) if pd.notna(row['category']) else 'Uncategorized',
-                    amount=float(row['amount']),
-                    description=str(row['description']) if 'description' in df.columns and pd.notna(row.get('description')) else None
-                )
-                db.add(db_transaction)
-                count += 1
-            except Exception:
-                continue
-        db.commit()
-        return {"imported": count}
+        report = await run_in_threadpool(import_csv_and_commit, db, csv_path)
+        return report
+    except CSVImportError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
+        db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/upload-csv")
+def run_csv_import_job(db: Session, job: Job) -> None:
+    """Background CSV import; each chunk commits together with the job's checkpoint"""
+    params = job.params
+    skip_rows = (job.checkpoint or {}).get("rows_read", 0)
+    base_processed, base_failed = job.rows_processed, job.rows_failed
+    base_errors = list(job.errors or [])
+
+    def record_chunk(progress: dict) -> None:
+        job.checkpoint = {"rows_read": progress["rows_read"]}
+        job.rows_processed = base_processed + progress["imported"]
+        job.rows_failed = base_failed + progress["failed"]
+        job.errors = (base_errors + progress["errors"])[:MAX_REPORTED_ERRORS]
+        job_runner.check_lease(db, job)
+        db.commit()
+
+    lease_lost = False
+    try:
+        import_service.import_csv(db, params["path"], params.get("user_id"), skip_rows=skip_rows, on_chunk=record_chunk)
+    except LeaseLost:
+        lease_lost = True
+        raise
+    finally:
+        # Only reached when the job finishes or fails for good; after a crash,
+        # or once another worker has taken the job over, the file stays put
+        # for the resumed run
+        if not lease_lost and os.path.exists(params["path"]):
+            os.remove(params["path"])
+
+job_runner.register("csv_import", run_csv_import_job)
+job_runner.register("plaid_sync", run_plaid_sync_job)
+
+def save_upload(upload: UploadFile) -> str:
+    os.makedirs(JOB_FILES_DIR, exist_ok=True)
+    handle, path = tempfile.mkstemp(suffix=".csv", dir=JOB_FILES_DIR)
+    with os.fdopen(handle, "wb") as out:
+        shutil.copyfileobj(upload.file, out, 1024 * 1024)
+    return path
+
+async def enqueue_job(db: Session, user_id: int, kind: str, params: Optional[dict] = None) -> JobCreatedResponse:
+    try:
+        job = await run_in_threadpool(job_runner.enqueue, db, user_id, kind, params)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return JobCreatedResponse(job_id=job.id, status=job.status)
+
+@app.post("/api/upload-csv", response_model=JobCreatedResponse, status_code=status.HTTP_202_ACCEPTED)
 async def upload_csv(
     file: UploadFile = File(...),
-    user_id: Optional[int] = Form(None),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
 ):
+    """Queue a CSV upload for background import; poll /api/jobs/{job_id} for progress"""
+    path = await run_in_threadpool(save_upload, file)
     try:
-        content = await file.read()
-        from io import StringIO
-        df = pd.read_csv(StringIO(content.decode('utf-8')))
-        required_cols = {'date', 'category', 'amount'}
-        if not required_cols.issubset(set(df.columns)):
-            raise HTTPException(status_code=400, detail=f"CSV must include columns: {required_cols}")
-        rows = 0
-        for _, row in df.iterrows():
-            try:
-                db.add(Transaction(
-                    user_id=user_id,
-                    date=datetime.strptime(str(row['date'])[:10], "%Y-%m-%d").date(),
-                    category=str(row['category']) if pd.notna(row['category']) else 'Uncategorized',
-                    amount=float(row['amount']),
-                    description=str(row['description']) if 'description' in df.columns and pd.notna(row.get('description')) else None
-                ))
-                rows += 1
-            except Exception:
-                continue
-        db.commit()
-        return {"imported": rows}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        return await enqueue_job(db, current_user.id, "csv_import", {"path": path, "user_id": current_user.id})
+    except Exception:
+        os.remove(path)
+        raise
+
+@app.get("/api/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: int, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
+    """Get a background job's status, progress and throughput"""
+    job = await db.get(Job, job_id)
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    rows_per_second = None
+    if job.started_at:
+        started = job.started_at if job.started_at.tzinfo else job.started_at.replace(tzinfo=timezone.utc)
+        finished = job.finished_at or datetime.now(timezone.utc)
+        if not finished.tzinfo:
+            finished = finished.replace(tzinfo=timezone.utc)
+        seconds = (finished - started).total_seconds()
+        if seconds > 0:
+            rows_per_second = round(job.rows_processed / seconds, 1)
+    return JobResponse(
+        id=job.id,
+        kind=job.kind,
+        status=job.status,
+        rows_processed=job.rows_processed,
+        rows_failed=job.rows_failed,
+        rows_per_second=rows_per_second,
+        errors=job.errors or [],
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at
+    )
 
 @app.get("/api/transactions/{transaction_id}", response_model=TransactionResponse)
-async def get_transaction(transaction_id: int, db: Session = Depends(get_db)):
+async def get_transaction(transaction_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get a specific transaction by ID"""
     transaction = await transaction_service.get_transaction_by_id(db, transaction_id)
     if not transaction:
@@ -335,7 +408,7 @@ async def get_transaction(transaction_id: int, db: Session = Depends(get_db)):
     return transaction
 
 @app.post("/api/transactions", response_model=TransactionResponse, status_code=status.HTTP_201_CREATED)
-async def create_transaction(transaction: TransactionCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def create_transaction(transaction: TransactionCreate, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     """Create a new transaction"""
     try:
         if transaction.user_id is None:
@@ -345,11 +418,24 @@ async def create_transaction(transaction: TransactionCreate, db: Session = Depen
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.post("/api/transactions/batch", response_model=TransactionBatchResponse)
+async def batch_transactions(
+    batch: TransactionBatchRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Create, update and delete transactions in one request and one commit; results are per operation, in order"""
+    try:
+        results = await transaction_service.apply_batch(db, batch.operations, current_user.id)
+        return TransactionBatchResponse(results=results)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.put("/api/transactions/{transaction_id}", response_model=TransactionResponse)
 async def update_transaction(
     transaction_id: int, 
     transaction: TransactionUpdate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update an existing transaction"""
@@ -364,7 +450,7 @@ async def update_transaction(
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.delete("/api/transactions/{transaction_id}")
-async def delete_transaction(transaction_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def delete_transaction(transaction_id: int, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     """Delete a transaction"""
     success = await transaction_service.delete_transaction(db, transaction_id)
     if not success:
@@ -372,122 +458,220 @@ async def delete_transaction(transaction_id: int, db: Session = Depends(get_db),
     return {"message": "Transaction deleted successfully"}
 
 @app.get("/api/transactions/categories/list")
-async def get_categories(db: Session = Depends(get_db)):
-    """Get unique categories"""
-    categories = await transaction_service.get_categories(db)
+async def get_categories(db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
+    """Get the current user's categories"""
+    categories = await transaction_service.get_categories(db, current_user.id)
     return {"categories": categories}
 
 # Analytics endpoints
+async def cached_analytics_response(
+    request: Request,
+    db: AsyncSession,
+    current_user: User,
+    compute: Callable[[], Awaitable[Any]]
+) -> Response:
+    """Serve an analytics result from the response cache, with ETag/304 support.
+
+    The cache key is (user, endpoint, normalized filters, data version); every
+    transaction write bumps the version, so unchanged data keeps its ETag.
+    """
+    params = []
+    for name, value in sorted(request.query_params.items()):
+        if name == 'categories':
+            value = ','.join(sorted(set(c for c in value.split(',') if c)))
+        params.append((name, value))
+    key = (current_user.id, request.url.path, tuple(params), await db.run_sync(get_data_version, current_user.id))
+    etag = make_etag(key)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(',')]:
+        response_cache.record_not_modified()
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    payload = response_cache.get(key)
+    if payload is None:
+        payload = jsonable_encoder(await compute())
+        response_cache.set(key, payload)
+    return JSONResponse(content=payload, headers=headers)
+
+@app.get("/api/analytics/cache-stats")
+async def get_cache_stats(current_user: User = Depends(get_current_user)):
+    """Get hit/miss counters for the analytics caches"""
+    return {"responses": response_cache.stats(), "columns": analytics_cache.stats()}
+
 @app.get("/api/analytics/metrics", response_model=MetricsResponse)
 async def get_metrics(
+    request: Request,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     categories: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get key financial metrics"""
     try:
         category_list = categories.split(',') if categories else None
-        metrics = await analytics_service.get_key_metrics(
-            db, start_date, end_date, category_list
+        return await cached_analytics_response(
+            request, db, current_user,
+            lambda: analytics_service.get_key_metrics(db, start_date, end_date, category_list, current_user.id)
         )
-        return metrics
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/analytics/monthly-stats")
 async def get_monthly_stats(
+    request: Request,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     categories: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get monthly statistics"""
     try:
         category_list = categories.split(',') if categories else None
-        stats = await analytics_service.get_monthly_stats(
-            db, start_date, end_date, category_list
+        return await cached_analytics_response(
+            request, db, current_user,
+            lambda: analytics_service.get_monthly_stats(db, start_date, end_date, category_list, current_user.id)
         )
-        return stats
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/analytics/daily-averages")
 async def get_daily_averages(
+    request: Request,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     categories: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get daily averages by category"""
     try:
         category_list = categories.split(',') if categories else None
-        averages = await analytics_service.get_daily_averages(
-            db, start_date, end_date, category_list
+        return await cached_analytics_response(
+            request, db, current_user,
+            lambda: analytics_service.get_daily_averages(db, start_date, end_date, category_list, current_user.id)
         )
-        return averages
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/analytics/percentage-changes")
 async def get_percentage_changes(
+    request: Request,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     categories: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get month-over-month percentage changes"""
     try:
         category_list = categories.split(',') if categories else None
-        changes = await analytics_service.get_percentage_changes(
-            db, start_date, end_date, category_list
+        return await cached_analytics_response(
+            request, db, current_user,
+            lambda: analytics_service.get_percentage_changes(db, start_date, end_date, category_list, current_user.id)
         )
-        return changes
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/analytics/trends")
 async def get_trend_analysis(
+    request: Request,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     categories: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get trend analysis"""
     try:
         category_list = categories.split(',') if categories else None
-        trends = await analytics_service.get_trend_analysis(
-            db, start_date, end_date, category_list
+        return await cached_analytics_response(
+            request, db, current_user,
+            lambda: analytics_service.get_trend_analysis(db, start_date, end_date, category_list, current_user.id)
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/analytics/dashboard", response_model=DashboardResponse)
+async def get_dashboard(
+    request: Request,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    categories: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get metrics, monthly stats, daily averages, changes and trends in one call"""
+    try:
+        category_list = categories.split(',') if categories else None
+        return await cached_analytics_response(
+            request, db, current_user,
+            lambda: analytics_service.get_dashboard(db, start_date, end_date, category_list, current_user.id)
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/analytics/anomalies", response_model=AnomaliesResponse)
+async def get_anomalies(
+    request: Request,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    categories: Optional[str] = None,
+    z_threshold: float = 3.0,
+    percentile: float = 0.99,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get transactions that are unusually large for their category"""
+    if z_threshold <= 0:
+        raise HTTPException(status_code=400, detail="z_threshold must be positive")
+    if not 0 < percentile < 1:
+        raise HTTPException(status_code=400, detail="percentile must be between 0 and 1")
+    try:
+        category_list = categories.split(',') if categories else None
+        return await cached_analytics_response(
+            request, db, current_user,
+            lambda: anomaly_service.get_anomalies(
+                db, start_date, end_date, category_list, current_user.id, z_threshold, percentile
+            )
         )
-        return trends
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/analytics/chart-data")
 async def get_chart_data(
+    request: Request,
     chart_type: str,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     categories: Optional[str] = None,
-    db: Session = Depends(get_db),
+    granularity: str = 'auto',
+    max_points: int = 500,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get chart data for different chart types"""
+    """Get chart data for different chart types, bucketed and downsampled to max_points"""
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"granularity must be one of {', '.join(GRANULARITIES)}")
+    if max_points < 3:
+        raise HTTPException(status_code=400, detail="max_points must be at least 3")
     try:
         category_list = categories.split(',') if categories else None
-        chart_data = await analytics_service.get_chart_data(
-            db, chart_type, start_date, end_date, category_list
+        return await cached_analytics_response(
+            request, db, current_user,
+            lambda: analytics_service.get_chart_data(
+                db, chart_type, start_date, end_date, category_list, current_user.id,
+                granularity, max_points
+            )
         )
-        return chart_data
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
@@ -0,0 +1,170 @@
+"""Management commands.
+
+Usage:
+    python -m backend.manage init-db [--seed-demo]
+    python -m backend.manage seed-demo [--csv PATH]
+    python -m backend.manage rebuild-rollups [--user-id ID] [--check-only]
+    python -m backend.manage rebuild-category-stats [--user-id ID]
+    python -m backend.manage check-query-plans
+"""
+import argparse
+import os
+import sys
+
+from backend.database import SessionLocal, engine
+from backend.services.rollup_service import RollupService
+
+ALEMBIC_INI = os.path.join(os.path.dirname(__file__), "alembic.ini")
+DEMO_EMAIL = "demo@example.com"
+DEMO_PASSWORD = "demo123"
+DEMO_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "transactions.csv")
+
+def init_db() -> int:
+    """Create or upgrade the schema to the latest migration"""
+    from alembic import command
+    from alembic.config import Config
+
+    command.upgrade(Config(ALEMBIC_INI), "head")
+    print("Database schema is up to date")
+    return 0
+
+def seed_demo(csv_path: str = DEMO_CSV) -> int:
+    """Create the demo user and load its transactions from a CSV, unless it already has some"""
+    from sqlalchemy import func, select
+    from backend.main import hash_password, import_csv_and_commit
+    from backend.models import Transaction, User
+
+    db = SessionLocal()
+    try:
+        demo_user = db.query(User).filter(User.email == DEMO_EMAIL).first()
+        if not demo_user:
+            demo_user = User(email=DEMO_EMAIL, password_hash=hash_password(DEMO_PASSWORD))
+            db.add(demo_user)
+            db.commit()
+            print(f"Created {DEMO_EMAIL} (password {DEMO_PASSWORD})")
+
+        count = db.execute(select(func.count()).select_from(Transaction).where(Transaction.user_id == demo_user.id)).scalar()
+        if count:
+            print(f"Demo user already has {count} transactions")
+            return 0
+        if not os.path.exists(csv_path):
+            print(f"{csv_path} not found; demo user has no transactions")
+            return 1
+        report = import_csv_and_commit(db, csv_path, demo_user.id)
+    finally:
+        db.close()
+    print(f"Imported {report['imported']} demo transactions ({report['failed']} rows failed)")
+    return 0
+
+def schema_is_current() -> bool:
+    """Whether the database is at the latest migration; prints what to run if not"""
+    from alembic.config import Config
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    heads = set(ScriptDirectory.from_config(Config(ALEMBIC_INI)).get_heads())
+    with engine.connect() as connection:
+        current = set(MigrationContext.configure(connection).get_current_heads())
+    if current == heads:
+        return True
+    print(f"Database schema is at {', '.join(sorted(current)) or 'no revision'}, not {', '.join(sorted(heads))}; "
+          f"run `alembic -c backend/alembic.ini upgrade head` (or `python -m backend.manage init-db`) first")
+    return False
+
+def rebuild_rollups(user_id=None, check_only=False) -> int:
+    """Regenerate the daily/monthly rollups and verify them against the transactions table"""
+    if not schema_is_current():
+        return 1
+    rollup_service = RollupService()
+    db = SessionLocal()
+    try:
+        if not check_only:
+            counts = rollup_service.rebuild(db, user_id)
+            db.commit()
+            print(f"Rebuilt {counts['daily_rows']} daily and {counts['monthly_rows']} monthly rollup rows "
+                  f"and {counts['user_categories']} user category entries")
+        mismatches = rollup_service.verify(db, user_id)
+    finally:
+        db.close()
+
+    for mismatch in mismatches:
+        print(mismatch)
+    if mismatches:
+        print(f"Rollups do not match transactions ({len(mismatches)} mismatches)")
+        return 1
+    print("Rollups match transactions")
+    return 0
+
+def rebuild_category_stats(user_id=None) -> int:
+    """Recompute the per-category amount statistics behind anomaly detection"""
+    from backend.services.anomaly_service import AnomalyService
+
+    if not schema_is_current():
+        return 1
+    db = SessionLocal()
+    try:
+        counts = AnomalyService().rebuild(db, user_id)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Rebuilt statistics for {counts['categories']} user categories")
+    return 0
+
+def check_plans() -> int:
+    """EXPLAIN the hot per-user queries and fail if any falls back to a full table scan"""
+    from backend.query_plans import check_query_plans
+
+    db = SessionLocal()
+    try:
+        results = check_query_plans(db)
+    finally:
+        db.close()
+
+    failures = 0
+    for name, result in results.items():
+        status = "FULL SCAN" if result["full_scans"] else "ok"
+        print(f"{name}: {status}")
+        for line in result["plan"]:
+            print(f"    {line}")
+        failures += bool(result["full_scans"])
+    if failures:
+        print(f"{failures} queries fall back to full scans; run `alembic -c backend/alembic.ini upgrade head`?")
+        return 1
+    print("All hot queries use indexes")
+    return 0
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m backend.manage")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    init = subparsers.add_parser("init-db", help="Create or upgrade the schema (alembic upgrade head)")
+    init.add_argument("--seed-demo", action="store_true", help="Also create the demo user and its transactions")
+
+    demo = subparsers.add_parser("seed-demo", help="Create the demo user and load its transactions")
+    demo.add_argument("--csv", default=DEMO_CSV, help="Transactions CSV to load (default: transactions.csv)")
+
+    rollups = subparsers.add_parser("rebuild-rollups", help="Regenerate and verify analytics rollups")
+    rollups.add_argument("--user-id", type=int, default=None, help="Only rebuild this user's rollups")
+    rollups.add_argument("--check-only", action="store_true", help="Verify without rebuilding")
+
+    stats = subparsers.add_parser("rebuild-category-stats", help="Recompute the category statistics used for anomalies")
+    stats.add_argument("--user-id", type=int, default=None, help="Only rebuild this user's statistics")
+
+    subparsers.add_parser("check-query-plans", help="Fail if hot queries use full table scans")
+
+    args = parser.parse_args(argv)
+    if args.command == "init-db":
+        status = init_db()
+        return seed_demo() if args.seed_demo and status == 0 else status
+    if args.command == "seed-demo":
+        return seed_demo(args.csv)
+    if args.command == "rebuild-rollups":
+        return rebuild_rollups(args.user_id, args.check_only)
+    if args.command == "rebuild-category-stats":
+        return rebuild_category_stats(args.user_id)
+    if args.command == "check-query-plans":
+        return check_plans()
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
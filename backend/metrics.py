@@ -0,0 +1,195 @@
+"""Per-request latency and database metrics in Prometheus text format.
+
+MetricsMiddleware times every request by route template, and engine
+event hooks (instrument_engine) time every cursor execution. Queries run
+while a request is in flight, including those in worker threads and the
+async engine's greenlets, are also charged to that request, so per-route
+query counts expose N+1 patterns and per-route DB time exposes scans.
+"""
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import bisect
+import os
+import threading
+import time
+
+# Add a Server-Timing header (app and db durations, query count) to responses
+METRICS_SERVER_TIMING = os.getenv("METRICS_SERVER_TIMING", "").lower() in ("1", "true", "yes")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Counter:
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        # labels -> (per-bucket counts with a trailing +Inf bucket, sum)
+        self._values: Dict[Labels, Tuple[List[int], float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_format_labels(labels, ('le', _format_value(bound)))} {cumulative}")
+                cumulative += counts[-1]
+                lines.append(f"{self.name}_bucket{_format_labels(labels, ('le', '+Inf'))} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+http_requests = Counter("http_requests_total", "HTTP requests by route and status")
+http_request_duration = Histogram("http_request_duration_seconds", "HTTP request latency by route")
+http_request_db_queries = Histogram(
+    "http_request_db_queries", "Database queries issued per HTTP request", buckets=QUERY_COUNT_BUCKETS
+)
+http_request_db_duration = Histogram("http_request_db_duration_seconds", "Database time spent per HTTP request")
+db_queries = Counter("db_queries_total", "Database statements executed, by statement type")
+db_query_duration = Histogram("db_query_duration_seconds", "Database statement latency by statement type")
+
+METRICS = [http_requests, http_request_duration, http_request_db_queries, http_request_db_duration, db_queries, db_query_duration]
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+class RequestStats:
+    """Queries and DB time charged to the current request"""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, elapsed: float) -> None:
+        # Sync endpoints record from worker threads while the event loop may too
+        with self._lock:
+            self.queries += 1
+            self.db_seconds += elapsed
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+def _statement_type(statement: str) -> str:
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return keyword if keyword in ("SELECT", "INSERT", "UPDATE", "DELETE") else "OTHER"
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    statement_type = _statement_type(statement)
+    db_queries.inc(statement=statement_type)
+    db_query_duration.observe(elapsed, statement=statement_type)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(elapsed)
+
+def _handle_error(exception_context) -> None:
+    # A failed execute never reaches after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start_time"):
+        connection.info["query_start_time"].pop()
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement on a sync engine (pass async_engine.sync_engine for async)"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+def _route_label(scope: Dict[str, Any]) -> str:
+    # The route template, not the raw path, so ids don't explode label cardinality
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and DB usage per route"""
+
+    def __init__(self, app, server_timing: bool = METRICS_SERVER_TIMING):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    elapsed = (time.perf_counter() - started) * 1000
+                    header = (
+                        f'app;dur={elapsed:.1f}, db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries"'
+                    )
+                    message = dict(message, headers=list(message.get("headers", [])) + [
+                        (b"server-timing", header.encode("latin-1"))
+                    ])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_stats.reset(token)
+            elapsed = time.perf_counter() - started
+            route = _route_label(scope)
+            method = scope["method"]
+            http_requests.inc(method=method, route=route, status=str(status_code))
+            http_request_duration.observe(elapsed, method=method, route=route)
+            http_request_db_queries.observe(stats.queries, method=method, route=route)
+            http_request_db_duration.observe(stats.db_seconds, method=method, route=route)
@@ -0,0 +1,47 @@
+from logging.config import fileConfig
+
+from alembic import context
+
+from backend.database import DATABASE_URL, engine, Base
+import backend.models  # noqa: F401  (registers the tables on Base.metadata)
+from backend.models import TRANSACTION_SEARCH_INDEX, TRANSACTION_SEARCH_TABLE
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    """Leave the full-text search table (and FTS5's shadow tables) and index to their migration"""
+    return not (name is not None and (name.startswith(TRANSACTION_SEARCH_TABLE) or name == TRANSACTION_SEARCH_INDEX))
+
+def run_migrations_offline() -> None:
+    """Emit SQL to stdout instead of running it (alembic upgrade --sql)"""
+    context.configure(
+        url=DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        include_object=include_object,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=DATABASE_URL.startswith("sqlite")
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online() -> None:
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+            # SQLite can't ALTER most things in place; batch mode rebuilds the table
+            render_as_batch=connection.dialect.name == "sqlite"
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
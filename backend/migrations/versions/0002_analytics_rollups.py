@@ -0,0 +1,64 @@
+"""per-user daily and monthly rollups
+
+Adds daily_rollups (user, day, category) and monthly_rollups (user,
+month, category) with each group's total and transaction count, which
+the analytics endpoints read instead of the transactions table, and
+fills both from the existing transactions.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 01:49:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table('daily_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('category', sa.String(length=100), nullable=False),
+    sa.Column('total', sa.Float(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'day', 'category', name='uq_daily_rollups_user_day_category')
+    )
+    op.create_index(op.f('ix_daily_rollups_id'), 'daily_rollups', ['id'], unique=False)
+    op.create_table('monthly_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('category', sa.String(length=100), nullable=False),
+    sa.Column('total', sa.Float(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('first_day', sa.Date(), nullable=False),
+    sa.Column('last_day', sa.Date(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'month', 'category', name='uq_monthly_rollups_user_month_category')
+    )
+    op.create_index(op.f('ix_monthly_rollups_id'), 'monthly_rollups', ['id'], unique=False)
+
+    if op.get_bind().dialect.name == 'postgresql':
+        month = "CAST(date_trunc('month', day) AS DATE)"
+    else:
+        month = "date(day, 'start of month')"
+    op.execute(
+        "INSERT INTO daily_rollups (user_id, day, category, total, count) "
+        "SELECT user_id, date, category, SUM(amount), COUNT(*) FROM transactions GROUP BY user_id, date, category"
+    )
+    op.execute(
+        "INSERT INTO monthly_rollups (user_id, month, category, total, count, first_day, last_day) "
+        f"SELECT user_id, {month}, category, SUM(total), SUM(count), MIN(day), MAX(day) "
+        f"FROM daily_rollups GROUP BY user_id, {month}, category"
+    )
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_monthly_rollups_id'), table_name='monthly_rollups')
+    op.drop_table('monthly_rollups')
+    op.drop_index(op.f('ix_daily_rollups_id'), table_name='daily_rollups')
+    op.drop_table('daily_rollups')
@@ -0,0 +1,27 @@
+"""per-user data versions for response caching
+
+Adds data_versions, a counter per user that every write bumps. Cached
+analytics responses and their ETags are keyed by it; users without a
+row are at version 0.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 01:50:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table('data_versions',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+def downgrade() -> None:
+    op.drop_table('data_versions')
@@ -0,0 +1,23 @@
+"""index for keyset pagination of transactions
+
+Adds (user_id, date, id), which serves the transaction listing's
+WHERE user_id = ? AND (date, id) < (?, ?) ORDER BY date DESC, id DESC
+without sorting.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 01:51:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_index('ix_transactions_user_date_id', 'transactions', ['user_id', 'date', 'id'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index('ix_transactions_user_date_id', table_name='transactions')
@@ -0,0 +1,47 @@
+"""incremental Plaid sync state
+
+Adds plaid_items, each linked Plaid item with its access token and the
+/transactions/sync cursor of the last committed page, and
+transactions.transaction_id, Plaid's id for synced rows (NULL for manual
+and CSV entries), unique so modified and removed transactions can be
+matched.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 01:52:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table('plaid_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('item_id', sa.String(length=100), nullable=True),
+    sa.Column('access_token', sa.String(length=255), nullable=False),
+    sa.Column('cursor', sa.String(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('access_token'),
+    sa.UniqueConstraint('item_id')
+    )
+    op.create_index(op.f('ix_plaid_items_id'), 'plaid_items', ['id'], unique=False)
+    op.create_index(op.f('ix_plaid_items_user_id'), 'plaid_items', ['user_id'], unique=False)
+
+    with op.batch_alter_table('transactions') as batch_op:
+        batch_op.add_column(sa.Column('transaction_id', sa.String(length=100), nullable=True))
+        batch_op.create_unique_constraint('uq_transactions_transaction_id', ['transaction_id'])
+
+def downgrade() -> None:
+    with op.batch_alter_table('transactions') as batch_op:
+        batch_op.drop_constraint('uq_transactions_transaction_id', type_='unique')
+        batch_op.drop_column('transaction_id')
+
+    op.drop_index(op.f('ix_plaid_items_user_id'), table_name='plaid_items')
+    op.drop_index(op.f('ix_plaid_items_id'), table_name='plaid_items')
+    op.drop_table('plaid_items')
@@ -0,0 +1,36 @@
+"""composite indexes for per-user range scans
+
+Adds (user_id, category, date) INCLUDE (amount) for category-filtered
+date ranges and drops the single-column user_id index, which is a prefix
+of both composite indexes. (user_id, date, id) already exists from
+migration 0004. On Postgres the index is built CONCURRENTLY so writes
+are not blocked while it builds.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 01:55:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_transactions_user_category_date',
+            'transactions',
+            ['user_id', 'category', 'date'],
+            unique=False,
+            postgresql_include=['amount'],
+            postgresql_concurrently=True
+        )
+        op.drop_index('ix_transactions_user_id', table_name='transactions', postgresql_concurrently=True)
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_transactions_user_id', 'transactions', ['user_id'], unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_transactions_user_category_date', table_name='transactions', postgresql_concurrently=True)
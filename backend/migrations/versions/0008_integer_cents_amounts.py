@@ -0,0 +1,62 @@
+"""store amounts as integer cents
+
+Replaces transactions.amount (float) with amount_cents (bigint) and the
+rollup tables' total with total_cents, converting existing values with
+ROUND(x * 100). Sums over these columns are exact integer arithmetic.
+The (user_id, category, date) index carries amount_cents instead of
+amount on Postgres, so it is rebuilt.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 03:10:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+# table -> (float column, integer cents column)
+COLUMNS = {
+    'transactions': ('amount', 'amount_cents'),
+    'daily_rollups': ('total', 'total_cents'),
+    'monthly_rollups': ('total', 'total_cents'),
+}
+
+def _recreate_category_index(include: str) -> None:
+    op.drop_index('ix_transactions_user_category_date', table_name='transactions')
+    op.create_index(
+        'ix_transactions_user_category_date',
+        'transactions',
+        ['user_id', 'category', 'date'],
+        unique=False,
+        postgresql_include=[include]
+    )
+
+def upgrade() -> None:
+    for table, (old, new) in COLUMNS.items():
+        op.add_column(table, sa.Column(new, sa.BigInteger(), nullable=True))
+        op.execute(f"UPDATE {table} SET {new} = CAST(ROUND({old} * 100) AS BIGINT)")
+
+    if op.get_bind().dialect.name == 'postgresql':
+        _recreate_category_index('amount_cents')
+
+    for table, (old, new) in COLUMNS.items():
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(new, existing_type=sa.BigInteger(), nullable=False)
+            batch_op.drop_column(old)
+
+def downgrade() -> None:
+    for table, (old, new) in COLUMNS.items():
+        op.add_column(table, sa.Column(old, sa.Float(), nullable=True))
+        op.execute(f"UPDATE {table} SET {old} = {new} / 100.0")
+
+    if op.get_bind().dialect.name == 'postgresql':
+        _recreate_category_index('amount')
+
+    for table, (old, new) in COLUMNS.items():
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(old, existing_type=sa.Float(), nullable=False)
+            batch_op.drop_column(new)
@@ -0,0 +1,111 @@
+"""dictionary-encode categories
+
+Adds a categories table (id, unique name) and replaces the category name
+on transactions and both rollup tables with category_id, so category
+filters compare small integers. Adds user_categories, each user's
+categories with their transaction counts, which the rollup writes keep
+current and the category list endpoint reads directly. The (user_id,
+category, date) index and the rollup unique constraints move to
+category_id.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 04:20:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+# rollup table -> (period column, unique constraint)
+ROLLUPS = {
+    'daily_rollups': ('day', 'uq_daily_rollups_user_day_category'),
+    'monthly_rollups': ('month', 'uq_monthly_rollups_user_month_category'),
+}
+TABLES = ['transactions'] + list(ROLLUPS)
+
+def _fk_name(table: str) -> str:
+    return f'fk_{table}_category_id_categories'
+
+def upgrade() -> None:
+    op.create_table('categories',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_table('user_categories',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('transaction_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'category_id')
+    )
+
+    op.execute(
+        "INSERT INTO categories (name) "
+        + " UNION ".join(f"SELECT category FROM {table}" for table in TABLES)
+        + " ORDER BY 1"
+    )
+    for table in TABLES:
+        op.add_column(table, sa.Column('category_id', sa.Integer(), nullable=True))
+        op.execute(f"UPDATE {table} SET category_id = (SELECT id FROM categories WHERE categories.name = {table}.category)")
+    op.execute(
+        "INSERT INTO user_categories (user_id, category_id, transaction_count) "
+        "SELECT user_id, category_id, COUNT(*) FROM transactions WHERE user_id IS NOT NULL GROUP BY user_id, category_id"
+    )
+
+    op.drop_index('ix_transactions_user_category_date', table_name='transactions')
+    op.drop_index('ix_transactions_category', table_name='transactions')
+    with op.batch_alter_table('transactions') as batch_op:
+        batch_op.alter_column('category_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key(_fk_name('transactions'), 'categories', ['category_id'], ['id'])
+        batch_op.drop_column('category')
+    op.create_index(
+        'ix_transactions_user_category_date',
+        'transactions',
+        ['user_id', 'category_id', 'date'],
+        unique=False,
+        postgresql_include=['amount_cents']
+    )
+
+    for table, (period, constraint) in ROLLUPS.items():
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_constraint(constraint, type_='unique')
+            batch_op.alter_column('category_id', existing_type=sa.Integer(), nullable=False)
+            batch_op.create_foreign_key(_fk_name(table), 'categories', ['category_id'], ['id'])
+            batch_op.drop_column('category')
+            batch_op.create_unique_constraint(constraint, ['user_id', period, 'category_id'])
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.add_column(table, sa.Column('category', sa.String(length=100), nullable=True))
+        op.execute(f"UPDATE {table} SET category = (SELECT name FROM categories WHERE categories.id = {table}.category_id)")
+
+    for table, (period, constraint) in ROLLUPS.items():
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_constraint(constraint, type_='unique')
+            batch_op.drop_constraint(_fk_name(table), type_='foreignkey')
+            batch_op.alter_column('category', existing_type=sa.String(length=100), nullable=False)
+            batch_op.drop_column('category_id')
+            batch_op.create_unique_constraint(constraint, ['user_id', period, 'category'])
+
+    op.drop_index('ix_transactions_user_category_date', table_name='transactions')
+    with op.batch_alter_table('transactions') as batch_op:
+        batch_op.drop_constraint(_fk_name('transactions'), type_='foreignkey')
+        batch_op.alter_column('category', existing_type=sa.String(length=100), nullable=False)
+        batch_op.drop_column('category_id')
+    op.create_index('ix_transactions_category', 'transactions', ['category'], unique=False)
+    op.create_index(
+        'ix_transactions_user_category_date',
+        'transactions',
+        ['user_id', 'category', 'date'],
+        unique=False,
+        postgresql_include=['amount_cents']
+    )
+
+    op.drop_table('user_categories')
+    op.drop_table('categories')
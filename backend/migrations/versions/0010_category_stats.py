@@ -0,0 +1,33 @@
+"""per-category amount statistics for anomaly detection
+
+Adds category_stats: per user and category, the transaction count,
+Welford mean and M2 of amount_cents, and a log-bucketed quantile sketch.
+The table starts empty; fill it for existing data with
+`python -m backend.manage rebuild-category-stats`.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 05:30:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table('category_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('mean', sa.Float(), nullable=False),
+    sa.Column('m2', sa.Float(), nullable=False),
+    sa.Column('sketch', sa.JSON(), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'category_id')
+    )
+
+def downgrade() -> None:
+    op.drop_table('category_stats')
@@ -0,0 +1,36 @@
+"""running totals on the daily rollups
+
+Adds daily_rollups.cumulative_cents, each user and category's running
+total up to and including that day, backfilled with a window sum, and an
+index on (user_id, category_id, day) so the running total at any day is
+one index search. Range totals for key metrics and daily averages are the
+difference of two of them.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 06:40:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('daily_rollups', sa.Column('cumulative_cents', sa.BigInteger(), nullable=True))
+    op.execute(
+        "UPDATE daily_rollups SET cumulative_cents = running.cumulative_cents "
+        "FROM (SELECT id, SUM(total_cents) OVER (PARTITION BY user_id, category_id ORDER BY day) AS cumulative_cents "
+        "FROM daily_rollups) AS running "
+        "WHERE daily_rollups.id = running.id"
+    )
+    with op.batch_alter_table('daily_rollups') as batch_op:
+        batch_op.alter_column('cumulative_cents', existing_type=sa.BigInteger(), nullable=False)
+    op.create_index('ix_daily_rollups_user_category_day', 'daily_rollups', ['user_id', 'category_id', 'day'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index('ix_daily_rollups_user_category_day', table_name='daily_rollups')
+    with op.batch_alter_table('daily_rollups') as batch_op:
+        batch_op.drop_column('cumulative_cents')
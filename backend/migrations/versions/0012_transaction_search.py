@@ -0,0 +1,64 @@
+"""full-text search over transaction descriptions
+
+On SQLite adds transactions_search, an external-content FTS5 table over
+transactions.description kept in sync by insert/update/delete triggers,
+and indexes the existing rows. On PostgreSQL adds a GIN index on
+to_tsvector('english', description). Either way the database maintains
+the index on every write, bulk inserts and COPY included.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-18 07:50:00.000000
+"""
+from alembic import op
+
+revision = '0012'
+down_revision = '0011'
+branch_labels = None
+depends_on = None
+
+SQLITE_TRIGGERS = {
+    'transactions_search_insert': (
+        "AFTER INSERT ON transactions BEGIN "
+        "INSERT INTO transactions_search (rowid, description) SELECT new.id, new.description WHERE new.description IS NOT NULL; "
+        "END"
+    ),
+    'transactions_search_delete': (
+        "AFTER DELETE ON transactions BEGIN "
+        "INSERT INTO transactions_search (transactions_search, rowid, description) "
+        "SELECT 'delete', old.id, old.description WHERE old.description IS NOT NULL; "
+        "END"
+    ),
+    'transactions_search_update': (
+        "AFTER UPDATE OF description ON transactions WHEN old.description IS NOT new.description BEGIN "
+        "INSERT INTO transactions_search (transactions_search, rowid, description) "
+        "SELECT 'delete', old.id, old.description WHERE old.description IS NOT NULL; "
+        "INSERT INTO transactions_search (rowid, description) SELECT new.id, new.description WHERE new.description IS NOT NULL; "
+        "END"
+    ),
+}
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE transactions_search USING fts5("
+            "description, content='transactions', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2')"
+        )
+        for name, body in SQLITE_TRIGGERS.items():
+            op.execute(f"CREATE TRIGGER {name} {body}")
+        op.execute("INSERT INTO transactions_search (transactions_search) VALUES ('rebuild')")
+    elif dialect == 'postgresql':
+        op.execute(
+            "CREATE INDEX ix_transactions_description_search ON transactions "
+            "USING gin (to_tsvector('english', coalesce(description, '')))"
+        )
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for name in SQLITE_TRIGGERS:
+            op.execute(f"DROP TRIGGER {name}")
+        op.execute("DROP TABLE transactions_search")
+    elif dialect == 'postgresql':
+        op.execute("DROP INDEX ix_transactions_description_search")
@@ -0,0 +1,25 @@
+"""leases on running jobs
+
+Adds jobs.lease_expires_at, which the worker running a job keeps
+renewing. Only running jobs whose lease has expired are requeued, so a
+job another process is still running is not run twice. Jobs already
+running when this is applied have no lease and are requeued as before.
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-18 09:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0013'
+down_revision = '0012'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+
+def downgrade() -> None:
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.drop_column('lease_expires_at')
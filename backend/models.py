@@ -1,5 +1,7 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Date
+from sqlalchemy import DDL, Column, Integer, BigInteger, String, DateTime, Date, Float, ForeignKey, Index, UniqueConstraint, JSON, Text, event, select
+from sqlalchemy.orm import column_property
 from sqlalchemy.sql import func
+from decimal import Decimal
 from .database import Base
 
 class User(Base):
@@ -11,17 +13,198 @@ class User(Base):
     plaid_access_token = Column(String(255), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+class Category(Base):
+    """Category names, stored once; transactions and rollups refer to them by id"""
+    __tablename__ = "categories"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False, unique=True)
+
+    def __repr__(self):
+        return f"<Category(id={self.id}, name={self.name})>"
+
+class UserCategory(Base):
+    """The categories each user has transactions in, maintained with the rollups"""
+    __tablename__ = "user_categories"
+
+    user_id = Column(Integer, primary_key=True)
+    category_id = Column(Integer, ForeignKey("categories.id"), primary_key=True)
+    transaction_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<UserCategory(user_id={self.user_id}, category_id={self.category_id}, transaction_count={self.transaction_count})>"
+
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Keyset pagination: WHERE user_id = ? AND (date, id) < (?, ?) ORDER BY date DESC, id DESC
+        Index("ix_transactions_user_date_id", "user_id", "date", "id"),
+        # Category-filtered ranges: WHERE user_id = ? AND category_id IN (...) AND date BETWEEN ? AND ?;
+        # on Postgres amount_cents rides along so category totals are index-only scans
+        Index("ix_transactions_user_category_date", "user_id", "category_id", "date", postgresql_include=["amount_cents"]),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, nullable=True, index=True)
+    # No single-column index: user_id leads both composite indexes above
+    user_id = Column(Integer, nullable=True)
     date = Column(Date, nullable=False, index=True)
-    category = Column(String(100), nullable=False, index=True)
-    amount = Column(Float, nullable=False)
+    # No single-column index: filters always go through the per-user index above
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
+    # Whole cents, so sums are exact integer arithmetic; see schemas.to_cents
+    amount_cents = Column(BigInteger, nullable=False)
     description = Column(String(500), nullable=True)
+    # Plaid's transaction_id for synced rows; NULL for manual and CSV entries
+    transaction_id = Column(String(100), nullable=True, unique=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Read-only name for responses; writes set category_id (see services.category_dictionary)
+    category = column_property(
+        select(Category.name).where(Category.id == category_id).correlate_except(Category).scalar_subquery()
+    )
+
+    @property
+    def amount(self) -> Decimal:
+        return Decimal(self.amount_cents).scaleb(-2)
+
     def __repr__(self):
         return f"<Transaction(id={self.id}, date={self.date}, category={self.category}, amount={self.amount})>"
+
+# Full-text search over descriptions (TransactionService.search_transactions). These live
+# outside the metadata and are maintained by the database itself, so every write path (ORM,
+# bulk inserts, COPY, Plaid upserts and deletes) keeps them in sync: SQLite gets an
+# external-content FTS5 table fed by triggers, Postgres a GIN index on the tsvector.
+# FTS5 flushes its pending terms at every statement, so bulk writes should be multi-row
+# statements. SQLite batch migrations that rebuild `transactions` drop the triggers; recreate them.
+TRANSACTION_SEARCH_TABLE = "transactions_search"
+TRANSACTION_SEARCH_INDEX = "ix_transactions_description_search"
+TRANSACTION_SEARCH_DDL = {
+    "sqlite": [
+        f"CREATE VIRTUAL TABLE {TRANSACTION_SEARCH_TABLE} USING fts5("
+        "description, content='transactions', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER {TRANSACTION_SEARCH_TABLE}_insert AFTER INSERT ON transactions BEGIN "
+        f"INSERT INTO {TRANSACTION_SEARCH_TABLE} (rowid, description) SELECT new.id, new.description WHERE new.description IS NOT NULL; "
+        "END",
+        f"CREATE TRIGGER {TRANSACTION_SEARCH_TABLE}_delete AFTER DELETE ON transactions BEGIN "
+        f"INSERT INTO {TRANSACTION_SEARCH_TABLE} ({TRANSACTION_SEARCH_TABLE}, rowid, description) "
+        "SELECT 'delete', old.id, old.description WHERE old.description IS NOT NULL; "
+        "END",
+        f"CREATE TRIGGER {TRANSACTION_SEARCH_TABLE}_update AFTER UPDATE OF description ON transactions "
+        "WHEN old.description IS NOT new.description BEGIN "
+        f"INSERT INTO {TRANSACTION_SEARCH_TABLE} ({TRANSACTION_SEARCH_TABLE}, rowid, description) "
+        "SELECT 'delete', old.id, old.description WHERE old.description IS NOT NULL; "
+        f"INSERT INTO {TRANSACTION_SEARCH_TABLE} (rowid, description) SELECT new.id, new.description WHERE new.description IS NOT NULL; "
+        "END",
+    ],
+    "postgresql": [
+        f"CREATE INDEX {TRANSACTION_SEARCH_INDEX} ON transactions "
+        "USING gin (to_tsvector('english', coalesce(description, '')))",
+    ],
+}
+
+for _dialect, _statements in TRANSACTION_SEARCH_DDL.items():
+    for _statement in _statements:
+        event.listen(Transaction.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+event.listen(
+    Transaction.__table__, "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {TRANSACTION_SEARCH_TABLE}").execute_if(dialect="sqlite")
+)
+
+class DailyRollup(Base):
+    __tablename__ = "daily_rollups"
+    __table_args__ = (
+        UniqueConstraint("user_id", "day", "category_id", name="uq_daily_rollups_user_day_category"),
+        # Prefix-sum lookups: the last row on or before a day for one user and category
+        Index("ix_daily_rollups_user_category_day", "user_id", "category_id", "day"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=True)
+    day = Column(Date, nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
+    total_cents = Column(BigInteger, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+    # Running total of total_cents over this user and category's days up to and including this one
+    cumulative_cents = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<DailyRollup(user_id={self.user_id}, day={self.day}, category_id={self.category_id}, total_cents={self.total_cents})>"
+
+class MonthlyRollup(Base):
+    __tablename__ = "monthly_rollups"
+    __table_args__ = (UniqueConstraint("user_id", "month", "category_id", name="uq_monthly_rollups_user_month_category"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=True)
+    month = Column(Date, nullable=False)  # first day of the month
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
+    total_cents = Column(BigInteger, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+    first_day = Column(Date, nullable=False)
+    last_day = Column(Date, nullable=False)
+
+    def __repr__(self):
+        return f"<MonthlyRollup(user_id={self.user_id}, month={self.month}, category_id={self.category_id}, total_cents={self.total_cents})>"
+
+class CategoryStats(Base):
+    """Running amount statistics per user and category, updated on every write"""
+    __tablename__ = "category_stats"
+
+    user_id = Column(Integer, primary_key=True)
+    category_id = Column(Integer, ForeignKey("categories.id"), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    # Welford state over amount_cents: running mean and sum of squared deviations
+    mean = Column(Float, nullable=False, default=0.0)
+    m2 = Column(Float, nullable=False, default=0.0)
+    # Log-bucketed quantile sketch, {bucket index: count}; see services.anomaly_service
+    sketch = Column(JSON, nullable=False, default=dict)
+
+    def __repr__(self):
+        return f"<CategoryStats(user_id={self.user_id}, category_id={self.category_id}, count={self.count}, mean={self.mean})>"
+
+class DataVersion(Base):
+    __tablename__ = "data_versions"
+
+    user_id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<DataVersion(user_id={self.user_id}, version={self.version})>"
+
+class PlaidItem(Base):
+    __tablename__ = "plaid_items"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    item_id = Column(String(100), nullable=True, unique=True)
+    access_token = Column(String(255), nullable=False, unique=True)
+    # next_cursor from the last committed /transactions/sync page
+    cursor = Column(String, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<PlaidItem(user_id={self.user_id}, item_id={self.item_id})>"
+
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (Index("ix_jobs_status", "status"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    kind = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, succeeded, failed
+    params = Column(JSON, nullable=True)
+    # Handler-defined resume point, committed together with the work it covers
+    checkpoint = Column(JSON, nullable=True)
+    rows_processed = Column(Integer, nullable=False, default=0)
+    rows_failed = Column(Integer, nullable=False, default=0)
+    errors = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    # Renewed by the worker running the job; once past, other workers may take the job over
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<Job(id={self.id}, kind={self.kind}, status={self.status})>"
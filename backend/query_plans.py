@@ -0,0 +1,118 @@
+"""EXPLAIN checks for the hot per-user queries.
+
+Each query is built the way the services build it, compiled for the
+connected database and explained. A query fails the check when its plan
+falls back to a full scan: a table scan (`SCAN <table>` on SQLite, `Seq
+Scan` on Postgres), or an index search that does not seek on the query's
+key column, e.g. a per-user query walking every user's rows through the
+date index. Primary key lookups (the category name for each listed
+transaction) are point reads and always pass, as do FTS5 full-text
+MATCH lookups, which SQLite reports as a virtual table scan. Postgres
+plans with enable_seqscan off, so a small or empty table does not hide a
+missing index.
+"""
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+from datetime import date
+from typing import Any, Dict, List, Tuple
+import json
+import re
+
+from backend.models import Transaction, DailyRollup, MonthlyRollup, UserCategory, CategoryStats
+from backend.services.transaction_service import TransactionService
+
+def hot_queries(dialect_name: str) -> List[Tuple[str, Any, str]]:
+    """(name, statement, column the index search must seek on)"""
+    transactions = TransactionService()
+    newest_first = (Transaction.date.desc(), Transaction.id.desc())
+    search, ranking = transactions._search_query(
+        transactions._filtered_query(select(Transaction), "2024-01-01", None, None, 1), dialect_name, ["coffee"]
+    )
+    return [
+        ("transactions page", transactions._filtered_query(
+            select(Transaction), "2024-01-01", "2024-12-31", None, 1
+        ).order_by(*newest_first).limit(101), "user_id"),
+        ("transactions page after cursor", transactions._filtered_query(
+            select(Transaction), None, None, None, 1
+        ).where(tuple_(Transaction.date, Transaction.id) < tuple_(date(2024, 6, 1), 5000)).order_by(*newest_first).limit(101), "user_id"),
+        ("transactions by category", transactions._filtered_query(
+            select(Transaction), "2024-01-01", "2024-12-31", [1, 2], 1
+        ).order_by(*newest_first).limit(101), "user_id"),
+        ("category totals", select(Transaction.category_id, Transaction.amount_cents).where(
+            Transaction.user_id == 1,
+            Transaction.category_id.in_([1, 2]),
+            Transaction.date.between(date(2024, 1, 1), date(2024, 12, 31))
+        ), "user_id"),
+        ("description search", search.order_by(*ranking).limit(101), "description"),
+        ("plaid upsert lookup", select(Transaction.id).where(Transaction.transaction_id.in_(["txn-1", "txn-2"])), "transaction_id"),
+        ("daily rollups range", select(DailyRollup.day, DailyRollup.category_id, DailyRollup.total_cents).where(
+            DailyRollup.user_id == 1, DailyRollup.day.between(date(2024, 1, 1), date(2024, 3, 31))
+        ), "user_id"),
+        ("monthly rollups range", select(MonthlyRollup.month, MonthlyRollup.category_id, MonthlyRollup.total_cents).where(
+            MonthlyRollup.user_id == 1, MonthlyRollup.month.between(date(2024, 1, 1), date(2024, 12, 1))
+        ), "user_id"),
+        ("prefix sum lookup", select(DailyRollup.cumulative_cents).where(
+            DailyRollup.user_id == 1, DailyRollup.category_id == 1, DailyRollup.day <= date(2024, 3, 31)
+        ).order_by(DailyRollup.day.desc()).limit(1), "user_id"),
+        ("user categories", select(UserCategory.category_id).where(UserCategory.user_id == 1), "user_id"),
+        ("anomaly candidates", select(Transaction).where(
+            Transaction.user_id == 1,
+            Transaction.category_id.in_([1, 2]),
+            Transaction.amount_cents >= 10000,
+            Transaction.date.between(date(2024, 12, 1), date(2024, 12, 30))
+        ), "user_id"),
+        ("category stats", select(CategoryStats).where(CategoryStats.user_id == 1, CategoryStats.count >= 10), "user_id"),
+    ]
+
+def _sqlite_plan(db: Session, sql: str, key_column: str) -> Tuple[List[str], List[str]]:
+    lines = [row[-1] for row in db.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + sql)]
+    full_scans = [
+        line for line in lines
+        if (re.match(r"SCAN \w+", line) and not line.startswith("SCAN CONSTANT") and not re.search(r"VIRTUAL TABLE INDEX \d+:M", line))
+        or (line.startswith("SEARCH") and not re.search(rf"\b{key_column}=\?", line) and "PRIMARY KEY" not in line)
+    ]
+    return lines, full_scans
+
+def _postgres_plan(db: Session, sql: str, key_column: str) -> Tuple[List[str], List[str]]:
+    connection = db.connection()
+    connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    raw = connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + sql).scalar()
+    plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+
+    lines: List[str] = []
+    full_scans: List[str] = []
+    nodes = [(plan, 0)]
+    while nodes:
+        node, depth = nodes.pop()
+        line = "  " * depth + node["Node Type"]
+        if node.get("Index Name"):
+            line += f" using {node['Index Name']}"
+        if node.get("Relation Name"):
+            line += f" on {node['Relation Name']}"
+        if node.get("Index Cond"):
+            line += f" ({node['Index Cond']})"
+        lines.append(line)
+        if node["Node Type"] == "Seq Scan" or (
+            "Index" in node["Node Type"] and key_column not in node.get("Index Cond", "")
+            and not node.get("Index Name", "").endswith("_pkey")
+        ):
+            full_scans.append(line.strip())
+        nodes.extend((child, depth + 1) for child in reversed(node.get("Plans", [])))
+    return lines, full_scans
+
+def check_query_plans(db: Session) -> Dict[str, Dict[str, List[str]]]:
+    """Explain every hot query; returns {name: {"plan": [...], "full_scans": [...]}}"""
+    dialect = db.get_bind().dialect
+    explain = {"sqlite": _sqlite_plan, "postgresql": _postgres_plan}.get(dialect.name)
+    if explain is None:
+        raise ValueError(f"Query plan checks support SQLite and Postgres, not {dialect.name}")
+
+    results = {}
+    try:
+        for name, statement, key_column in hot_queries(dialect.name):
+            sql = str(statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+            plan, full_scans = explain(db, sql, key_column)
+            results[name] = {"plan": plan, "full_scans": full_scans}
+    finally:
+        db.rollback()
+    return results
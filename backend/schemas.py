@@ -1,22 +1,36 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PlainSerializer
 from datetime import date, datetime
-from typing import Optional, List, Dict, Any
+import datetime as dt
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Annotated, Optional, List, Dict, Any, Literal, Union
+
+# Amounts are stored and summed as integer cents and only become decimals
+# here; JSON carries them as plain numbers, so API clients see no change
+Amount = Annotated[Decimal, PlainSerializer(float, return_type=float, when_used="json")]
+
+def to_cents(amount: Union[Decimal, float, int, str]) -> int:
+    """Round an amount to whole cents (half up)"""
+    return int((Decimal(str(amount)) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+def from_cents(cents: int) -> Decimal:
+    return Decimal(int(cents)).scaleb(-2)
 
 # Transaction schemas
 class TransactionBase(BaseModel):
     user_id: Optional[int] = None
     date: date
     category: str = Field(..., max_length=100)
-    amount: float = Field(..., gt=0)
+    amount: Amount = Field(..., ge=Decimal("0.01"))
     description: Optional[str] = Field(None, max_length=500)
 
 class TransactionCreate(TransactionBase):
     pass
 
 class TransactionUpdate(BaseModel):
-    date: Optional[date] = None
+    # dt.date: with a default, the annotation is evaluated after `date` is bound to None here
+    date: Optional[dt.date] = None
     category: Optional[str] = Field(None, max_length=100)
-    amount: Optional[float] = Field(None, gt=0)
+    amount: Optional[Amount] = Field(None, ge=Decimal("0.01"))
     description: Optional[str] = Field(None, max_length=500)
 
 class TransactionResponse(TransactionBase):
@@ -27,18 +41,81 @@ class TransactionResponse(TransactionBase):
     class Config:
         from_attributes = True
 
+class TransactionPage(BaseModel):
+    items: List[TransactionResponse]
+    next_cursor: Optional[str] = None
+
+# Batch writes: POST /api/transactions/batch
+MAX_BATCH_OPERATIONS = 1000
+
+class BatchCreateOperation(BaseModel):
+    op: Literal["create"]
+    transaction: TransactionCreate
+
+class BatchUpdateOperation(BaseModel):
+    op: Literal["update"]
+    id: int
+    transaction: TransactionUpdate
+
+class BatchDeleteOperation(BaseModel):
+    op: Literal["delete"]
+    id: int
+
+BatchOperation = Annotated[Union[BatchCreateOperation, BatchUpdateOperation, BatchDeleteOperation], Field(discriminator="op")]
+
+class TransactionBatchRequest(BaseModel):
+    operations: List[BatchOperation] = Field(..., min_length=1, max_length=MAX_BATCH_OPERATIONS)
+
+class BatchOperationResult(BaseModel):
+    index: int
+    op: str
+    # As the single-row endpoint would answer: 201 created, 200 updated or deleted, 404 not found;
+    # 403 for a create naming another user
+    status: int
+    id: Optional[int] = None
+    # The transaction as stored once the whole batch is applied; None after a delete
+    transaction: Optional[TransactionResponse] = None
+    error: Optional[str] = None
+
+class TransactionBatchResponse(BaseModel):
+    results: List[BatchOperationResult]
+
 # Analytics schemas
 class MetricsResponse(BaseModel):
-    total_income: float
-    total_expenses: float
-    net_balance: float
+    total_income: Amount
+    total_expenses: Amount
+    net_balance: Amount
     daily_average: float
 
 class MonthlyStat(BaseModel):
     month: str
-    income: float
-    expenses: float
-    net: float
+    income: Amount
+    expenses: Amount
+    net: Amount
+
+class DashboardResponse(BaseModel):
+    metrics: MetricsResponse
+    monthly_stats: List[MonthlyStat]
+    daily_averages: Dict[str, float]
+    percentage_changes: Dict[str, float]
+    trends: Dict[str, Dict[str, Any]]
+
+class Anomaly(BaseModel):
+    id: int
+    date: date
+    category: str
+    amount: Amount
+    description: Optional[str] = None
+    # Standard deviations above the category mean
+    z_score: float
+    category_mean: Amount
+    # The category's estimated amount at the requested percentile
+    category_percentile: Amount
+
+class AnomaliesResponse(BaseModel):
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    anomalies: List[Anomaly]
 
 class ChartData(BaseModel):
     labels: List[str]
@@ -63,3 +140,21 @@ class UserLogin(BaseModel):
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
+
+# Background job schemas
+class JobCreatedResponse(BaseModel):
+    job_id: int
+    status: str
+
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    status: str
+    rows_processed: int
+    rows_failed: int
+    rows_per_second: Optional[float] = None
+    errors: List[Dict[str, Any]] = []
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -1,3 +1,6 @@
 from .transaction_service import TransactionService
 from .analytics_service import AnalyticsService
-
+from .rollup_service import RollupService
+from .import_service import ImportService
+from .plaid_sync_service import PlaidSyncService
+from .anomaly_service import AnomalyService
@@ -0,0 +1,248 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from collections import OrderedDict
+from datetime import date
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
+import os
+import threading
+
+from ..models import DailyRollup
+from .category_dictionary import category_dictionary
+from .response_cache import get_data_version
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+# Memory budget for the cache in megabytes; 0 disables it
+ANALYTICS_CACHE_MB = float(os.getenv("ANALYTICS_CACHE_MB", "0"))
+
+class UserColumns:
+    """One user's daily category totals held as compact column arrays.
+
+    Rows are sorted by (day, category) and categories are dictionary
+    encoded in sorted order, so results come out in the same order as the
+    equivalent rollup queries.
+    """
+
+    def __init__(
+        self,
+        days: "np.ndarray",
+        codes: "np.ndarray",
+        amounts: "np.ndarray",
+        categories: List[str],
+        data_version: int = 0
+    ):
+        self.days = days            # int32 proleptic ordinals
+        self.codes = codes          # int16/int32 index into categories
+        self.amounts = amounts      # int64 cents
+        self.categories = categories
+        self.category_codes = {category: code for code, category in enumerate(categories)}
+        # The user's data version read before the rows; a newer one means the columns are stale
+        self.data_version = data_version
+        # Months since 1970-01 per row, derived once at load time
+        self.months = self._month_index(days)
+
+    @staticmethod
+    def _month_index(days: "np.ndarray") -> "np.ndarray":
+        import numpy as np
+
+        # Shift ordinals onto numpy's 1970 epoch to use datetime64 month arithmetic
+        epoch_offset = date(1970, 1, 1).toordinal()
+        as_dates = (days.astype(np.int64) - epoch_offset).astype('datetime64[D]')
+        return as_dates.astype('datetime64[M]').astype(np.int32)
+
+    @classmethod
+    def load(cls, db: Session, user_id: int) -> "UserColumns":
+        # numpy is imported on first use so the app only pays for it when the cache is enabled
+        import numpy as np
+
+        data_version = get_data_version(db, user_id)
+        rows = db.query(DailyRollup.day, DailyRollup.category_id, DailyRollup.total_cents).filter(
+            DailyRollup.user_id == user_id
+        ).all()
+        names = category_dictionary.names(db, {row.category_id for row in rows})
+        categories = sorted(names.values())
+        category_codes = {category: code for code, category in enumerate(categories)}
+        code_dtype = np.int16 if len(categories) < np.iinfo(np.int16).max else np.int32
+        rows = sorted(((row.day, category_codes[names[row.category_id]], row.total_cents) for row in rows))
+
+        days = np.fromiter((day.toordinal() for day, _, _ in rows), dtype=np.int32, count=len(rows))
+        codes = np.fromiter((code for _, code, _ in rows), dtype=code_dtype, count=len(rows))
+        amounts = np.fromiter((total for _, _, total in rows), dtype=np.int64, count=len(rows))
+        return cls(days, codes, amounts, categories, data_version)
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self.days.nbytes + self.codes.nbytes + self.amounts.nbytes + self.months.nbytes
+            + sum(len(category) + 50 for category in self.categories)
+        )
+
+    def _mask(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        categories: Optional[List[str]] = None
+    ) -> "np.ndarray":
+        import numpy as np
+
+        mask = np.ones(len(self.days), dtype=bool)
+        if start:
+            mask &= self.days >= start.toordinal()
+        if end:
+            mask &= self.days <= end.toordinal()
+        if categories:
+            wanted = [self.category_codes[c] for c in categories if c in self.category_codes]
+            mask &= np.isin(self.codes, wanted)
+        return mask
+
+    def monthly_category_totals(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        categories: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Same rows as AnalyticsService._get_monthly_category_totals"""
+        import numpy as np
+
+        mask = self._mask(start, end, categories)
+        if not mask.any():
+            return []
+
+        days = self.days[mask]
+        codes = self.codes[mask].astype(np.int64)
+        keys = self.months[mask].astype(np.int64) * len(self.categories) + codes
+
+        # Rows are day-sorted, so a key's first occurrence is its first day and
+        # its last occurrence (first in the reversed array) is its last day
+        unique_keys, first_index, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        last_index = len(keys) - 1 - np.unique(keys[::-1], return_index=True)[1]
+        # Integer accumulation keeps the sums exact (bincount would go through float64)
+        totals = np.zeros(len(unique_keys), dtype=np.int64)
+        np.add.at(totals, inverse, self.amounts[mask])
+
+        rows = []
+        for key, total, first, last in zip(unique_keys.tolist(), totals.tolist(), days[first_index].tolist(), days[last_index].tolist()):
+            month_index, code = divmod(key, len(self.categories))
+            year, month = divmod(month_index, 12)
+            rows.append({
+                'month': f"{1970 + year:04d}-{month + 1:02d}",
+                'category': self.categories[code],
+                'total_cents': total,
+                'min_date': date.fromordinal(first),
+                'max_date': date.fromordinal(last)
+            })
+        return rows
+
+    def daily_category_totals(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        categories: Optional[List[str]] = None
+    ) -> "pd.DataFrame":
+        """Same frame as AnalyticsService._get_daily_category_totals"""
+        import pandas as pd
+
+        mask = self._mask(start, end, categories)
+        return pd.DataFrame({
+            'date': [date.fromordinal(d) for d in self.days[mask].tolist()],
+            'category': [self.categories[c] for c in self.codes[mask].tolist()],
+            'amount_cents': self.amounts[mask]
+        }, columns=['date', 'category', 'amount_cents'])
+
+class AnalyticsCache:
+    """Bounded LRU of UserColumns keyed by user id.
+
+    Each entry records the user's data version (see response_cache) from
+    when it was loaded, and get() reloads it once the stored version has
+    moved on, so writes made by other processes are picked up on the next
+    read. Writes through this process's sessions are also reported with
+    invalidate_on_commit(), which frees their entries as soon as the
+    session commits.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[int, UserColumns]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, db: Session, user_id: Optional[int]) -> Optional[UserColumns]:
+        """Return the user's columns, loading them on a miss; None when disabled"""
+        if not self.enabled or user_id is None:
+            return None
+        data_version = get_data_version(db, user_id)
+        with self._lock:
+            columns = self._entries.get(user_id)
+            if columns is not None and columns.data_version == data_version:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return columns
+            self.misses += 1
+
+        columns = UserColumns.load(db, user_id)
+        with self._lock:
+            self._store(user_id, columns)
+        return columns
+
+    def _store(self, user_id: int, columns: UserColumns) -> None:
+        self._discard(user_id)
+        if columns.nbytes > self.max_bytes:
+            return
+        self._entries[user_id] = columns
+        self._bytes += columns.nbytes
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self.evictions += 1
+
+    def _discard(self, user_id: Optional[int]) -> None:
+        columns = self._entries.pop(user_id, None)
+        if columns is not None:
+            self._bytes -= columns.nbytes
+
+    def invalidate(self, user_ids: Optional[Iterable[Optional[int]]] = None) -> None:
+        """Drop the given users, or everything when user_ids is None"""
+        with self._lock:
+            if user_ids is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            for user_id in user_ids:
+                self._discard(user_id)
+
+    def invalidate_on_commit(self, db: Session, user_ids: Iterable[Optional[int]]) -> None:
+        """Invalidate the users once the session's current transaction commits"""
+        if self.enabled:
+            db.info.setdefault('analytics_cache_users', set()).update(user_ids)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "users": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+analytics_cache = AnalyticsCache(max_bytes=int(ANALYTICS_CACHE_MB * 1024 * 1024))
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session: Session) -> None:
+    user_ids = session.info.pop('analytics_cache_users', None)
+    if user_ids:
+        analytics_cache.invalidate(user_ids)
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_users(session: Session) -> None:
+    session.info.pop('analytics_cache_users', None)
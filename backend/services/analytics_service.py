@@ -1,49 +1,266 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, extract
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, and_, extract, literal, select
 from datetime import datetime, date, timedelta
-from typing import List, Optional, Dict, Any
-import pandas as pd
-import numpy as np
+from typing import TYPE_CHECKING, List, Optional, Dict, Any
 
-from ..models import Transaction
-from ..schemas import MetricsResponse, MonthlyStat
+from ..models import DailyRollup, MonthlyRollup, UserCategory
+from .rollup_service import month_start, next_month
+from .analytics_cache import analytics_cache
+from .category_dictionary import category_dictionary
+from ..schemas import MetricsResponse, MonthlyStat, from_cents
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+GRANULARITIES = ('day', 'week', 'month', 'auto')
 
 class AnalyticsService:
-    async def get_key_metrics(
+    def _parse_date(self, value: Optional[str]) -> Optional[date]:
+        return datetime.strptime(value, "%Y-%m-%d").date() if value else None
+
+    def _filter_rollups(
+        self,
+        query,
+        model,
+        date_column,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        category_ids: Optional[List[int]] = None,
+        user_id: Optional[int] = None
+    ):
+        """Apply the shared user/date/category filters to a rollup query (category_ids as in TransactionService)"""
+        if user_id is not None:
+            query = query.filter(model.user_id == user_id)
+        
+        if start:
+            query = query.filter(date_column >= start)
+        
+        if end:
+            query = query.filter(date_column <= end)
+        
+        if category_ids is not None:
+            query = query.filter(model.category_id.in_(category_ids))
+        
+        return query
+
+    def _get_monthly_category_totals(
         self,
         db: Session,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
-        categories: Optional[List[str]] = None
-    ) -> MetricsResponse:
-        """Calculate key financial metrics"""
-        query = db.query(Transaction)
-        
-        # Apply filters
-        if start_date:
-            start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
-            query = query.filter(Transaction.date >= start_date_obj)
-        
-        if end_date:
-            end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date()
-            query = query.filter(Transaction.date <= end_date_obj)
-        
-        if categories:
-            query = query.filter(Transaction.category.in_(categories))
+        categories: Optional[List[str]] = None,
+        user_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Aggregate filtered transactions by month and category from the rollups.
+
+        When the in-memory analytics cache is enabled the user's columns are
+        reduced with NumPy instead. Otherwise months lying entirely inside the
+        range are read from the monthly rollups and the partial months at
+        either edge are summed from the daily rollups. Returns one row per
+        (month, category) with the summed amount in integer cents and the
+        first/last transaction date, sorted by month and category name.
+        """
+        start = self._parse_date(start_date)
+        end = self._parse_date(end_date)
+        
+        columns = analytics_cache.get(db, user_id)
+        if columns is not None:
+            return columns.monthly_category_totals(start, end, categories)
+        
+        # [full_from, full_to) is the span of whole months inside the range
+        full_from = start if start is None or start.day == 1 else next_month(start)
+        full_to = None if end is None else month_start(end + timedelta(days=1))
+        has_full_months = full_from is None or full_to is None or full_from < full_to
+        category_ids = category_dictionary.lookup(db, categories)
+        
+        merged = {}
+        
+        def merge(month_key, category, total, first_day, last_day):
+            row = merged.get((month_key, category))
+            if row is None:
+                merged[(month_key, category)] = {
+                    'month': month_key,
+                    'category_id': category,
+                    'total_cents': int(total or 0),
+                    'min_date': first_day,
+                    'max_date': last_day
+                }
+            else:
+                row['total_cents'] += int(total or 0)
+                row['min_date'] = min(row['min_date'], first_day)
+                row['max_date'] = max(row['max_date'], last_day)
+        
+        if has_full_months:
+            query = db.query(
+                MonthlyRollup.month,
+                MonthlyRollup.category_id,
+                func.sum(MonthlyRollup.total_cents).label('total_cents'),
+                func.min(MonthlyRollup.first_day).label('first_day'),
+                func.max(MonthlyRollup.last_day).label('last_day')
+            )
+            query = self._filter_rollups(query, MonthlyRollup, MonthlyRollup.month, full_from, None, category_ids, user_id)
+            if full_to is not None:
+                query = query.filter(MonthlyRollup.month < full_to)
+            for row in query.group_by(MonthlyRollup.month, MonthlyRollup.category_id):
+                merge(row.month.strftime('%Y-%m'), row.category_id, row.total_cents, row.first_day, row.last_day)
+            
+            # Partial months at the edges of the range
+            day_ranges = []
+            if full_from is not None and start is not None and start < full_from:
+                day_ranges.append((start, full_from - timedelta(days=1)))
+            if full_to is not None and end is not None and full_to <= end:
+                day_ranges.append((full_to, end))
+        else:
+            day_ranges = [(start, end)]
         
-        transactions = query.all()
+        for range_start, range_end in day_ranges:
+            query = db.query(
+                DailyRollup.day,
+                DailyRollup.category_id,
+                func.sum(DailyRollup.total_cents).label('total_cents')
+            )
+            query = self._filter_rollups(query, DailyRollup, DailyRollup.day, range_start, range_end, category_ids, user_id)
+            for row in query.group_by(DailyRollup.day, DailyRollup.category_id):
+                merge(row.day.strftime('%Y-%m'), row.category_id, row.total_cents, row.day, row.day)
+        
+        names = category_dictionary.names(db, {category for _, category in merged})
+        for row in merged.values():
+            row['category'] = names[row.pop('category_id')]
+        return sorted(merged.values(), key=lambda row: (row['month'], row['category']))
+
+    def _get_category_range_totals(
+        self,
+        db: Session,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        categories: Optional[List[str]] = None,
+        user_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Total each of the user's categories over the range from the daily prefix sums.
+
+        A category's total is the running total at its last day on or before
+        the end minus the one at its last day before the start, so the cost
+        is a few index lookups per category however long the range is.
+        Returns one row per category with transactions in the range, with
+        the first/last transaction date, sorted by category name. Without a
+        user (no category list to drive the lookups) it falls back to the
+        monthly totals, which the builders accept just the same.
+        """
+        if user_id is None:
+            return self._get_monthly_category_totals(db, start_date, end_date, categories, user_id)
+
+        start = self._parse_date(start_date)
+        end = self._parse_date(end_date)
+        category_ids = category_dictionary.lookup(db, categories)
+
+        def edge(column, *conditions, last=True):
+            # The value at one end of this category's days, via ix_daily_rollups_user_category_day
+            return select(column).where(
+                DailyRollup.user_id == UserCategory.user_id,
+                DailyRollup.category_id == UserCategory.category_id,
+                *conditions
+            ).order_by(DailyRollup.day.desc() if last else DailyRollup.day).limit(1).scalar_subquery()
+
+        up_to_end = [DailyRollup.day <= end] if end else []
+        from_start = [DailyRollup.day >= start] if start else []
+        before_start = edge(DailyRollup.cumulative_cents, DailyRollup.day < start) if start else literal(0)
+        query = db.query(
+            UserCategory.category_id,
+            edge(DailyRollup.cumulative_cents, *up_to_end).label('cumulative_end'),
+            before_start.label('cumulative_before'),
+            edge(DailyRollup.day, *from_start, last=False).label('first_day'),
+            edge(DailyRollup.day, *up_to_end).label('last_day')
+        ).filter(UserCategory.user_id == user_id)
+        if category_ids is not None:
+            query = query.filter(UserCategory.category_id.in_(category_ids))
+
+        totals = [
+            row for row in query
+            if row.first_day is not None and (end is None or row.first_day <= end)
+        ]
+        names = category_dictionary.names(db, {row.category_id for row in totals})
+        return sorted((
+            {
+                'category': names[row.category_id],
+                'total_cents': int(row.cumulative_end) - int(row.cumulative_before or 0),
+                'min_date': row.first_day,
+                'max_date': row.last_day
+            } for row in totals
+        ), key=lambda row: row['category'])
+
+    def _get_daily_category_totals(
+        self,
+        db: Session,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        categories: Optional[List[str]] = None,
+        user_id: Optional[int] = None
+    ) -> "pd.DataFrame":
+        """Load filtered (date, category, amount_cents) daily totals from the rollups"""
+        import pandas as pd
+
+        columns = analytics_cache.get(db, user_id)
+        if columns is not None:
+            return columns.daily_category_totals(self._parse_date(start_date), self._parse_date(end_date), categories)
+        
+        query = db.query(
+            DailyRollup.day,
+            DailyRollup.category_id,
+            func.sum(DailyRollup.total_cents).label('total_cents')
+        )
+        query = self._filter_rollups(
+            query, DailyRollup, DailyRollup.day,
+            self._parse_date(start_date), self._parse_date(end_date), category_dictionary.lookup(db, categories), user_id
+        )
+        rows = query.group_by(DailyRollup.day, DailyRollup.category_id).all()
+        names = category_dictionary.names(db, {row.category_id for row in rows})
         
-        if not transactions:
+        # Sorted by (day, category name), the order the analytics cache produces
+        records = sorted(
+            ((row.day, names[row.category_id], int(row.total_cents)) for row in rows),
+            key=lambda record: (record[0], record[1])
+        )
+        return pd.DataFrame(records, columns=['date', 'category', 'amount_cents'])
+
+    def _pivot_by_month(self, totals: List[Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
+        """Reshape aggregated rows into {month: {category: total in cents}}"""
+        monthly_category_data = {}
+        for row in totals:
+            monthly_category_data.setdefault(row['month'], {})[row['category']] = row['total_cents']
+        return monthly_category_data
+
+    async def get_key_metrics(
+        self,
+        db: AsyncSession,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        categories: Optional[List[str]] = None,
+        user_id: Optional[int] = None
+    ) -> MetricsResponse:
+        """Calculate key financial metrics"""
+        totals = await db.run_sync(self._get_category_range_totals, start_date, end_date, categories, user_id)
+        return self._build_key_metrics(totals, start_date, end_date)
+
+    def _build_key_metrics(
+        self,
+        totals: List[Dict[str, Any]],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> MetricsResponse:
+        """Calculate key financial metrics from aggregated monthly or range totals"""
+        if not totals:
             return MetricsResponse(
-                total_income=0.0,
-                total_expenses=0.0,
-                net_balance=0.0,
+                total_income=0,
+                total_expenses=0,
+                net_balance=0,
                 daily_average=0.0
             )
         
         # Calculate metrics
-        income = sum(t.amount for t in transactions if t.category == 'Income')
-        expenses = sum(t.amount for t in transactions if t.category != 'Income')
+        income = sum(row['total_cents'] for row in totals if row['category'] == 'Income')
+        expenses = sum(row['total_cents'] for row in totals if row['category'] != 'Income')
         net_balance = income - expenses
         
         # Calculate daily average
@@ -53,159 +270,126 @@ class AnalyticsService:
             days = (end_dt - start_dt).days + 1
             daily_average = expenses / days if days > 0 else 0
         else:
-            dates = [t.date for t in transactions]
-            if dates:
-                min_date = min(dates)
-                max_date = max(dates)
-                days = (max_date - min_date).days + 1
-                daily_average = expenses / days if days > 0 else 0
-            else:
-                daily_average = 0
+            min_date = min(row['min_date'] for row in totals)
+            max_date = max(row['max_date'] for row in totals)
+            days = (max_date - min_date).days + 1
+            daily_average = expenses / days if days > 0 else 0
         
         return MetricsResponse(
-            total_income=income,
-            total_expenses=expenses,
-            net_balance=net_balance,
-            daily_average=daily_average
+            total_income=from_cents(income),
+            total_expenses=from_cents(expenses),
+            net_balance=from_cents(net_balance),
+            daily_average=daily_average / 100
         )
 
     async def get_monthly_stats(
         self,
-        db: Session,
+        db: AsyncSession,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
-        categories: Optional[List[str]] = None
+        categories: Optional[List[str]] = None,
+        user_id: Optional[int] = None
     ) -> List[MonthlyStat]:
         """Get monthly statistics"""
-        query = db.query(Transaction)
-        
-        # Apply filters
-        if start_date:
-            start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
-            query = query.filter(Transaction.date >= start_date_obj)
-        
-        if end_date:
-            end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date()
-            query = query.filter(Transaction.date <= end_date_obj)
-        
-        if categories:
-            query = query.filter(Transaction.category.in_(categories))
-        
-        transactions = query.all()
-        
-        if not transactions:
+        totals = await db.run_sync(self._get_monthly_category_totals, start_date, end_date, categories, user_id)
+        return self._build_monthly_stats(totals, start_date, end_date)
+
+    def _build_monthly_stats(
+        self,
+        totals: List[Dict[str, Any]],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> List[MonthlyStat]:
+        """Get monthly statistics from aggregated monthly totals"""
+        if not totals:
             return []
         
-        # Group by month
+        # Split each month into income and expenses
         monthly_data = {}
-        for transaction in transactions:
-            month_key = transaction.date.strftime('%Y-%m')
-            if month_key not in monthly_data:
-                monthly_data[month_key] = {'income': 0, 'expenses': 0}
-            
-            if transaction.category == 'Income':
-                monthly_data[month_key]['income'] += transaction.amount
+        for row in totals:
+            data = monthly_data.setdefault(row['month'], {'income': 0, 'expenses': 0})
+            if row['category'] == 'Income':
+                data['income'] += row['total_cents']
             else:
-                monthly_data[month_key]['expenses'] += transaction.amount
+                data['expenses'] += row['total_cents']
         
         # Convert to list of MonthlyStat objects
         monthly_stats = []
         for month, data in sorted(monthly_data.items()):
             monthly_stats.append(MonthlyStat(
                 month=month,
-                income=data['income'],
-                expenses=data['expenses'],
-                net=data['income'] - data['expenses']
+                income=from_cents(data['income']),
+                expenses=from_cents(data['expenses']),
+                net=from_cents(data['income'] - data['expenses'])
             ))
         
         return monthly_stats
 
     async def get_daily_averages(
         self,
-        db: Session,
+        db: AsyncSession,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
-        categories: Optional[List[str]] = None
+        categories: Optional[List[str]] = None,
+        user_id: Optional[int] = None
     ) -> Dict[str, float]:
         """Calculate daily averages by category"""
-        query = db.query(Transaction)
-        
-        # Apply filters
-        if start_date:
-            start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
-            query = query.filter(Transaction.date >= start_date_obj)
-        
-        if end_date:
-            end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date()
-            query = query.filter(Transaction.date <= end_date_obj)
-        
-        if categories:
-            query = query.filter(Transaction.category.in_(categories))
-        
-        transactions = query.all()
-        
-        if not transactions:
+        totals = await db.run_sync(self._get_category_range_totals, start_date, end_date, categories, user_id)
+        return self._build_daily_averages(totals, start_date, end_date)
+
+    def _build_daily_averages(
+        self,
+        totals: List[Dict[str, Any]],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> Dict[str, float]:
+        """Calculate daily averages by category from aggregated monthly or range totals"""
+        if not totals:
             return {}
         
         # Calculate date range
-        dates = [t.date for t in transactions]
-        min_date = min(dates)
-        max_date = max(dates)
+        min_date = min(row['min_date'] for row in totals)
+        max_date = max(row['max_date'] for row in totals)
         days = (max_date - min_date).days + 1
         
         if days == 0:
             return {}
         
-        # Group by category and calculate totals
+        # Roll monthly totals up to category totals
         category_totals = {}
-        for transaction in transactions:
-            if transaction.category not in category_totals:
-                category_totals[transaction.category] = 0
-            category_totals[transaction.category] += transaction.amount
+        for row in totals:
+            category_totals[row['category']] = category_totals.get(row['category'], 0) + row['total_cents']
         
         # Calculate daily averages
         daily_averages = {}
         for category, total in category_totals.items():
-            daily_averages[category] = total / days
+            daily_averages[category] = total / days / 100
         
         return daily_averages
 
     async def get_percentage_changes(
         self,
-        db: Session,
+        db: AsyncSession,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
-        categories: Optional[List[str]] = None
+        categories: Optional[List[str]] = None,
+        user_id: Optional[int] = None
     ) -> Dict[str, float]:
         """Calculate month-over-month percentage changes"""
-        query = db.query(Transaction)
-        
-        # Apply filters
-        if start_date:
-            start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
-            query = query.filter(Transaction.date >= start_date_obj)
-        
-        if end_date:
-            end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date()
-            query = query.filter(Transaction.date <= end_date_obj)
-        
-        if categories:
-            query = query.filter(Transaction.category.in_(categories))
-        
-        transactions = query.all()
-        
-        if not transactions:
+        totals = await db.run_sync(self._get_monthly_category_totals, start_date, end_date, categories, user_id)
+        return self._build_percentage_changes(totals, start_date, end_date)
+
+    def _build_percentage_changes(
+        self,
+        totals: List[Dict[str, Any]],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> Dict[str, float]:
+        """Calculate month-over-month percentage changes from aggregated monthly totals"""
+        if not totals:
             return {}
         
-        # Group by month and category
-        monthly_category_data = {}
-        for transaction in transactions:
-            month_key = transaction.date.strftime('%Y-%m')
-            if month_key not in monthly_category_data:
-                monthly_category_data[month_key] = {}
-            if transaction.category not in monthly_category_data[month_key]:
-                monthly_category_data[month_key][transaction.category] = 0
-            monthly_category_data[month_key][transaction.category] += transaction.amount
+        monthly_category_data = self._pivot_by_month(totals)
         
         months = sorted(monthly_category_data.keys())
         if len(months) < 2:
@@ -230,40 +414,27 @@ class AnalyticsService:
 
     async def get_trend_analysis(
         self,
-        db: Session,
+        db: AsyncSession,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
-        categories: Optional[List[str]] = None
+        categories: Optional[List[str]] = None,
+        user_id: Optional[int] = None
     ) -> Dict[str, Dict[str, Any]]:
         """Get comprehensive trend analysis"""
-        query = db.query(Transaction)
-        
-        # Apply filters
-        if start_date:
-            start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
-            query = query.filter(Transaction.date >= start_date_obj)
-        
-        if end_date:
-            end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date()
-            query = query.filter(Transaction.date <= end_date_obj)
-        
-        if categories:
-            query = query.filter(Transaction.category.in_(categories))
-        
-        transactions = query.all()
-        
-        if not transactions:
+        totals = await db.run_sync(self._get_monthly_category_totals, start_date, end_date, categories, user_id)
+        return self._build_trend_analysis(totals, start_date, end_date)
+
+    def _build_trend_analysis(
+        self,
+        totals: List[Dict[str, Any]],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Get comprehensive trend analysis from aggregated monthly totals"""
+        if not totals:
             return {}
         
-        # Group by month and category
-        monthly_category_data = {}
-        for transaction in transactions:
-            month_key = transaction.date.strftime('%Y-%m')
-            if month_key not in monthly_category_data:
-                monthly_category_data[month_key] = {}
-            if transaction.category not in monthly_category_data[month_key]:
-                monthly_category_data[month_key][transaction.category] = 0
-            monthly_category_data[month_key][transaction.category] += transaction.amount
+        monthly_category_data = self._pivot_by_month(totals)
         
         months = sorted(monthly_category_data.keys())
         if len(months) < 3:
@@ -275,8 +446,8 @@ class AnalyticsService:
             category_amounts = [monthly_category_data[month].get(category, 0) for month in months]
             
             if len(category_amounts) >= 3:
-                recent_avg = np.mean(category_amounts[-2:])
-                older_avg = np.mean(category_amounts[:2])
+                recent_avg = sum(category_amounts[-2:]) / 2
+                older_avg = sum(category_amounts[:2]) / 2
                 
                 if older_avg != 0:
                     trend_percentage = ((recent_avg - older_avg) / older_avg) * 100
@@ -292,64 +463,146 @@ class AnalyticsService:
         
         return trends
 
+    async def get_dashboard(
+        self,
+        db: AsyncSession,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        categories: Optional[List[str]] = None,
+        user_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Get every dashboard analytic from a single rollup read"""
+        totals = await db.run_sync(self._get_monthly_category_totals, start_date, end_date, categories, user_id)
+        return {
+            "metrics": self._build_key_metrics(totals, start_date, end_date),
+            "monthly_stats": self._build_monthly_stats(totals, start_date, end_date),
+            "daily_averages": self._build_daily_averages(totals, start_date, end_date),
+            "percentage_changes": self._build_percentage_changes(totals, start_date, end_date),
+            "trends": self._build_trend_analysis(totals, start_date, end_date)
+        }
+
     async def get_chart_data(
         self,
-        db: Session,
+        db: AsyncSession,
         chart_type: str,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
-        categories: Optional[List[str]] = None
+        categories: Optional[List[str]] = None,
+        user_id: Optional[int] = None,
+        granularity: str = 'auto',
+        max_points: Optional[int] = 500
     ) -> Dict[str, Any]:
-        """Get chart data for different chart types"""
-        query = db.query(Transaction)
-        
-        # Apply filters
-        if start_date:
-            start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
-            query = query.filter(Transaction.date >= start_date_obj)
-        
-        if end_date:
-            end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date()
-            query = query.filter(Transaction.date <= end_date_obj)
-        
-        if categories:
-            query = query.filter(Transaction.category.in_(categories))
+        """Get chart data for different chart types.
+
+        Time-series charts are bucketed by `granularity` (day, week, month, or
+        auto: the finest one that fits in `max_points`) and then downsampled
+        to at most `max_points` labels.
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
         
-        transactions = query.all()
+        df = await db.run_sync(self._get_daily_category_totals, start_date, end_date, categories, user_id)
         
-        if not transactions:
+        if df.empty:
             return {"labels": [], "datasets": []}
         
-        # Convert to DataFrame for easier processing
-        df = pd.DataFrame([{
-            'date': t.date,
-            'category': t.category,
-            'amount': t.amount
-        } for t in transactions])
-        
         if chart_type == 'pie':
             return self._get_pie_chart_data(df)
-        elif chart_type == 'bar':
-            return self._get_bar_chart_data(df)
-        elif chart_type == 'line':
-            return self._get_line_chart_data(df)
-        elif chart_type == 'area':
-            return self._get_area_chart_data(df)
-        elif chart_type == 'trend':
-            return self._get_trend_chart_data(df)
         elif chart_type == 'comparison':
             return self._get_comparison_chart_data(df)
+        
+        if granularity == 'auto':
+            granularity = self._choose_granularity(df, max_points)
+        df = self._bucket_dates(df, granularity)
+        
+        if chart_type == 'bar':
+            chart_data = self._get_bar_chart_data(df, max_points)
+        elif chart_type == 'line':
+            chart_data = self._get_line_chart_data(df, max_points)
+        elif chart_type == 'trend':
+            chart_data = self._get_trend_chart_data(df, max_points)
+        else:
+            chart_data = self._get_area_chart_data(df, max_points)
+        chart_data["granularity"] = granularity
+        return chart_data
+
+    def _choose_granularity(self, df: "pd.DataFrame", max_points: Optional[int]) -> str:
+        """Pick the finest bucket size whose label count fits in max_points"""
+        if not max_points:
+            return 'day'
+        for granularity in ('day', 'week'):
+            if self._bucket_dates(df, granularity)['date'].nunique() <= max_points:
+                return granularity
+        return 'month'
+
+    def _bucket_dates(self, df: "pd.DataFrame", granularity: str) -> "pd.DataFrame":
+        """Replace each date with the first day of its day/week/month bucket"""
+        if granularity == 'day':
+            return df
+        import pandas as pd
+
+        dates = pd.to_datetime(df['date'])
+        if granularity == 'week':
+            starts = dates - pd.to_timedelta(dates.dt.weekday, unit='D')
         else:
-            return self._get_area_chart_data(df)
+            starts = dates.dt.to_period('M').dt.start_time
+        return df.assign(date=starts.dt.date)
+
+    def _lttb_indices(self, x: "np.ndarray", y: "np.ndarray", threshold: int) -> "np.ndarray":
+        """Largest-Triangle-Three-Buckets: indices of `threshold` points that keep the shape of y"""
+        import numpy as np
+
+        n = len(y)
+        if threshold >= n:
+            return np.arange(n)
+        if threshold < 3:
+            return np.linspace(0, n - 1, threshold).round().astype(int)
+        
+        every = (n - 2) / (threshold - 2)
+        selected = [0]
+        a = 0
+        for i in range(threshold - 2):
+            start = int(i * every) + 1
+            end = int((i + 1) * every) + 1
+            next_end = min(int((i + 2) * every) + 1, n)
+            avg_x = x[end:next_end].mean()
+            avg_y = y[end:next_end].mean()
+            areas = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+            a = start + int(np.argmax(areas))
+            selected.append(a)
+        selected.append(n - 1)
+        return np.array(selected)
+
+    def _downsample_points(self, pivot: "pd.DataFrame", max_points: Optional[int]) -> "np.ndarray":
+        """Row positions to keep for line-style charts, chosen by LTTB on the summed series"""
+        import numpy as np
+
+        if not max_points or len(pivot) <= max_points:
+            return np.arange(len(pivot))
+        x = np.array([d.toordinal() for d in pivot.index], dtype=np.float64)
+        y = pivot.sum(axis=1).to_numpy(dtype=np.float64)
+        return self._lttb_indices(x, y, max_points)
 
-    def _get_pie_chart_data(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _merge_buckets(self, pivot: "pd.DataFrame", max_points: Optional[int]) -> "pd.DataFrame":
+        """Sum runs of consecutive buckets so bar totals are preserved within max_points"""
+        if not max_points or len(pivot) <= max_points:
+            return pivot
+        import numpy as np
+
+        size = -(-len(pivot) // max_points)
+        groups = np.arange(len(pivot)) // size
+        merged = pivot.groupby(groups).sum()
+        merged.index = pivot.index[::size]
+        return merged
+
+    def _get_pie_chart_data(self, df: "pd.DataFrame") -> Dict[str, Any]:
         """Generate pie chart data"""
-        category_totals = df.groupby('category')['amount'].sum()
+        category_totals = df.groupby('category')['amount_cents'].sum()
         
         return {
             "labels": category_totals.index.tolist(),
             "datasets": [{
-                "data": category_totals.values.tolist(),
+                "data": self._to_amounts(category_totals),
                 "backgroundColor": [
                     '#667eea', '#764ba2', '#f093fb', '#f5576c', '#4facfe', '#00f2fe',
                     '#43e97b', '#38f9d7', '#ffecd2', '#fcb69f', '#a8edea', '#fed6e3'
@@ -357,87 +610,79 @@ class AnalyticsService:
             }]
         }
 
-    def _get_bar_chart_data(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Generate bar chart data"""
-        dates = sorted(df['date'].unique())
+    def _pivot_daily_totals(self, df: "pd.DataFrame") -> "pd.DataFrame":
+        """Pivot (date, category, amount_cents) rows into a date x category matrix.
+
+        Rows are sorted by date, columns keep the order in which categories
+        first appear, and missing days are filled with 0.
+        """
         categories = df['category'].unique()
-        
-        datasets = []
+        pivot = df.pivot_table(index='date', columns='category', values='amount_cents', aggfunc='sum', fill_value=0)
+        return pivot.reindex(columns=categories).sort_index()
+
+    def _to_amounts(self, cents: "pd.Series") -> List[float]:
+        """Chart values are sums in cents until they are serialized"""
+        return (cents / 100).tolist()
+
+    def _get_date_labels(self, pivot: "pd.DataFrame") -> List[str]:
+        return [date.strftime('%Y-%m-%d') for date in pivot.index]
+
+    def _get_bar_chart_data(self, df: "pd.DataFrame", max_points: Optional[int] = None) -> Dict[str, Any]:
+        """Generate bar chart data"""
+        pivot = self._merge_buckets(self._pivot_daily_totals(df), max_points)
         colors = ['#667eea', '#764ba2', '#f093fb', '#f5576c', '#4facfe', '#00f2fe']
         
-        for i, category in enumerate(categories):
-            category_data = df[df['category'] == category]
-            daily_totals = category_data.groupby('date')['amount'].sum()
-            
-            data = [daily_totals.get(date, 0) for date in dates]
-            
-            datasets.append({
-                "label": category,
-                "data": data,
-                "backgroundColor": colors[i % len(colors)]
-            })
+        datasets = [{
+            "label": category,
+            "data": self._to_amounts(pivot[category]),
+            "backgroundColor": colors[i % len(colors)]
+        } for i, category in enumerate(pivot.columns)]
         
         return {
-            "labels": [date.strftime('%Y-%m-%d') for date in dates],
+            "labels": self._get_date_labels(pivot),
             "datasets": datasets
         }
 
-    def _get_line_chart_data(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _get_line_chart_data(self, df: "pd.DataFrame", max_points: Optional[int] = None) -> Dict[str, Any]:
         """Generate line chart data"""
-        return self._get_area_chart_data(df)
+        return self._get_area_chart_data(df, max_points)
 
-    def _get_area_chart_data(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _get_area_chart_data(self, df: "pd.DataFrame", max_points: Optional[int] = None) -> Dict[str, Any]:
         """Generate area chart data"""
-        dates = sorted(df['date'].unique())
-        categories = df['category'].unique()
-        
-        datasets = []
+        pivot = self._pivot_daily_totals(df)
+        pivot = pivot.iloc[self._downsample_points(pivot, max_points)]
         colors = ['#667eea', '#764ba2', '#f093fb', '#f5576c', '#4facfe', '#00f2fe']
         
-        for i, category in enumerate(categories):
-            category_data = df[df['category'] == category]
-            daily_totals = category_data.groupby('date')['amount'].sum()
-            
-            data = [daily_totals.get(date, 0) for date in dates]
-            
-            datasets.append({
-                "label": category,
-                "data": data,
-                "borderColor": colors[i % len(colors)],
-                "backgroundColor": colors[i % len(colors)] + '40',
-                "fill": True,
-                "tension": 0.4
-            })
+        datasets = [{
+            "label": category,
+            "data": self._to_amounts(pivot[category]),
+            "borderColor": colors[i % len(colors)],
+            "backgroundColor": colors[i % len(colors)] + '40',
+            "fill": True,
+            "tension": 0.4
+        } for i, category in enumerate(pivot.columns)]
         
         return {
-            "labels": [date.strftime('%Y-%m-%d') for date in dates],
+            "labels": self._get_date_labels(pivot),
             "datasets": datasets
         }
 
-    def _get_trend_chart_data(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _get_trend_chart_data(self, df: "pd.DataFrame", max_points: Optional[int] = None) -> Dict[str, Any]:
         """Generate trend chart data with moving averages"""
-        dates = sorted(df['date'].unique())
-        categories = df['category'].unique()
-        
-        datasets = []
+        pivot = self._pivot_daily_totals(df)
+        # 7-point moving average; the first points average whatever is available
+        moving_avg = pivot.rolling(window=7, min_periods=1).mean()
+        # Downsample after smoothing so the trend reflects every bucket
+        points = self._downsample_points(pivot, max_points)
+        pivot = pivot.iloc[points]
+        moving_avg = moving_avg.iloc[points]
         colors = ['#667eea', '#764ba2', '#f093fb', '#f5576c', '#4facfe', '#00f2fe']
         
-        for i, category in enumerate(categories):
-            category_data = df[df['category'] == category]
-            daily_totals = category_data.groupby('date')['amount'].sum()
-            
-            data = [daily_totals.get(date, 0) for date in dates]
-            
-            # Calculate 7-day moving average
-            moving_avg = []
-            for j in range(len(data)):
-                start_idx = max(0, j - 6)
-                window = data[start_idx:j+1]
-                moving_avg.append(np.mean(window))
-            
+        datasets = []
+        for i, category in enumerate(pivot.columns):
             datasets.append({
                 "label": f"{category} (Actual)",
-                "data": data,
+                "data": self._to_amounts(pivot[category]),
                 "borderColor": colors[i % len(colors)],
                 "backgroundColor": colors[i % len(colors)] + '40',
                 "type": "line"
@@ -445,7 +690,7 @@ class AnalyticsService:
             
             datasets.append({
                 "label": f"{category} (Trend)",
-                "data": moving_avg,
+                "data": self._to_amounts(moving_avg[category]),
                 "borderColor": colors[i % len(colors)],
                 "backgroundColor": colors[i % len(colors)] + '20',
                 "type": "line",
@@ -453,14 +698,16 @@ class AnalyticsService:
             })
         
         return {
-            "labels": [date.strftime('%Y-%m-%d') for date in dates],
+            "labels": self._get_date_labels(pivot),
             "datasets": datasets
         }
 
-    def _get_comparison_chart_data(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _get_comparison_chart_data(self, df: "pd.DataFrame") -> Dict[str, Any]:
         """Generate month-over-month comparison chart data"""
-        df['month'] = df['date'].dt.to_period('M')
-        monthly_data = df.groupby(['month', 'category'])['amount'].sum().unstack(fill_value=0)
+        import pandas as pd
+
+        months = pd.to_datetime(df['date']).dt.to_period('M')
+        monthly_data = df.groupby([months.rename('month'), 'category'])['amount_cents'].sum().unstack(fill_value=0)
         
         datasets = []
         colors = ['#667eea', '#764ba2', '#f093fb', '#f5576c', '#4facfe', '#00f2fe']
@@ -468,7 +715,7 @@ class AnalyticsService:
         for i, category in enumerate(monthly_data.columns):
             datasets.append({
                 "label": category,
-                "data": monthly_data[category].values.tolist(),
+                "data": self._to_amounts(monthly_data[category]),
                 "backgroundColor": colors[i % len(colors)]
             })
         
@@ -0,0 +1,321 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, insert, select
+from datetime import datetime, date, timedelta
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+import math
+import os
+
+from ..database import dialect_insert
+from ..models import CategoryStats, DataVersion, Transaction
+from ..schemas import Anomaly, AnomaliesResponse, from_cents
+from .category_dictionary import category_dictionary
+from .response_cache import bump_data_versions
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Categories with fewer transactions than this are never flagged
+ANOMALY_MIN_COUNT = int(os.getenv("ANOMALY_MIN_COUNT", "10"))
+# Days checked when no dates are given, ending at the user's latest transaction
+ANOMALY_WINDOW_DAYS = int(os.getenv("ANOMALY_WINDOW_DAYS", "30"))
+
+# Percentile estimates are within 1% of the true amount: bucket i holds
+# amounts in (gamma^(i-1), gamma^i] cents
+SKETCH_ACCURACY = 0.01
+SKETCH_GAMMA = (1 + SKETCH_ACCURACY) / (1 - SKETCH_ACCURACY)
+_LOG_GAMMA = math.log(SKETCH_GAMMA)
+
+# (count, mean, M2) as in Welford's algorithm; M2 is the sum of squared deviations from the mean
+Moments = Tuple[int, float, float]
+NO_MOMENTS: Moments = (0, 0.0, 0.0)
+
+# (user_id, category_id) -> {'added': Moments, 'removed': Moments, 'buckets': {bucket: count delta}}
+StatsDeltas = Dict[Tuple[int, int], Dict[str, Any]]
+
+def welford_add(moments: Moments, value: float) -> Moments:
+    """Add one observation"""
+    count, mean, m2 = moments
+    count += 1
+    delta = value - mean
+    mean += delta / count
+    return count, mean, m2 + delta * (value - mean)
+
+def merge_moments(a: Moments, b: Moments) -> Moments:
+    """Moments of the union of two disjoint samples (Chan et al.)"""
+    count = a[0] + b[0]
+    if count == 0:
+        return NO_MOMENTS
+    delta = b[1] - a[1]
+    mean = a[1] + delta * b[0] / count
+    return count, mean, a[2] + b[2] + delta * delta * a[0] * b[0] / count
+
+def remove_moments(total: Moments, part: Moments) -> Moments:
+    """Moments of `total` without the sub-sample `part`; the inverse of merge_moments"""
+    count = total[0] - part[0]
+    if count <= 0:
+        return NO_MOMENTS
+    if part[0] == 0:
+        return total
+    mean = (total[0] * total[1] - part[0] * part[1]) / count
+    delta = part[1] - mean
+    m2 = total[2] - part[2] - delta * delta * count * part[0] / total[0]
+    return count, mean, max(m2, 0.0)
+
+def sketch_bucket(cents: int) -> int:
+    return math.ceil(math.log(max(cents, 1)) / _LOG_GAMMA)
+
+def sketch_quantile(sketch: Dict[str, int], quantile: float) -> Optional[float]:
+    """Estimated amount in cents at `quantile` (0-1) of the sketched amounts"""
+    buckets = sorted((int(bucket), count) for bucket, count in sketch.items() if count > 0)
+    total = sum(count for _, count in buckets)
+    if total == 0:
+        return None
+    rank = quantile * (total - 1)
+    seen = 0
+    for bucket, count in buckets:
+        seen += count
+        if seen > rank:
+            break
+    # Midpoint of the bucket in relative terms, so the error is at most SKETCH_ACCURACY
+    return 2 * SKETCH_GAMMA ** bucket / (SKETCH_GAMMA + 1)
+
+class AnomalyService:
+    """Streaming per-user, per-category amount statistics and the anomaly check on top.
+
+    Each category keeps Welford moments and a log-bucketed quantile sketch
+    of its amounts. Adding or removing a transaction is one Welford step and
+    one bucket update, so flagging a transaction never rescans history; only
+    rebuild() reads every row. Like RollupService nothing here commits:
+    updates are staged on the caller's session with the transaction writes.
+    """
+
+    def add(self, deltas: StatsDeltas, user_id: Optional[int], category_id: int, amount_cents: int, sign: int = 1) -> None:
+        """Accumulate one amount joining (sign=1) or leaving (sign=-1) a category"""
+        if user_id is None:
+            return
+        delta = deltas.setdefault((user_id, category_id), {'added': NO_MOMENTS, 'removed': NO_MOMENTS, 'buckets': {}})
+        side = 'added' if sign > 0 else 'removed'
+        delta[side] = welford_add(delta[side], amount_cents)
+        bucket = sketch_bucket(amount_cents)
+        delta['buckets'][bucket] = delta['buckets'].get(bucket, 0) + sign
+
+    def add_to_deltas(self, deltas: StatsDeltas, transaction: Any, sign: int = 1) -> None:
+        self.add(deltas, transaction.user_id, transaction.category_id, int(transaction.amount_cents), sign)
+
+    def add_frame(self, deltas: StatsDeltas, user_id: Optional[int], rows: "pd.DataFrame") -> None:
+        """Accumulate a batch of new rows (category_id, amount_cents) with per-category group moments"""
+        if user_id is None or rows.empty:
+            return
+        amounts = rows['amount_cents'].astype('float64')
+        grouped = amounts.groupby(rows['category_id'])
+        counts = grouped.count()
+        means = grouped.mean()
+        m2s = grouped.var(ddof=0) * counts
+        for category_id, count, mean, m2 in zip(counts.index, counts, means, m2s):
+            delta = deltas.setdefault((user_id, int(category_id)), {'added': NO_MOMENTS, 'removed': NO_MOMENTS, 'buckets': {}})
+            delta['added'] = merge_moments(delta['added'], (int(count), float(mean), float(m2)))
+
+        buckets = rows['amount_cents'].map(sketch_bucket)
+        for (category_id, bucket), count in buckets.groupby([rows['category_id'], buckets]).size().items():
+            delta_buckets = deltas[(user_id, int(category_id))]['buckets']
+            delta_buckets[int(bucket)] = delta_buckets.get(int(bucket), 0) + int(count)
+
+    def record_added(self, db: Session, transactions: Iterable[Any]) -> None:
+        """Stage stat updates for newly added transactions"""
+        deltas: StatsDeltas = {}
+        for transaction in transactions:
+            self.add_to_deltas(deltas, transaction, 1)
+        self.apply(db, deltas)
+
+    def record_removed(self, db: Session, transactions: Iterable[Any]) -> None:
+        """Stage stat updates for deleted transactions"""
+        deltas: StatsDeltas = {}
+        for transaction in transactions:
+            self.add_to_deltas(deltas, transaction, -1)
+        self.apply(db, deltas)
+
+    def _lock_stats(self, db: Session, user_id: int, category_ids: List[int]) -> List[CategoryStats]:
+        """Load the stats rows for a merge, locked until the caller's transaction ends.
+
+        Missing rows are inserted empty first so a category's first writers
+        also queue on its row; on SQLite that insert takes the write lock.
+        """
+        # Rows changed by an earlier apply() on this session must be in the table first
+        db.flush()
+        upsert = dialect_insert(db)
+        if upsert is not None:
+            db.execute(
+                upsert(CategoryStats).on_conflict_do_nothing(index_elements=['user_id', 'category_id']),
+                [{'user_id': user_id, 'category_id': category_id, 'count': 0, 'mean': 0.0, 'm2': 0.0, 'sketch': {}}
+                 for category_id in category_ids]
+            )
+        return db.query(CategoryStats).filter(
+            CategoryStats.user_id == user_id,
+            CategoryStats.category_id.in_(category_ids)
+        ).order_by(CategoryStats.category_id).with_for_update().all()
+
+    def apply(self, db: Session, deltas: StatsDeltas) -> None:
+        """Fold accumulated deltas into the stored stats, one row per touched category"""
+        by_user: Dict[int, Dict[int, Dict[str, Any]]] = {}
+        for (user_id, category_id), delta in deltas.items():
+            by_user.setdefault(user_id, {})[category_id] = delta
+
+        for user_id, user_deltas in by_user.items():
+            existing = {
+                row.category_id: row
+                for row in self._lock_stats(db, user_id, sorted(user_deltas))
+            }
+            for category_id, delta in sorted(user_deltas.items()):
+                row = existing.get(category_id)
+                moments = NO_MOMENTS if row is None else (row.count, row.mean, row.m2)
+                moments = remove_moments(merge_moments(moments, delta['added']), delta['removed'])
+                sketch = dict(row.sketch) if row is not None else {}
+                for bucket, change in delta['buckets'].items():
+                    count = sketch.get(str(bucket), 0) + change
+                    if count > 0:
+                        sketch[str(bucket)] = count
+                    else:
+                        sketch.pop(str(bucket), None)
+
+                if moments[0] <= 0:
+                    if row is not None:
+                        db.delete(row)
+                elif row is None:
+                    db.add(CategoryStats(
+                        user_id=user_id, category_id=category_id,
+                        count=moments[0], mean=moments[1], m2=moments[2], sketch=sketch
+                    ))
+                else:
+                    row.count, row.mean, row.m2 = moments
+                    row.sketch = sketch
+
+    def rebuild(self, db: Session, user_id: Optional[int] = None) -> Dict[str, int]:
+        """Recompute the stats from the transactions table in one vectorized pass"""
+        import pandas as pd
+
+        query = select(Transaction.user_id, Transaction.category_id, Transaction.amount_cents).where(
+            Transaction.user_id.isnot(None)
+        )
+        delete = db.query(CategoryStats)
+        if user_id is not None:
+            query = query.where(Transaction.user_id == user_id)
+            delete = delete.filter(CategoryStats.user_id == user_id)
+        delete.delete(synchronize_session=False)
+
+        frame = pd.DataFrame(db.execute(query).all(), columns=['user_id', 'category_id', 'amount_cents'])
+        rows = []
+        if not frame.empty:
+            keys = ['user_id', 'category_id']
+            amounts = frame['amount_cents'].astype('float64')
+            grouped = amounts.groupby([frame['user_id'], frame['category_id']])
+            counts = grouped.count()
+            moments = pd.DataFrame({'count': counts, 'mean': grouped.mean(), 'm2': grouped.var(ddof=0) * counts})
+
+            frame['bucket'] = frame['amount_cents'].map(sketch_bucket)
+            sketches: Dict[Tuple[int, int], Dict[str, int]] = {}
+            for (row_user, category_id, bucket), count in frame.groupby(keys + ['bucket']).size().items():
+                sketches.setdefault((row_user, category_id), {})[str(bucket)] = int(count)
+
+            rows = [{
+                'user_id': int(row_user),
+                'category_id': int(category_id),
+                'count': int(count),
+                'mean': float(mean),
+                'm2': float(m2),
+                'sketch': sketches[(row_user, category_id)]
+            } for (row_user, category_id), (count, mean, m2) in zip(moments.index, moments.itertuples(index=False, name=None))]
+            db.execute(insert(CategoryStats), rows)
+
+        if user_id is None:
+            db.query(DataVersion).update({DataVersion.version: DataVersion.version + 1}, synchronize_session=False)
+        else:
+            bump_data_versions(db, [user_id])
+        return {"categories": len(rows)}
+
+    async def get_anomalies(
+        self,
+        db: AsyncSession,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        categories: Optional[List[str]] = None,
+        user_id: Optional[int] = None,
+        z_threshold: float = 3.0,
+        percentile: float = 0.99
+    ) -> AnomaliesResponse:
+        """Flag transactions far above their category's usual amounts.
+
+        A transaction is flagged when it is at least `z_threshold` standard
+        deviations above its category mean and above the category's
+        `percentile` amount. Categories with fewer than ANOMALY_MIN_COUNT
+        transactions are skipped. Without dates, the last
+        ANOMALY_WINDOW_DAYS days up to the user's latest transaction are
+        checked.
+        """
+        return await db.run_sync(
+            self._get_anomalies, start_date, end_date, categories, user_id, z_threshold, percentile
+        )
+
+    def _get_anomalies(
+        self,
+        db: Session,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        categories: Optional[List[str]] = None,
+        user_id: Optional[int] = None,
+        z_threshold: float = 3.0,
+        percentile: float = 0.99
+    ) -> AnomaliesResponse:
+        start = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date else None
+        end = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else None
+        if start is None and end is None:
+            end = db.query(func.max(Transaction.date)).filter(Transaction.user_id == user_id).scalar()
+            if end is None:
+                return AnomaliesResponse(anomalies=[])
+            start = end - timedelta(days=ANOMALY_WINDOW_DAYS - 1)
+
+        stats = db.query(CategoryStats).filter(
+            CategoryStats.user_id == user_id,
+            CategoryStats.count >= max(ANOMALY_MIN_COUNT, 2)
+        )
+        category_ids = category_dictionary.lookup(db, categories)
+        if category_ids is not None:
+            stats = stats.filter(CategoryStats.category_id.in_(category_ids))
+
+        # category_id -> (mean, standard deviation, percentile amount, flagging threshold) in cents
+        cutoffs: Dict[int, Tuple[float, float, float, float]] = {}
+        for row in stats:
+            std = math.sqrt(row.m2 / (row.count - 1))
+            quantile = sketch_quantile(row.sketch, percentile)
+            if std > 0 and quantile is not None:
+                cutoffs[row.category_id] = (row.mean, std, quantile, max(row.mean + z_threshold * std, quantile))
+        if not cutoffs:
+            return AnomaliesResponse(start_date=start, end_date=end, anomalies=[])
+
+        query = db.query(Transaction).filter(
+            Transaction.user_id == user_id,
+            Transaction.category_id.in_(cutoffs),
+            Transaction.amount_cents >= min(cutoff[3] for cutoff in cutoffs.values())
+        )
+        if start is not None:
+            query = query.filter(Transaction.date >= start)
+        if end is not None:
+            query = query.filter(Transaction.date <= end)
+
+        anomalies = []
+        for transaction in query:
+            mean, std, quantile, threshold = cutoffs[transaction.category_id]
+            if transaction.amount_cents < threshold:
+                continue
+            anomalies.append(Anomaly(
+                id=transaction.id,
+                date=transaction.date,
+                category=transaction.category,
+                amount=transaction.amount,
+                description=transaction.description,
+                z_score=round((transaction.amount_cents - mean) / std, 2),
+                category_mean=from_cents(round(mean)),
+                category_percentile=from_cents(round(quantile))
+            ))
+        anomalies.sort(key=lambda anomaly: (-anomaly.z_score, anomaly.id))
+        return AnomaliesResponse(start_date=start, end_date=end, anomalies=anomalies)
@@ -0,0 +1,100 @@
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, List, Optional
+import threading
+
+from ..database import dialect_insert
+from ..models import Category
+
+class CategoryDictionary:
+    """Process-wide two-way map between category names and their ids.
+
+    An id never changes once assigned, so entries never go stale and are
+    kept for the life of the process. Names or ids not known here are read
+    from the categories table; ids(create=True) inserts missing names on
+    the caller's session, and those are only remembered once it commits,
+    even if the same transaction reads them back before then.
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def _remember(self, pairs: Iterable) -> None:
+        with self._lock:
+            for category_id, name in pairs:
+                self._ids[name] = category_id
+                self._names[category_id] = name
+
+    def _remember_read(self, db: Session, rows: Iterable) -> None:
+        """Remember rows read on the session, except those its open transaction inserted"""
+        uncommitted = {category_id for category_id, _ in db.info.get('new_categories', ())}
+        self._remember((row.id, row.name) for row in rows if row.id not in uncommitted)
+
+    def _insert_missing(self, db: Session, names: List[str]) -> None:
+        # Concurrent writers may add the same name; let the unique index decide
+        upsert = dialect_insert(db)
+        if upsert is None:
+            db.execute(insert(Category), [{'name': name} for name in names])
+            return
+        db.execute(upsert(Category).on_conflict_do_nothing(index_elements=['name']), [{'name': name} for name in names])
+
+    def ids(self, db: Session, names: Iterable[str], create: bool = False) -> Dict[str, int]:
+        """Map names to ids; unknown names are left out unless `create` adds them"""
+        wanted = set(names)
+        with self._lock:
+            found = {name: self._ids[name] for name in wanted if name in self._ids}
+        missing = wanted - found.keys()
+        if not missing:
+            return found
+
+        rows = db.query(Category.id, Category.name).filter(Category.name.in_(missing)).all()
+        self._remember_read(db, rows)
+        found.update((row.name, row.id) for row in rows)
+        if create and len(rows) < len(missing):
+            self._insert_missing(db, sorted(missing - found.keys()))
+            created = db.query(Category.id, Category.name).filter(Category.name.in_(missing - found.keys())).all()
+            # Rows inserted here vanish if the caller rolls back
+            db.info.setdefault('new_categories', []).extend((row.id, row.name) for row in created)
+            found.update((row.name, row.id) for row in created)
+        return found
+
+    def id_for(self, db: Session, name: str) -> int:
+        """The id for one name, creating the category if needed"""
+        return self.ids(db, [name], create=True)[name]
+
+    def lookup(self, db: Session, names: Optional[List[str]]) -> Optional[List[int]]:
+        """Ids for a category filter: None for no filter, [] when no name exists"""
+        if not names:
+            return None
+        return sorted(self.ids(db, names).values())
+
+    def names(self, db: Session, category_ids: Iterable[int]) -> Dict[int, str]:
+        """Map ids to names"""
+        wanted = set(category_ids)
+        with self._lock:
+            found = {category_id: self._names[category_id] for category_id in wanted if category_id in self._names}
+        missing = wanted - found.keys()
+        if missing:
+            rows = db.query(Category.id, Category.name).filter(Category.id.in_(missing)).all()
+            self._remember_read(db, rows)
+            found.update((row.id, row.name) for row in rows)
+        return found
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ids.clear()
+            self._names.clear()
+
+category_dictionary = CategoryDictionary()
+
+@event.listens_for(Session, "after_commit")
+def _remember_committed_categories(session: Session) -> None:
+    pairs = session.info.pop('new_categories', None)
+    if pairs:
+        category_dictionary._remember(pairs)
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_categories(session: Session) -> None:
+    session.info.pop('new_categories', None)
@@ -0,0 +1,198 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from io import StringIO
+from typing import TYPE_CHECKING, Any, BinaryIO, Callable, Dict, List, Optional, Union
+import csv
+import time
+
+from ..models import Transaction
+from .rollup_service import RollupService
+from .category_dictionary import category_dictionary
+from .anomaly_service import AnomalyService
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+REQUIRED_COLUMNS = {'date', 'category', 'amount'}
+DATE_FORMATS = ("%Y-%m-%d", "%Y/%m/%d")
+MAX_REPORTED_ERRORS = 100
+INSERT_COLUMNS = ('user_id', 'date', 'category_id', 'amount_cents', 'description')
+# Rows per multi-row INSERT on SQLite; 5 parameters each stays under its bound parameter limit
+INSERT_BATCH_SIZE = 1000
+
+class CSVImportError(ValueError):
+    """The CSV cannot be imported at all (as opposed to individual bad rows)"""
+
+class ImportService:
+    """Chunked, vectorized CSV ingest with bulk inserts"""
+
+    def __init__(self):
+        self.rollup_service = RollupService()
+        self.anomaly_service = AnomalyService()
+
+    def _parse_dates(self, values: "pd.Series") -> "pd.Series":
+        """Parse dates in any of DATE_FORMATS (time parts are ignored); unparseable values become NaT"""
+        import pandas as pd
+
+        raw = values.astype(str).str.strip().str[:10]
+        parsed = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+        for date_format in DATE_FORMATS:
+            missing = parsed.isna()
+            if not missing.any():
+                break
+            parsed[missing] = pd.to_datetime(raw[missing], format=date_format, errors='coerce')
+        return parsed
+
+    def _prepare_chunk(
+        self,
+        db: Session,
+        chunk: "pd.DataFrame",
+        user_id: Optional[int],
+        errors: List[Dict[str, Any]],
+        row_offset: int = 0
+    ) -> "pd.DataFrame":
+        """Turn a raw CSV chunk into insertable columns, recording rows that fail to parse and adding new categories"""
+        import pandas as pd
+
+        dates = self._parse_dates(chunk['date'])
+        # Whole cents, rounded half up like schemas.to_cents: the inner round
+        # absorbs binary error (1.005 * 100 == 100.49999...). Anything that
+        # rounds to less than a cent is rejected.
+        cents = ((pd.to_numeric(chunk['amount'], errors='coerce') * 100).round(6) + 0.5) // 1
+
+        bad_date = dates.isna()
+        bad_amount = ~bad_date & (cents.isna() | (cents <= 0))
+        for index in chunk.index[bad_date | bad_amount]:
+            if len(errors) >= MAX_REPORTED_ERRORS:
+                break
+            # +2: one for the header line, one for 1-based line numbers
+            row = row_offset + int(index) + 2
+            if bad_date[index]:
+                errors.append({"row": row, "error": f"invalid date {chunk.at[index, 'date']!r}"})
+            else:
+                errors.append({"row": row, "error": f"invalid amount {chunk.at[index, 'amount']!r}"})
+
+        valid = ~(bad_date | bad_amount)
+        categories = chunk.loc[valid, 'category']
+        categories = categories.where(categories.notna(), 'Uncategorized').astype(str).str.slice(0, 100)
+        category_ids = category_dictionary.ids(db, categories.unique(), create=True)
+        if 'description' in chunk.columns:
+            descriptions = chunk.loc[valid, 'description']
+            descriptions = descriptions.astype(object).where(descriptions.notna(), None)
+            descriptions = descriptions.map(lambda d: None if d is None else str(d)[:500])
+        else:
+            descriptions = None
+
+        return pd.DataFrame({
+            'user_id': user_id,
+            'date': dates[valid].dt.date,
+            'category_id': categories.map(category_ids).astype('int64'),
+            'amount_cents': cents[valid].astype('int64'),
+            'description': descriptions
+        })
+
+    def _insert_rows(self, db: Session, rows: "pd.DataFrame") -> None:
+        """Bulk insert prepared rows: COPY on Postgres, multi-row INSERTs on SQLite, executemany elsewhere"""
+        dialect = db.get_bind().dialect.name
+        if dialect == 'postgresql':
+            buffer = StringIO()
+            rows.to_csv(buffer, index=False, header=False, quoting=csv.QUOTE_MINIMAL, na_rep='')
+            buffer.seek(0)
+            cursor = db.connection().connection.cursor()
+            try:
+                cursor.copy_expert(
+                    f"COPY transactions ({', '.join(INSERT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                    buffer
+                )
+            finally:
+                cursor.close()
+        elif dialect == 'sqlite':
+            # One statement per batch rather than per row: the full-text search
+            # triggers (models.TRANSACTION_SEARCH_DDL) flush once per statement
+            values = rows[list(INSERT_COLUMNS)].astype(object)
+            values['date'] = values['date'].map(lambda day: day.isoformat())
+            values = values.where(values.notna(), None).to_numpy()
+            connection = db.connection()
+            for start in range(0, len(values), INSERT_BATCH_SIZE):
+                batch = values[start:start + INSERT_BATCH_SIZE]
+                placeholders = ", ".join(["(" + ", ".join("?" * len(INSERT_COLUMNS)) + ")"] * len(batch))
+                connection.exec_driver_sql(
+                    f"INSERT INTO transactions ({', '.join(INSERT_COLUMNS)}) VALUES {placeholders}",
+                    tuple(batch.ravel())
+                )
+        else:
+            records = rows.astype(object).where(rows.notna(), None).to_dict('records')
+            db.execute(insert(Transaction), records)
+
+    def import_csv(
+        self,
+        db: Session,
+        source: Union[str, BinaryIO],
+        user_id: Optional[int] = None,
+        chunk_size: int = 50000,
+        skip_rows: int = 0,
+        on_chunk: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """Import a transactions CSV in chunks and stage it on the session.
+
+        Columns are matched case-insensitively; `date`, `category` and
+        `amount` are required and `description` is optional. Rows that fail
+        to parse are skipped and reported. Nothing is committed here: the
+        rows and their rollup and category stat updates land in the caller's
+        transaction.
+
+        `on_chunk` is called after each chunk is staged with the progress so
+        far (`rows_read` counts data rows consumed, including `skip_rows`);
+        a caller that commits there can resume later by passing `rows_read`
+        back as `skip_rows`.
+        """
+        # pandas is slow to import; only pay for it once a CSV arrives
+        import pandas as pd
+
+        started = time.perf_counter()
+        try:
+            reader = pd.read_csv(
+                source, chunksize=chunk_size, encoding='utf-8-sig', dtype=str, keep_default_na=False, na_values=[''],
+                skiprows=range(1, skip_rows + 1) if skip_rows else None
+            )
+        except pd.errors.EmptyDataError:
+            raise CSVImportError("CSV file is empty")
+
+        imported = 0
+        failed = 0
+        rows_read = skip_rows
+        errors: List[Dict[str, Any]] = []
+        with reader:
+            for chunk in reader:
+                chunk.columns = chunk.columns.str.strip().str.lower()
+                if not REQUIRED_COLUMNS.issubset(set(chunk.columns)):
+                    raise CSVImportError(f"CSV must include columns: {REQUIRED_COLUMNS}")
+
+                rows = self._prepare_chunk(db, chunk, user_id, errors, skip_rows)
+                rows_read += len(chunk)
+                failed += len(chunk) - len(rows)
+                if not rows.empty:
+                    self._insert_rows(db, rows)
+                    imported += len(rows)
+
+                    deltas = {}
+                    grouped = rows.groupby(['date', 'category_id'])['amount_cents'].agg(['sum', 'count'])
+                    for (day, category), total, count in zip(grouped.index, grouped['sum'], grouped['count']):
+                        deltas[(user_id, day, int(category))] = [int(total), int(count)]
+                    self.rollup_service.apply(db, deltas)
+
+                    stats_deltas = {}
+                    self.anomaly_service.add_frame(stats_deltas, user_id, rows)
+                    self.anomaly_service.apply(db, stats_deltas)
+
+                if on_chunk is not None:
+                    on_chunk({"rows_read": rows_read, "imported": imported, "failed": failed, "errors": errors})
+
+        seconds = time.perf_counter() - started
+        return {
+            "imported": imported,
+            "failed": failed,
+            "errors": errors,
+            "seconds": round(seconds, 3),
+            "rows_per_second": round(imported / seconds, 1) if seconds > 0 else None
+        }
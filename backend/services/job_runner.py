@@ -0,0 +1,261 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, or_
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Set
+import logging
+import os
+import threading
+
+from ..models import Job
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_QUEUE_LIMIT = int(os.getenv("JOB_QUEUE_LIMIT", "100"))
+# A running job whose lease is this long overdue is taken over by another worker
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+
+logger = logging.getLogger(__name__)
+
+# handler(db, job) does the work, advancing job.checkpoint/rows_* and
+# committing as it goes; it must be able to resume from job.checkpoint and
+# call JobRunner.check_lease() just before each commit
+JobHandler = Callable[[Session, Job], None]
+
+class JobQueueFull(RuntimeError):
+    """Too many jobs are waiting for a worker"""
+
+class LeaseLost(RuntimeError):
+    """Another worker has taken over the job"""
+
+class _Lease:
+    """The lease this process holds on a running job"""
+
+    def __init__(self, expires: datetime):
+        self.expires = expires
+        # Expiry a heartbeat is writing; until it commits either value may be in the row
+        self.renewing: Optional[datetime] = None
+        self.lost = threading.Event()
+
+    def held(self) -> List[datetime]:
+        if self.lost.is_set():
+            return []
+        return [expiry for expiry in (self.expires, self.renewing) if expiry is not None]
+
+class JobRunner:
+    """In-process background jobs backed by the jobs table.
+
+    A bounded thread pool runs the registered handler for each job kind.
+    Handlers commit their progress and checkpoint with the work it covers.
+    A running job holds a lease that a heartbeat thread renews every third
+    of `lease_seconds`; jobs whose lease ran out (their worker died) are
+    requeued and resumed from their last checkpoint, by start() and by the
+    heartbeat, while jobs another live worker is running are left alone.
+    A worker that loses its lease stops at the handler's next checkpoint
+    and leaves the job to its new owner.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        max_workers: int = JOB_WORKERS,
+        max_queued: int = JOB_QUEUE_LIMIT,
+        lease_seconds: float = JOB_LEASE_SECONDS
+    ):
+        self.session_factory = session_factory
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.lease_seconds = lease_seconds
+        self._handlers: Dict[str, JobHandler] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Set[int] = set()
+        # job id -> lease held on the jobs running here
+        self._leases: Dict[int, _Lease] = {}
+        self._heartbeat: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        self._handlers[kind] = handler
+
+    def enqueue(self, db: Session, user_id: int, kind: str, params: Optional[Dict[str, Any]] = None) -> Job:
+        """Create and commit a job row, then hand it to a worker"""
+        if kind not in self._handlers:
+            raise ValueError(f"unknown job kind {kind!r}")
+        with self._lock:
+            if len(self._pending) >= self.max_workers + self.max_queued:
+                raise JobQueueFull("Too many jobs queued; try again later")
+        job = Job(user_id=user_id, kind=kind, status="queued", params=params or {}, rows_processed=0, rows_failed=0)
+        db.add(job)
+        db.commit()
+        self._submit(job.id)
+        return job
+
+    def find_active(self, db: Session, user_id: int, kind: str) -> Optional[Job]:
+        """The user's queued or running job of this kind, if any"""
+        return db.query(Job).filter(
+            Job.user_id == user_id, Job.kind == kind, Job.status.in_(("queued", "running"))
+        ).order_by(Job.id).first()
+
+    def check_lease(self, db: Session, job: Job) -> None:
+        """Raise LeaseLost unless this worker still holds the job's lease.
+
+        Handlers call this just before committing a checkpoint. It touches the
+        job row in the handler's transaction, so a takeover either lands
+        first (and the checkpoint is rolled back) or waits for the commit.
+        """
+        if not self._update_held(db, job.id, {Job.lease_expires_at: Job.lease_expires_at}):
+            raise LeaseLost(f"Job {job.id} was taken over by another worker")
+
+    def _update_held(self, db: Session, job_id: int, values: Dict[Any, Any]) -> bool:
+        """Update the job row if this worker still holds its lease"""
+        held: Optional[List[datetime]] = None
+        while True:
+            with self._lock:
+                lease = self._leases.get(job_id)
+                current = lease.held() if lease is not None else []
+            # The heartbeat may have renewed the lease since we last read it;
+            # the row always has one of the values we hold, so only a miss on
+            # an unchanged lease means it was lost
+            if not current or current == held:
+                return False
+            held = current
+            if db.query(Job).filter(
+                Job.id == job_id, Job.status == "running", Job.lease_expires_at.in_(held)
+            ).update(values, synchronize_session=False):
+                return True
+
+    def start(self) -> int:
+        """Requeue and submit unfinished jobs nobody holds a lease on; returns how many were submitted"""
+        with self._lock:
+            self._start_heartbeat()
+        return self._reclaim()
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+            heartbeat, self._heartbeat = self._heartbeat, None
+            self._stopping.set()
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+        if heartbeat is not None and wait:
+            heartbeat.join()
+
+    def _lease_expiry(self) -> datetime:
+        return datetime.now(timezone.utc) + timedelta(seconds=self.lease_seconds)
+
+    def _start_heartbeat(self) -> None:
+        # Caller holds self._lock
+        if self._heartbeat is not None:
+            return
+        self._stopping = threading.Event()
+        self._heartbeat = threading.Thread(target=self._beat, args=(self._stopping,), name="job-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    def _beat(self, stopping: threading.Event) -> None:
+        while not stopping.wait(self.lease_seconds / 3):
+            try:
+                self._renew_leases()
+                self._reclaim()
+            except Exception:
+                logger.exception("Job heartbeat failed")
+
+    def _renew_leases(self) -> None:
+        """Extend the lease on every job running here, unless another worker has taken it over"""
+        with self._lock:
+            held = {job_id: lease for job_id, lease in self._leases.items() if not lease.lost.is_set()}
+            for lease in held.values():
+                lease.renewing = self._lease_expiry()
+        if not held:
+            return
+        db = self.session_factory()
+        try:
+            renewed = {}
+            for job_id, lease in held.items():
+                # Compare-and-set on the lease we wrote: a job requeued and claimed elsewhere has a different one
+                renewed[job_id] = db.query(Job).filter(
+                    Job.id == job_id, Job.status == "running", Job.lease_expires_at == lease.expires
+                ).update({Job.lease_expires_at: lease.renewing}, synchronize_session=False)
+            db.commit()
+        except Exception:
+            with self._lock:
+                for lease in held.values():
+                    lease.renewing = None
+            raise
+        finally:
+            db.close()
+        with self._lock:
+            for job_id, lease in held.items():
+                if renewed[job_id]:
+                    lease.expires = lease.renewing
+                else:
+                    # Also the case for a job that just finished; its handler reports a real loss
+                    lease.lost.set()
+                lease.renewing = None
+
+    def _reclaim(self) -> int:
+        """Requeue running jobs whose lease has expired, then submit every queued job"""
+        db = self.session_factory()
+        try:
+            # Jobs without a lease were started by a worker that never renewed one
+            db.query(Job).filter(
+                Job.status == "running",
+                or_(Job.lease_expires_at.is_(None), Job.lease_expires_at < datetime.now(timezone.utc))
+            ).update({Job.status: "queued", Job.lease_expires_at: None}, synchronize_session=False)
+            db.commit()
+            job_ids = [job_id for (job_id,) in db.query(Job.id).filter(Job.status == "queued").order_by(Job.id)]
+        finally:
+            db.close()
+        for job_id in job_ids:
+            self._submit(job_id)
+        return len(job_ids)
+
+    def _submit(self, job_id: int) -> None:
+        with self._lock:
+            if job_id in self._pending:
+                return
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+            self._start_heartbeat()
+            self._pending.add(job_id)
+            self._executor.submit(self._run, job_id)
+
+    def _run(self, job_id: int) -> None:
+        db = self.session_factory()
+        try:
+            # Claim the job (another process that got here first wins), keeping
+            # the original start time when it is being resumed
+            lease = self._lease_expiry()
+            claimed = db.query(Job).filter(Job.id == job_id, Job.status == "queued").update({
+                Job.status: "running",
+                Job.started_at: func.coalesce(Job.started_at, datetime.now(timezone.utc)),
+                Job.lease_expires_at: lease
+            }, synchronize_session=False)
+            db.commit()
+            if not claimed:
+                return
+            with self._lock:
+                self._leases[job_id] = _Lease(lease)
+            job = db.get(Job, job_id)
+            try:
+                self._handlers[job.kind](db, job)
+            except LeaseLost:
+                logger.warning("Job %s stopped; another worker has taken it over", job_id)
+                db.rollback()
+                return
+            except Exception as e:
+                logger.exception("Job %s failed", job_id)
+                db.rollback()
+                result = {Job.status: "failed", Job.error: str(e)[:2000]}
+            else:
+                result = {Job.status: "succeeded"}
+            result.update({Job.finished_at: datetime.now(timezone.utc), Job.lease_expires_at: None})
+            # Only the lease holder may finish the job
+            finished = self._update_held(db, job_id, result)
+            db.commit()
+            if not finished:
+                logger.warning("Job %s lost its lease before finishing; leaving it to its new owner", job_id)
+        finally:
+            db.close()
+            with self._lock:
+                self._pending.discard(job_id)
+                self._leases.pop(job_id, None)
@@ -0,0 +1,187 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import delete, insert, update
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from ..models import Transaction, PlaidItem, User
+from ..schemas import to_cents
+from .rollup_service import RollupService, RollupDeltas
+from .category_dictionary import category_dictionary
+from .anomaly_service import AnomalyService, StatsDeltas
+
+# Rows per IN (...) lookup; stays well under SQLite's bound parameter limit
+LOOKUP_BATCH_SIZE = 500
+
+def plaid_category(transaction: Dict[str, Any]) -> str:
+    """Plaid's detailed personal finance category, falling back to the legacy category list"""
+    personal = transaction.get('personal_finance_category')
+    if personal:
+        return str(personal['detailed'])[:100]
+    legacy = transaction.get('category')
+    return str(legacy[0])[:100] if legacy else 'Uncategorized'
+
+def plaid_date(value: Any) -> date:
+    """The SDK returns dates as date objects, raw JSON as ISO strings"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+class PlaidSyncService:
+    """Incremental /transactions/sync ingest.
+
+    Each item's next_cursor is persisted with the page it came from, so a
+    sync picks up where the last committed page left off. Pages are applied
+    as batched upserts keyed on Plaid's transaction_id, which makes
+    replaying a page harmless.
+    """
+
+    def __init__(self, page_size: int = 500):
+        self.page_size = page_size
+        self.rollup_service = RollupService()
+        self.anomaly_service = AnomalyService()
+
+    def link_item(self, db: Session, user_id: int, access_token: str, item_id: Optional[str]) -> PlaidItem:
+        """Record a newly exchanged item (or refresh its token) on the caller's session"""
+        item = None
+        if item_id:
+            item = db.query(PlaidItem).filter(PlaidItem.item_id == item_id).first()
+        if item is None:
+            item = db.query(PlaidItem).filter(PlaidItem.access_token == access_token).first()
+        if item is None:
+            item = PlaidItem(user_id=user_id, item_id=item_id, access_token=access_token)
+            db.add(item)
+        else:
+            item.user_id = user_id
+            item.item_id = item_id or item.item_id
+            item.access_token = access_token
+        return item
+
+    def user_items(self, db: Session, user_id: int) -> List[PlaidItem]:
+        """The user's linked items, adopting a token stored on the user before items existed"""
+        items = db.query(PlaidItem).filter(PlaidItem.user_id == user_id).order_by(PlaidItem.id).all()
+        if not items:
+            access_token = db.query(User.plaid_access_token).filter(User.id == user_id).scalar()
+            if access_token:
+                items = [self.link_item(db, user_id, access_token, None)]
+                db.commit()
+        return items
+
+    def sync_user(
+        self,
+        db: Session,
+        user_id: int,
+        transport: Any,
+        on_page: Optional[Callable[[Dict[str, int]], None]] = None
+    ) -> Dict[str, int]:
+        """Sync every item linked to the user; each page is committed as it arrives.
+
+        `on_page` is called with each page's counts just before it commits,
+        so anything it stages lands in the same transaction.
+        """
+        totals = {"added": 0, "modified": 0, "removed": 0, "pages": 0}
+        for item in self.user_items(db, user_id):
+            for key, value in self.sync_item(db, item, transport, on_page).items():
+                totals[key] += value
+        return totals
+
+    def sync_item(
+        self,
+        db: Session,
+        item: PlaidItem,
+        transport: Any,
+        on_page: Optional[Callable[[Dict[str, int]], None]] = None
+    ) -> Dict[str, int]:
+        totals = {"added": 0, "modified": 0, "removed": 0, "pages": 0}
+        # Pipeline the pages: while page N is written, page N+1 is fetched
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="plaid-prefetch") as prefetch:
+            page = transport.transactions_sync(item.access_token, item.cursor, self.page_size)
+            while True:
+                next_page = None
+                if page['has_more']:
+                    next_page = prefetch.submit(transport.transactions_sync, item.access_token, page['next_cursor'], self.page_size)
+
+                counts = self.apply_page(db, item.user_id, page)
+                item.cursor = page['next_cursor']
+                if on_page is not None:
+                    on_page(counts)
+                db.commit()
+                for key, value in counts.items():
+                    totals[key] += value
+                totals["pages"] += 1
+
+                if next_page is None:
+                    return totals
+                page = next_page.result()
+
+    def apply_page(self, db: Session, user_id: int, page: Dict[str, Any]) -> Dict[str, int]:
+        """Stage one sync page: upsert added/modified, delete removed, update rollups and category stats"""
+        changed = list(page.get('added') or []) + list(page.get('modified') or [])
+        category_ids = category_dictionary.ids(db, {plaid_category(t) for t in changed}, create=True)
+        upserts: Dict[str, Dict[str, Any]] = {}
+        for transaction in changed:
+            upserts[transaction['transaction_id']] = {
+                'user_id': user_id,
+                'date': plaid_date(transaction['date']),
+                'category_id': category_ids[plaid_category(transaction)],
+                'amount_cents': abs(to_cents(transaction['amount'])),
+                'description': str(transaction['name'])[:500] if transaction.get('name') else None,
+                'transaction_id': transaction['transaction_id']
+            }
+        removed_ids = [t['transaction_id'] for t in page.get('removed') or []]
+        for transaction_id in removed_ids:
+            upserts.pop(transaction_id, None)
+
+        existing = self._existing(db, list(upserts) + removed_ids)
+        deltas: RollupDeltas = {}
+        stats_deltas: StatsDeltas = {}
+        inserts = []
+        updates = []
+        for transaction_id, row in upserts.items():
+            current = existing.get(transaction_id)
+            if current is None:
+                inserts.append(row)
+            else:
+                self.rollup_service.add_to_deltas(deltas, current, -1)
+                self.anomaly_service.add_to_deltas(stats_deltas, current, -1)
+                updates.append({'id': current.id, **row})
+            self._add_row_to_deltas(deltas, row)
+            self.anomaly_service.add(stats_deltas, row['user_id'], row['category_id'], row['amount_cents'])
+
+        removed = [existing[t] for t in removed_ids if t in existing]
+        for current in removed:
+            self.rollup_service.add_to_deltas(deltas, current, -1)
+            self.anomaly_service.add_to_deltas(stats_deltas, current, -1)
+
+        if inserts:
+            db.execute(insert(Transaction), inserts)
+        if updates:
+            db.execute(update(Transaction), updates)
+        for batch in self._batches([current.id for current in removed]):
+            db.execute(delete(Transaction).where(Transaction.id.in_(batch)))
+        self.rollup_service.apply(db, deltas)
+        self.anomaly_service.apply(db, stats_deltas)
+        return {"added": len(inserts), "modified": len(updates), "removed": len(removed)}
+
+    def _existing(self, db: Session, transaction_ids: List[str]) -> Dict[str, Any]:
+        existing = {}
+        for batch in self._batches(transaction_ids):
+            rows = db.query(
+                Transaction.id, Transaction.transaction_id, Transaction.user_id,
+                Transaction.date, Transaction.category_id, Transaction.amount_cents
+            ).filter(Transaction.transaction_id.in_(batch))
+            existing.update({row.transaction_id: row for row in rows})
+        return existing
+
+    def _add_row_to_deltas(self, deltas: RollupDeltas, row: Dict[str, Any]) -> None:
+        key = (row['user_id'], row['date'], row['category_id'])
+        delta = deltas.setdefault(key, [0, 0])
+        delta[0] += row['amount_cents']
+        delta[1] += 1
+
+    @staticmethod
+    def _batches(values: List[Any], size: int = LOOKUP_BATCH_SIZE) -> Iterable[List[Any]]:
+        for start in range(0, len(values), size):
+            yield values[start:start + size]
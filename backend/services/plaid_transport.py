@@ -0,0 +1,259 @@
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional
+import logging
+import os
+import random
+import threading
+import time
+import zlib
+
+PLAID_CLIENT_ID = os.getenv('PLAID_CLIENT_ID')
+PLAID_SECRET = os.getenv('PLAID_SECRET')
+PLAID_ENV = os.getenv('PLAID_ENV', 'sandbox')
+PLAID_PRODUCTS = os.getenv('PLAID_PRODUCTS', 'transactions').split(',')
+PLAID_COUNTRY_CODES = os.getenv('PLAID_COUNTRY_CODES', 'US').split(',')
+PLAID_REDIRECT_URI = os.getenv('PLAID_REDIRECT_URI') or None
+# Per-request timeout in seconds, retries for 429/5xx/network errors, and
+# the size of the pooled HTTP connection to Plaid
+PLAID_TIMEOUT = float(os.getenv('PLAID_TIMEOUT', '30'))
+PLAID_MAX_RETRIES = int(os.getenv('PLAID_MAX_RETRIES', '3'))
+PLAID_POOL_SIZE = int(os.getenv('PLAID_POOL_SIZE', '4'))
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+logger = logging.getLogger(__name__)
+
+FAKE_CATEGORIES = [
+    ("FOOD_AND_DRINK", "FOOD_AND_DRINK_GROCERIES"),
+    ("FOOD_AND_DRINK", "FOOD_AND_DRINK_RESTAURANT"),
+    ("TRANSPORTATION", "TRANSPORTATION_GAS"),
+    ("RENT_AND_UTILITIES", "RENT_AND_UTILITIES_RENT"),
+    ("GENERAL_MERCHANDISE", "GENERAL_MERCHANDISE_ONLINE_MARKETPLACES"),
+    ("ENTERTAINMENT", "ENTERTAINMENT_TV_AND_MOVIES"),
+]
+
+class PlaidNotConfigured(RuntimeError):
+    """PLAID_CLIENT_ID / PLAID_SECRET are not set"""
+
+class PlaidTransport:
+    """The Plaid calls the app makes, returning plain dicts.
+
+    The SDK client is built on first use, so the app starts without Plaid
+    credentials. Calls are blocking: they share one pooled HTTP connection,
+    time out after `timeout` seconds and are retried with exponential
+    backoff on rate limits, 5xx responses and network errors. Async code
+    should run them in a thread. FakePlaidTransport implements the same
+    methods without network access.
+    """
+
+    def __init__(
+        self,
+        client: Any = None,
+        timeout: float = PLAID_TIMEOUT,
+        max_retries: int = PLAID_MAX_RETRIES,
+        backoff: float = 0.5
+    ):
+        self._client = client
+        self._lock = threading.Lock()
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    @property
+    def client(self) -> Any:
+        with self._lock:
+            if self._client is None:
+                self._client = self._build_client()
+            return self._client
+
+    def _build_client(self) -> Any:
+        if not PLAID_CLIENT_ID or not PLAID_SECRET:
+            raise PlaidNotConfigured("Plaid is not configured (set PLAID_CLIENT_ID and PLAID_SECRET)")
+        import plaid
+        from plaid.api import plaid_api
+
+        configuration = plaid.Configuration(
+            host=plaid.Environment.Sandbox if PLAID_ENV == 'sandbox' else plaid.Environment.Production,
+            api_key={
+                'clientId': PLAID_CLIENT_ID,
+                'secret': PLAID_SECRET,
+                'plaidVersion': '2020-09-14'
+            }
+        )
+        configuration.connection_pool_maxsize = PLAID_POOL_SIZE
+        # Retries are handled in _call, with backoff that also covers HTTP errors
+        configuration.retries = False
+        return plaid_api.PlaidApi(plaid.ApiClient(configuration))
+
+    def _call(self, operation: Callable[..., Any], request: Any) -> Dict[str, Any]:
+        import plaid
+        from urllib3.exceptions import HTTPError
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                return operation(request, _request_timeout=self.timeout).to_dict()
+            except (plaid.ApiException, HTTPError) as e:
+                status = getattr(e, 'status', None)
+                retryable = status is None or status in RETRYABLE_STATUSES
+                if not retryable or attempt == self.max_retries:
+                    raise
+                delay = self.backoff * (2 ** attempt) * random.uniform(1, 1.5)
+                logger.warning("Plaid %s failed (%s); retrying in %.1fs", operation.__name__, status or e, delay)
+                time.sleep(delay)
+
+    def link_token_create(self, client_user_id: str) -> Dict[str, Any]:
+        from plaid.model.country_code import CountryCode
+        from plaid.model.link_token_create_request import LinkTokenCreateRequest
+        from plaid.model.link_token_create_request_user import LinkTokenCreateRequestUser
+        from plaid.model.products import Products
+
+        request = LinkTokenCreateRequest(
+            products=[Products(p) for p in PLAID_PRODUCTS],
+            client_name="Personal Finance Manager",
+            country_codes=[CountryCode(c) for c in PLAID_COUNTRY_CODES],
+            language='en',
+            user=LinkTokenCreateRequestUser(client_user_id=client_user_id)
+        )
+        if PLAID_REDIRECT_URI:
+            request.redirect_uri = PLAID_REDIRECT_URI
+        return self._call(self.client.link_token_create, request)
+
+    def item_public_token_exchange(self, public_token: str) -> Dict[str, Any]:
+        from plaid.model.item_public_token_exchange_request import ItemPublicTokenExchangeRequest
+        request = ItemPublicTokenExchangeRequest(public_token=public_token)
+        return self._call(self.client.item_public_token_exchange, request)
+
+    def transactions_sync(self, access_token: str, cursor: Optional[str], count: int = 500) -> Dict[str, Any]:
+        from plaid.model.transactions_sync_request import TransactionsSyncRequest
+        request = TransactionsSyncRequest(access_token=access_token, cursor=cursor or '', count=count)
+        return self._call(self.client.transactions_sync, request)
+
+class FakePlaidTransport:
+    """In-memory stand-in for Plaid's token exchange and /transactions/sync.
+
+    Every exchanged item starts with a seeded history of transactions; tests
+    can then add, modify and remove transactions and watch them come through
+    the next sync. Cursors are offsets into each item's change log, so a sync
+    resumed from a stored cursor sees exactly the changes it has not applied.
+    `latency` adds a simulated network delay to every sync call.
+    """
+
+    def __init__(self, history_size: int = 250, seed: int = 0, latency: float = 0.0):
+        self.history_size = history_size
+        self.seed = seed
+        self.latency = latency
+        self._items: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def link_token_create(self, client_user_id: str) -> Dict[str, Any]:
+        return {"link_token": f"link-fake-{client_user_id}", "expiration": None, "request_id": "fake-link"}
+
+    def item_public_token_exchange(self, public_token: str) -> Dict[str, Any]:
+        with self._lock:
+            number = len(self._items) + 1
+            access_token = f"access-fake-{number}"
+            item = {
+                "item_id": f"item-fake-{number}",
+                "rng": random.Random(self.seed + zlib.crc32(public_token.encode("utf-8"))),
+                "transactions": {},
+                "log": [],
+                "next_id": 0
+            }
+            self._items[access_token] = item
+            for _ in range(self.history_size):
+                self._add(item, self._generate(item))
+        return {"access_token": access_token, "item_id": item["item_id"], "request_id": f"fake-{number}"}
+
+    def transactions_sync(self, access_token: str, cursor: Optional[str], count: int = 500) -> Dict[str, Any]:
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls += 1
+            item = self._item(access_token)
+            offset = int(cursor) if cursor else 0
+            page = item["log"][offset:offset + count]
+            next_offset = offset + len(page)
+            # Like Plaid, report each transaction at most once per page
+            collapsed: Dict[str, Any] = {}
+            for kind, payload in page:
+                previous = collapsed.get(payload["transaction_id"])
+                if previous and previous[0] == "added":
+                    if kind == "removed":
+                        del collapsed[payload["transaction_id"]]
+                        continue
+                    kind = "added"
+                collapsed[payload["transaction_id"]] = (kind, payload)
+            changes: Dict[str, List[Dict[str, Any]]] = {"added": [], "modified": [], "removed": []}
+            for kind, payload in collapsed.values():
+                changes[kind].append(dict(payload))
+            return {
+                **changes,
+                "next_cursor": str(next_offset),
+                "has_more": next_offset < len(item["log"]),
+                "request_id": f"fake-sync-{self.calls}"
+            }
+
+    def add_transactions(self, access_token: str, count: int = 1, **fields: Any) -> List[Dict[str, Any]]:
+        """Simulate new transactions posting to the item"""
+        with self._lock:
+            item = self._item(access_token)
+            added = []
+            for _ in range(count):
+                transaction = {**self._generate(item), **fields}
+                self._add(item, transaction)
+                added.append(dict(transaction))
+            return added
+
+    def modify_transaction(self, access_token: str, transaction_id: str, **fields: Any) -> Dict[str, Any]:
+        with self._lock:
+            item = self._item(access_token)
+            transaction = {**item["transactions"][transaction_id], **fields}
+            item["transactions"][transaction_id] = transaction
+            item["log"].append(("modified", transaction))
+            return dict(transaction)
+
+    def remove_transaction(self, access_token: str, transaction_id: str) -> None:
+        with self._lock:
+            item = self._item(access_token)
+            del item["transactions"][transaction_id]
+            item["log"].append(("removed", {"transaction_id": transaction_id}))
+
+    def transactions(self, access_token: str) -> List[Dict[str, Any]]:
+        """Current state of the item's transactions"""
+        with self._lock:
+            return [dict(t) for t in self._item(access_token)["transactions"].values()]
+
+    def _item(self, access_token: str) -> Dict[str, Any]:
+        item = self._items.get(access_token)
+        if item is None:
+            raise ValueError(f"unknown access token {access_token!r}")
+        return item
+
+    def _add(self, item: Dict[str, Any], transaction: Dict[str, Any]) -> None:
+        item["transactions"][transaction["transaction_id"]] = transaction
+        item["log"].append(("added", transaction))
+
+    def _generate(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        rng = item["rng"]
+        item["next_id"] += 1
+        primary, detailed = rng.choice(FAKE_CATEGORIES)
+        return {
+            "transaction_id": f"{item['item_id']}-txn-{item['next_id']}",
+            "account_id": f"{item['item_id']}-checking",
+            "amount": round(rng.uniform(1, 400), 2),
+            "date": (date(2024, 1, 1) + timedelta(days=rng.randrange(365))).isoformat(),
+            "name": f"Merchant {rng.randrange(50)}",
+            "personal_finance_category": {"primary": primary, "detailed": detailed}
+        }
+
+_transport: Optional[Any] = None
+_transport_lock = threading.Lock()
+
+def get_plaid_transport() -> Any:
+    """The process-wide transport; PLAID_ENV=fake selects the offline fake"""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = FakePlaidTransport() if PLAID_ENV == 'fake' else PlaidTransport()
+        return _transport
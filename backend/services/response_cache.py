@@ -0,0 +1,63 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from typing import Dict, Hashable, Iterable, Optional
+import hashlib
+import os
+
+from ..database import dialect_insert
+from ..models import DataVersion
+from .ttl_cache import TTLCache
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+
+def bump_data_versions(db: Session, user_ids: Iterable[Optional[int]]) -> None:
+    """Increment each user's data version inside the caller's transaction"""
+    rows = [{'user_id': user_id, 'version': 1} for user_id in sorted({user_id for user_id in user_ids if user_id is not None})]
+    if not rows:
+        return
+    upsert = dialect_insert(db)
+    if upsert is not None:
+        # Concurrent first writes for a user would both miss an UPDATE and collide on insert
+        stmt = upsert(DataVersion)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[DataVersion.user_id], set_={'version': DataVersion.version + 1}
+        ), rows)
+        return
+    for row in rows:
+        updated = db.query(DataVersion).filter(DataVersion.user_id == row['user_id']).update(
+            {DataVersion.version: DataVersion.version + 1}, synchronize_session=False
+        )
+        if not updated:
+            db.execute(insert(DataVersion), [row])
+
+def get_data_version(db: Session, user_id: int) -> int:
+    """Current data version for a user (0 if they have never written)"""
+    version = db.query(DataVersion.version).filter(DataVersion.user_id == user_id).scalar()
+    return version or 0
+
+def make_etag(key: Hashable) -> str:
+    return '"' + hashlib.sha1(repr(key).encode("utf-8")).hexdigest() + '"'
+
+class ResponseCache(TTLCache):
+    """Bounded LRU of computed responses with a per-entry TTL.
+
+    Keys include the user's data version, so writes make old entries
+    unreachable rather than requiring explicit invalidation.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        super().__init__(max_entries, ttl)
+        self.not_modified = 0
+
+    def record_not_modified(self) -> None:
+        with self._lock:
+            self.not_modified += 1
+
+    def stats(self) -> Dict[str, int]:
+        stats = super().stats()
+        with self._lock:
+            stats["not_modified"] = self.not_modified
+        return stats
+
+response_cache = ResponseCache(max_entries=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
@@ -0,0 +1,359 @@
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import case, func, insert, select, update
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..database import dialect_insert
+from ..models import Transaction, DailyRollup, MonthlyRollup, DataVersion, UserCategory
+from .analytics_cache import analytics_cache
+from .response_cache import bump_data_versions
+
+# (user_id, day, category_id) -> [amount delta in cents, count delta]
+RollupDeltas = Dict[Tuple[Optional[int], date, int], List[int]]
+
+def month_start(day: date) -> date:
+    """First day of the month containing `day`"""
+    return day.replace(day=1)
+
+def next_month(day: date) -> date:
+    """First day of the month after the one containing `day`"""
+    if day.month == 12:
+        return date(day.year + 1, 1, 1)
+    return date(day.year, day.month + 1, 1)
+
+def _user_filter(column, user_id: Optional[int]):
+    return column.is_(None) if user_id is None else column == user_id
+
+def _earlier(current, incoming):
+    return case((current > incoming, incoming), else_=current)
+
+def _later(current, incoming):
+    return case((current < incoming, incoming), else_=current)
+
+def _upsert_add(
+    db: Session,
+    model: Any,
+    rows: List[Dict[str, Any]],
+    key_fields: Tuple[str, ...],
+    add_fields: Tuple[str, ...],
+    merge: Optional[Dict[str, Any]] = None
+) -> None:
+    """Insert `rows`, or add their `add_fields` onto the rows already stored under the same key.
+
+    The arithmetic happens in SQL, so concurrent writers to one key can't
+    lose each other's changes; `merge` maps any other column to a function
+    combining the stored and incoming values.
+    """
+    merge = merge or {}
+    upsert = dialect_insert(db)
+
+    # NULL keys never conflict, so unowned rows take the update-then-insert path
+    keyed = [row for row in rows if all(row[field] is not None for field in key_fields)]
+    if upsert is not None and keyed:
+        stmt = upsert(model)
+        set_ = {field: getattr(model, field) + getattr(stmt.excluded, field) for field in add_fields}
+        set_.update({field: combine(getattr(model, field), getattr(stmt.excluded, field)) for field, combine in merge.items()})
+        db.execute(stmt.on_conflict_do_update(index_elements=list(key_fields), set_=set_), keyed)
+        rows = [row for row in rows if not all(row[field] is not None for field in key_fields)]
+
+    for row in rows:
+        values = {field: getattr(model, field) + row[field] for field in add_fields}
+        values.update({field: combine(getattr(model, field), row[field]) for field, combine in merge.items()})
+        result = db.execute(
+            update(model)
+            .where(*[_user_filter(getattr(model, field), row[field]) for field in key_fields])
+            .values(values)
+        )
+        if not result.rowcount:
+            db.execute(insert(model), [row])
+
+class RollupService:
+    """Maintains the per-user daily and monthly rollup tables and category lists.
+
+    Nothing here commits: changes are staged on the caller's session so they
+    land in the same database transaction as the transaction writes.
+    """
+
+    def add_to_deltas(self, deltas: RollupDeltas, transaction: Any, sign: int = 1) -> None:
+        """Accumulate a transaction's contribution (sign=1) or removal (sign=-1)"""
+        key = (transaction.user_id, transaction.date, transaction.category_id)
+        delta = deltas.setdefault(key, [0, 0])
+        delta[0] += sign * int(transaction.amount_cents)
+        delta[1] += sign
+
+    def record_added(self, db: Session, transactions: Iterable[Any]) -> None:
+        """Stage rollup updates for newly added transactions"""
+        deltas: RollupDeltas = {}
+        for transaction in transactions:
+            self.add_to_deltas(deltas, transaction, 1)
+        self.apply(db, deltas)
+
+    def record_removed(self, db: Session, transactions: Iterable[Any]) -> None:
+        """Stage rollup updates for deleted transactions"""
+        deltas: RollupDeltas = {}
+        for transaction in transactions:
+            self.add_to_deltas(deltas, transaction, -1)
+        self.apply(db, deltas)
+
+    def apply(self, db: Session, deltas: RollupDeltas) -> None:
+        """Apply accumulated deltas to the daily and monthly rollups and the category lists"""
+        by_user: Dict[Optional[int], Dict[Tuple[date, int], List[int]]] = {}
+        for (user_id, day, category), (amount, count) in deltas.items():
+            if amount == 0 and count == 0:
+                continue
+            by_user.setdefault(user_id, {})[(day, category)] = [amount, count]
+        if not by_user:
+            return
+
+        for user_id, user_deltas in by_user.items():
+            if user_id is not None:
+                category_counts: Dict[int, int] = {}
+                for (_, category), (_, count) in user_deltas.items():
+                    category_counts[category] = category_counts.get(category, 0) + count
+                self._apply_user_categories(db, user_id, category_counts)
+            self._apply_daily(db, user_id, user_deltas)
+            self._apply_monthly(db, user_id, user_deltas)
+            suffix_starts: Dict[int, date] = {}
+            for day, category in user_deltas:
+                suffix_starts[category] = min(day, suffix_starts.get(category, day))
+            self._patch_cumulative(db, user_id, suffix_starts)
+        analytics_cache.invalidate_on_commit(db, by_user.keys())
+        bump_data_versions(db, by_user.keys())
+
+    def _apply_daily(
+        self,
+        db: Session,
+        user_id: Optional[int],
+        user_deltas: Dict[Tuple[date, int], List[int]]
+    ) -> None:
+        """Add the deltas onto the daily rows and drop the days left empty"""
+        rows = [
+            {'user_id': user_id, 'day': day, 'category_id': category, 'total_cents': amount, 'count': count, 'cumulative_cents': 0}
+            for (day, category), (amount, count) in sorted(user_deltas.items())
+        ]
+        _upsert_add(db, DailyRollup, rows, ('user_id', 'day', 'category_id'), ('total_cents', 'count'))
+
+        if any(count < 0 for _, count in user_deltas.values()):
+            db.query(DailyRollup).filter(
+                _user_filter(DailyRollup.user_id, user_id),
+                DailyRollup.day.in_({day for day, _ in user_deltas}),
+                DailyRollup.category_id.in_({category for _, category in user_deltas}),
+                DailyRollup.count <= 0
+            ).delete(synchronize_session=False)
+
+    def _apply_user_categories(self, db: Session, user_id: int, category_counts: Dict[int, int]) -> None:
+        """Keep the user's category list in step: add new categories, drop emptied ones.
+
+        Every touched category is upserted, even with a zero count, so the
+        row lock it takes orders concurrent writers to the same category.
+        """
+        rows = [
+            {'user_id': user_id, 'category_id': category, 'transaction_count': count}
+            for category, count in sorted(category_counts.items())
+        ]
+        _upsert_add(db, UserCategory, rows, ('user_id', 'category_id'), ('transaction_count',))
+
+        if any(count <= 0 for count in category_counts.values()):
+            db.query(UserCategory).filter(
+                UserCategory.user_id == user_id,
+                UserCategory.category_id.in_(category_counts),
+                UserCategory.transaction_count <= 0
+            ).delete(synchronize_session=False)
+
+    def _patch_cumulative(self, db: Session, user_id: Optional[int], suffix_starts: Dict[int, date]) -> None:
+        """Recompute each category's running totals from its earliest changed day onwards.
+
+        Days before the change keep their cumulative_cents, so a new latest
+        day touches one row and a back-dated edit only the suffix after it.
+        The suffix is summed in one UPDATE from the stored totals rather
+        than from values read earlier in Python.
+        """
+        for category, first_day in sorted(suffix_starts.items()):
+            prior = aliased(DailyRollup)
+            base = select(prior.cumulative_cents).where(
+                _user_filter(prior.user_id, user_id),
+                prior.category_id == category,
+                prior.day < first_day
+            ).order_by(prior.day.desc()).limit(1).scalar_subquery()
+
+            suffix = aliased(DailyRollup)
+            running = select(
+                suffix.id,
+                func.sum(suffix.total_cents).over(order_by=suffix.day).label('running')
+            ).where(
+                _user_filter(suffix.user_id, user_id),
+                suffix.category_id == category,
+                suffix.day >= first_day
+            ).subquery()
+
+            cumulative = func.coalesce(base, 0) + running.c.running
+            db.execute(
+                update(DailyRollup)
+                .where(DailyRollup.id == running.c.id, DailyRollup.cumulative_cents != cumulative)
+                .values(cumulative_cents=cumulative)
+            )
+
+    def _apply_monthly(
+        self,
+        db: Session,
+        user_id: Optional[int],
+        user_deltas: Dict[Tuple[date, int], List[int]]
+    ) -> None:
+        """Add the deltas onto the monthly rows, widening their first/last day as needed.
+
+        A month that lost transactions may have lost its first or last day,
+        so those months re-read the bounds from their daily rows.
+        """
+        monthly: Dict[Tuple[date, int], Dict[str, Any]] = {}
+        shrunk = set()
+        for (day, category), (amount, count) in sorted(user_deltas.items()):
+            key = (month_start(day), category)
+            row = monthly.setdefault(key, {
+                'user_id': user_id, 'month': key[0], 'category_id': category,
+                'total_cents': 0, 'count': 0, 'first_day': day, 'last_day': day
+            })
+            row['total_cents'] += amount
+            row['count'] += count
+            if count < 0:
+                shrunk.add(key)
+            else:
+                row['first_day'] = min(row['first_day'], day)
+                row['last_day'] = max(row['last_day'], day)
+        _upsert_add(
+            db, MonthlyRollup, [monthly[key] for key in sorted(monthly)],
+            ('user_id', 'month', 'category_id'), ('total_cents', 'count'),
+            {'first_day': _earlier, 'last_day': _later}
+        )
+        if not shrunk:
+            return
+
+        db.query(MonthlyRollup).filter(
+            _user_filter(MonthlyRollup.user_id, user_id),
+            MonthlyRollup.month.in_({month for month, _ in shrunk}),
+            MonthlyRollup.category_id.in_({category for _, category in shrunk}),
+            MonthlyRollup.count <= 0
+        ).delete(synchronize_session=False)
+        for month, category in sorted(shrunk):
+            in_month = db.query(DailyRollup.day).filter(
+                _user_filter(DailyRollup.user_id, user_id),
+                DailyRollup.category_id == category,
+                DailyRollup.day >= month,
+                DailyRollup.day < next_month(month)
+            )
+            db.query(MonthlyRollup).filter(
+                _user_filter(MonthlyRollup.user_id, user_id),
+                MonthlyRollup.month == month,
+                MonthlyRollup.category_id == category
+            ).update({
+                MonthlyRollup.first_day: in_month.with_entities(func.min(DailyRollup.day)).scalar_subquery(),
+                MonthlyRollup.last_day: in_month.with_entities(func.max(DailyRollup.day)).scalar_subquery()
+            }, synchronize_session=False)
+
+    def _expected_rollups(
+        self,
+        db: Session,
+        user_id: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Aggregate the transactions table into daily rollup, monthly rollup and user category rows"""
+        query = db.query(
+            Transaction.user_id,
+            Transaction.date,
+            Transaction.category_id,
+            func.sum(Transaction.amount_cents).label('total_cents'),
+            func.count(Transaction.id).label('count')
+        )
+        if user_id is not None:
+            query = query.filter(Transaction.user_id == user_id)
+        rows = query.group_by(Transaction.user_id, Transaction.date, Transaction.category_id).all()
+
+        daily = [{
+            'user_id': row.user_id,
+            'day': row.date,
+            'category_id': row.category_id,
+            'total_cents': int(row.total_cents or 0),
+            'count': row.count,
+            'cumulative_cents': 0
+        } for row in rows]
+
+        running: Dict[Tuple[Optional[int], int], int] = {}
+        for row in sorted(daily, key=lambda row: row['day']):
+            key = (row['user_id'], row['category_id'])
+            running[key] = running.get(key, 0) + row['total_cents']
+            row['cumulative_cents'] = running[key]
+
+        monthly: Dict[Tuple[Optional[int], date, int], Dict[str, Any]] = {}
+        user_categories: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        for row in daily:
+            key = (row['user_id'], month_start(row['day']), row['category_id'])
+            agg = monthly.setdefault(key, {
+                'user_id': key[0], 'month': key[1], 'category_id': key[2],
+                'total_cents': 0, 'count': 0, 'first_day': row['day'], 'last_day': row['day']
+            })
+            agg['total_cents'] += row['total_cents']
+            agg['count'] += row['count']
+            agg['first_day'] = min(agg['first_day'], row['day'])
+            agg['last_day'] = max(agg['last_day'], row['day'])
+            if row['user_id'] is not None:
+                listed = user_categories.setdefault((row['user_id'], row['category_id']), {
+                    'user_id': row['user_id'], 'category_id': row['category_id'], 'transaction_count': 0
+                })
+                listed['transaction_count'] += row['count']
+
+        return daily, list(monthly.values()), list(user_categories.values())
+
+    def rebuild(self, db: Session, user_id: Optional[int] = None) -> Dict[str, int]:
+        """Regenerate the rollups and category lists from scratch for one user, or for everyone"""
+        for model in (DailyRollup, MonthlyRollup, UserCategory):
+            query = db.query(model)
+            if user_id is not None:
+                query = query.filter(model.user_id == user_id)
+            query.delete(synchronize_session=False)
+
+        daily, monthly, user_categories = self._expected_rollups(db, user_id)
+        if daily:
+            db.execute(insert(DailyRollup), daily)
+        if monthly:
+            db.execute(insert(MonthlyRollup), monthly)
+        if user_categories:
+            db.execute(insert(UserCategory), user_categories)
+        if user_id is None:
+            analytics_cache.invalidate()
+            db.query(DataVersion).update({DataVersion.version: DataVersion.version + 1}, synchronize_session=False)
+        else:
+            analytics_cache.invalidate_on_commit(db, [user_id])
+            bump_data_versions(db, [user_id])
+        return {"daily_rows": len(daily), "monthly_rows": len(monthly), "user_categories": len(user_categories)}
+
+    def verify(self, db: Session, user_id: Optional[int] = None) -> List[str]:
+        """Compare the stored rollups and category lists with a fresh aggregation; returns the mismatches"""
+        expected_daily, expected_monthly, expected_user_categories = self._expected_rollups(db, user_id)
+        mismatches = []
+
+        for model, expected, key_fields in (
+            (DailyRollup, expected_daily, ('user_id', 'day', 'category_id')),
+            (MonthlyRollup, expected_monthly, ('user_id', 'month', 'category_id')),
+            (UserCategory, expected_user_categories, ('user_id', 'category_id'))
+        ):
+            query = db.query(model)
+            if user_id is not None:
+                query = query.filter(model.user_id == user_id)
+            stored = {tuple(getattr(row, field) for field in key_fields): row for row in query}
+
+            for row in expected:
+                key = tuple(row[field] for field in key_fields)
+                actual = stored.pop(key, None)
+                if actual is None:
+                    mismatches.append(f"{model.__tablename__}: missing {key}")
+                    continue
+                differs = [
+                    field for field in row
+                    if field not in key_fields and getattr(actual, field) != row[field]
+                ]
+                if differs:
+                    found = ", ".join(f"{field}={getattr(actual, field)}" for field in differs)
+                    wanted = ", ".join(f"{field}={row[field]}" for field in differs)
+                    mismatches.append(f"{model.__tablename__}: {key} has {found}, expected {wanted}")
+            for key in stored:
+                mismatches.append(f"{model.__tablename__}: unexpected {key}")
+
+        return mismatches
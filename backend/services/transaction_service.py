@@ -1,24 +1,42 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func, distinct
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, column, delete, func, insert, literal_column, select, table, tuple_, update
 from datetime import datetime, date
-from typing import List, Optional
-import pandas as pd
+from io import StringIO
+from types import SimpleNamespace
+from typing import Iterator, List, Optional, Tuple
+import base64
+import csv
+import json
+import re
 
-from ..models import Transaction
-from ..schemas import TransactionCreate, TransactionUpdate, TransactionResponse
+from ..models import TRANSACTION_SEARCH_TABLE, Category, Transaction, UserCategory
+from ..schemas import (
+    TransactionCreate, TransactionUpdate, TransactionResponse, TransactionPage, BatchOperation, BatchOperationResult,
+    from_cents, to_cents
+)
+from .rollup_service import RollupService
+from .category_dictionary import category_dictionary
+from .anomaly_service import AnomalyService
 
 class TransactionService:
-    async def get_transactions(
-        self, 
-        db: Session, 
+    def __init__(self):
+        self.rollup_service = RollupService()
+        self.anomaly_service = AnomalyService()
+
+    def _filtered_query(
+        self,
+        query,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
-        categories: Optional[List[str]] = None,
+        category_ids: Optional[List[int]] = None,
         user_id: Optional[int] = None
-    ) -> List[TransactionResponse]:
-        """Get transactions with optional filtering"""
-        query = db.query(Transaction)
-        
+    ):
+        """Apply the shared user/date/category filters to a transactions query.
+
+        `category_ids` comes from category_dictionary.lookup(): None means no
+        category filter, an empty list matches nothing.
+        """
         # Scope to user
         if user_id is not None:
             query = query.filter(Transaction.user_id == user_id)
@@ -33,62 +51,447 @@ class TransactionService:
             query = query.filter(Transaction.date <= end_date_obj)
         
         # Apply category filters
-        if categories:
-            query = query.filter(Transaction.category.in_(categories))
+        if category_ids is not None:
+            query = query.filter(Transaction.category_id.in_(category_ids))
         
+        return query
+
+    async def get_transactions(
+        self, 
+        db: AsyncSession, 
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        categories: Optional[List[str]] = None,
+        user_id: Optional[int] = None
+    ) -> List[TransactionResponse]:
+        """Get transactions with optional filtering"""
+        return await db.run_sync(self._get_transactions, start_date, end_date, categories, user_id)
+
+    def _get_transactions(
+        self, 
+        db: Session, 
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        categories: Optional[List[str]] = None,
+        user_id: Optional[int] = None
+    ) -> List[TransactionResponse]:
+        category_ids = category_dictionary.lookup(db, categories)
+        query = self._filtered_query(db.query(Transaction), start_date, end_date, category_ids, user_id)
         transactions = query.order_by(Transaction.date.desc()).all()
         return [TransactionResponse.from_orm(t) for t in transactions]
 
-    async def get_transaction_by_id(self, db: Session, transaction_id: int) -> Optional[TransactionResponse]:
+    def _encode_cursor(self, transaction_date: date, transaction_id: int) -> str:
+        raw = f"{transaction_date.isoformat()}|{transaction_id}".encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def _decode_cursor(self, cursor: str) -> Tuple[date, int]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+            date_part, id_part = raw.split('|')
+            return datetime.strptime(date_part, "%Y-%m-%d").date(), int(id_part)
+        except Exception:
+            raise ValueError("Invalid cursor")
+
+    async def get_transactions_page(
+        self,
+        db: AsyncSession,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        categories: Optional[List[str]] = None,
+        user_id: Optional[int] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> TransactionPage:
+        """Get one page of transactions, newest first, using (date, id) keyset pagination.
+
+        The cursor encodes the last (date, id) returned, so every page is an
+        index range scan no matter how deep into the history it is.
+        """
+        return await db.run_sync(self._get_transactions_page, start_date, end_date, categories, user_id, limit, cursor)
+
+    def _get_transactions_page(
+        self,
+        db: Session,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        categories: Optional[List[str]] = None,
+        user_id: Optional[int] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> TransactionPage:
+        category_ids = category_dictionary.lookup(db, categories)
+        query = self._filtered_query(db.query(Transaction), start_date, end_date, category_ids, user_id)
+        if cursor:
+            cursor_date, cursor_id = self._decode_cursor(cursor)
+            query = query.filter(tuple_(Transaction.date, Transaction.id) < tuple_(cursor_date, cursor_id))
+        
+        transactions = query.order_by(Transaction.date.desc(), Transaction.id.desc()).limit(limit + 1).all()
+        next_cursor = None
+        if len(transactions) > limit:
+            transactions = transactions[:limit]
+            next_cursor = self._encode_cursor(transactions[-1].date, transactions[-1].id)
+        
+        return TransactionPage(
+            items=[TransactionResponse.from_orm(t) for t in transactions],
+            next_cursor=next_cursor
+        )
+
+    def _search_terms(self, text: str) -> List[str]:
+        terms = re.findall(r"\w+", text.lower())
+        if not terms:
+            raise ValueError("Search query must contain at least one word")
+        return terms
+
+    def _search_query(self, query, dialect: str, terms: List[str]):
+        """Restrict a transactions query to descriptions containing every term (as a word prefix).
+
+        Returns the query and its ranking: bm25 over the FTS5 table on
+        SQLite, ts_rank over the GIN-indexed tsvector on Postgres (see
+        models.TRANSACTION_SEARCH_DDL), ties and other databases newest first.
+        """
+        newest_first = [Transaction.date.desc(), Transaction.id.desc()]
+        if dialect == 'sqlite':
+            search = table(TRANSACTION_SEARCH_TABLE, column('rowid'))
+            match = literal_column(TRANSACTION_SEARCH_TABLE).op('MATCH')(' '.join(f'"{term}"*' for term in terms))
+            query = query.join(search, search.c.rowid == Transaction.id).filter(match)
+            return query, [func.bm25(literal_column(TRANSACTION_SEARCH_TABLE))] + newest_first
+        if dialect == 'postgresql':
+            # Spelled exactly like the indexed expression so the planner uses the GIN index
+            vector = func.to_tsvector(literal_column("'english'"), func.coalesce(Transaction.description, literal_column("''")))
+            tsquery = func.to_tsquery(literal_column("'english'"), ' & '.join(f'{term}:*' for term in terms))
+            return query.filter(vector.op('@@')(tsquery)), [func.ts_rank(vector, tsquery).desc()] + newest_first
+        for term in terms:
+            query = query.filter(Transaction.description.ilike(f'%{term}%'))
+        return query, newest_first
+
+    def _encode_search_cursor(self, offset: int) -> str:
+        return base64.urlsafe_b64encode(f"search|{offset}".encode()).decode().rstrip('=')
+
+    def _decode_search_cursor(self, cursor: str) -> int:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+            kind, offset = raw.split('|')
+            if kind != 'search' or int(offset) < 0:
+                raise ValueError
+            return int(offset)
+        except Exception:
+            raise ValueError("Invalid cursor")
+
+    async def search_transactions(
+        self,
+        db: AsyncSession,
+        text: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        categories: Optional[List[str]] = None,
+        user_id: Optional[int] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> TransactionPage:
+        """Get one page of transactions whose description matches `text`, best matches first.
+
+        Every word must match the start of a word in the description. The
+        usual date/category filters apply; the cursor is the offset into the
+        ranking, since relevance order has no stable keyset.
+        """
+        return await db.run_sync(self._search_transactions, text, start_date, end_date, categories, user_id, limit, cursor)
+
+    def _search_transactions(
+        self,
+        db: Session,
+        text: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        categories: Optional[List[str]] = None,
+        user_id: Optional[int] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> TransactionPage:
+        terms = self._search_terms(text)
+        offset = self._decode_search_cursor(cursor) if cursor else 0
+        category_ids = category_dictionary.lookup(db, categories)
+        query = self._filtered_query(db.query(Transaction), start_date, end_date, category_ids, user_id)
+        query, ranking = self._search_query(query, db.get_bind().dialect.name, terms)
+        
+        transactions = query.order_by(*ranking).offset(offset).limit(limit + 1).all()
+        next_cursor = None
+        if len(transactions) > limit:
+            transactions = transactions[:limit]
+            next_cursor = self._encode_search_cursor(offset + limit)
+        
+        return TransactionPage(
+            items=[TransactionResponse.from_orm(t) for t in transactions],
+            next_cursor=next_cursor
+        )
+
+    def export_transactions(
+        self,
+        db: Session,
+        export_format: str = 'ndjson',
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        categories: Optional[List[str]] = None,
+        user_id: Optional[int] = None,
+        batch_size: int = 1000
+    ) -> Iterator[str]:
+        """Stream filtered transactions as NDJSON lines or CSV text.
+
+        Filters are validated before the first chunk is produced. Rows are
+        fetched `batch_size` at a time through a server-side cursor and each
+        batch is encoded into one chunk, so memory stays flat regardless of
+        how many rows match.
+        """
+        # Exported amounts are decimals and categories are names, like the API and the CSV import format
+        renamed = {'amount_cents': 'amount', 'category_id': 'category'}
+        columns = [renamed.get(column.name, column.name) for column in Transaction.__table__.columns]
+        selected = [Category.name if column.name == 'category_id' else column for column in Transaction.__table__.columns]
+        statement = self._filtered_query(
+            select(*selected).join(Category, Category.id == Transaction.category_id),
+            start_date, end_date, category_dictionary.lookup(db, categories), user_id
+        )
+        statement = statement.order_by(Transaction.date.desc(), Transaction.id.desc())
+        
+        amount_index = columns.index('amount')
+        
+        def encode(value):
+            return value.isoformat() if isinstance(value, (date, datetime)) else value
+        
+        def encode_row(row, amount_type=float) -> list:
+            values = [encode(value) for value in row]
+            values[amount_index] = amount_type(from_cents(values[amount_index]))
+            return values
+        
+        def stream() -> Iterator[str]:
+            buffer = StringIO()
+            writer = csv.writer(buffer)
+            if export_format == 'csv':
+                writer.writerow(columns)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            
+            result = db.execute(statement.execution_options(yield_per=batch_size))
+            for partition in result.partitions():
+                if export_format == 'csv':
+                    writer.writerows(encode_row(row, str) for row in partition)
+                else:
+                    for row in partition:
+                        buffer.write(json.dumps(dict(zip(columns, encode_row(row)))))
+                        buffer.write('\n')
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        
+        return stream()
+
+    async def get_transaction_by_id(self, db: AsyncSession, transaction_id: int) -> Optional[TransactionResponse]:
         """Get a specific transaction by ID"""
+        return await db.run_sync(self._get_transaction_by_id, transaction_id)
+
+    def _get_transaction_by_id(self, db: Session, transaction_id: int) -> Optional[TransactionResponse]:
         transaction = db.query(Transaction).filter(Transaction.id == transaction_id).first()
         if transaction:
             return TransactionResponse.from_orm(transaction)
         return None
 
-    async def create_transaction(self, db: Session, transaction: TransactionCreate) -> TransactionResponse:
+    async def create_transaction(self, db: AsyncSession, transaction: TransactionCreate) -> TransactionResponse:
         """Create a new transaction"""
+        return await db.run_sync(self._create_transaction, transaction)
+
+    def _create_transaction(self, db: Session, transaction: TransactionCreate) -> TransactionResponse:
         db_transaction = Transaction(
+            user_id=transaction.user_id,
             date=transaction.date,
-            category=transaction.category,
-            amount=transaction.amount,
+            category_id=category_dictionary.id_for(db, transaction.category),
+            amount_cents=to_cents(transaction.amount),
             description=transaction.description
         )
         db.add(db_transaction)
+        self.rollup_service.record_added(db, [db_transaction])
+        self.anomaly_service.record_added(db, [db_transaction])
         db.commit()
         db.refresh(db_transaction)
         return TransactionResponse.from_orm(db_transaction)
 
     async def update_transaction(
         self, 
-        db: Session, 
+        db: AsyncSession, 
         transaction_id: int, 
         transaction: TransactionUpdate
     ) -> Optional[TransactionResponse]:
         """Update an existing transaction"""
+        return await db.run_sync(self._update_transaction, transaction_id, transaction)
+
+    def _update_transaction(
+        self, 
+        db: Session, 
+        transaction_id: int, 
+        transaction: TransactionUpdate
+    ) -> Optional[TransactionResponse]:
         db_transaction = db.query(Transaction).filter(Transaction.id == transaction_id).first()
         if not db_transaction:
             return None
         
+        deltas = {}
+        stats_deltas = {}
+        self.rollup_service.add_to_deltas(deltas, db_transaction, -1)
+        self.anomaly_service.add_to_deltas(stats_deltas, db_transaction, -1)
+        
         update_data = transaction.dict(exclude_unset=True)
+        if 'amount' in update_data:
+            update_data['amount_cents'] = to_cents(update_data.pop('amount'))
+        if 'category' in update_data:
+            update_data['category_id'] = category_dictionary.id_for(db, update_data.pop('category'))
         for field, value in update_data.items():
             setattr(db_transaction, field, value)
         
+        self.rollup_service.add_to_deltas(deltas, db_transaction, 1)
+        self.anomaly_service.add_to_deltas(stats_deltas, db_transaction, 1)
+        self.rollup_service.apply(db, deltas)
+        self.anomaly_service.apply(db, stats_deltas)
         db.commit()
         db.refresh(db_transaction)
         return TransactionResponse.from_orm(db_transaction)
 
-    async def delete_transaction(self, db: Session, transaction_id: int) -> bool:
+    async def delete_transaction(self, db: AsyncSession, transaction_id: int) -> bool:
         """Delete a transaction"""
+        return await db.run_sync(self._delete_transaction, transaction_id)
+
+    def _delete_transaction(self, db: Session, transaction_id: int) -> bool:
         db_transaction = db.query(Transaction).filter(Transaction.id == transaction_id).first()
         if not db_transaction:
             return False
         
+        self.rollup_service.record_removed(db, [db_transaction])
+        self.anomaly_service.record_removed(db, [db_transaction])
         db.delete(db_transaction)
         db.commit()
         return True
 
-    async def get_categories(self, db: Session) -> List[str]:
-        """Get unique categories"""
-        categories = db.query(distinct(Transaction.category)).all()
-        return [cat[0] for cat in categories]
+    async def apply_batch(self, db: AsyncSession, operations: List[BatchOperation], user_id: int) -> List[BatchOperationResult]:
+        """Apply mixed create/update/delete operations in one database transaction.
+
+        Operations run in order against the user's own transactions; one
+        whose target does not exist (or was deleted earlier in the batch)
+        gets a 404 result, a create naming another user gets a 403, and the
+        rest still apply. Each kind of write is a
+        single bulk statement, rollups and category stats are updated once
+        from the combined deltas, and the batch commits once.
+        """
+        return await db.run_sync(self._apply_batch, operations, user_id)
+
+    def _apply_batch(self, db: Session, operations: List[BatchOperation], user_id: int) -> List[BatchOperationResult]:
+        names = {
+            operation.transaction.category for operation in operations
+            if operation.op != 'delete' and operation.transaction.category is not None
+            and not (operation.op == 'create' and operation.transaction.user_id not in (None, user_id))
+        }
+        category_ids = category_dictionary.ids(db, names, create=True) if names else {}
+        
+        # Current state of every targeted row, updated as the operations are replayed
+        target_ids = {operation.id for operation in operations if operation.op != 'create'}
+        current = {}
+        if target_ids:
+            rows = db.query(
+                Transaction.id, Transaction.user_id, Transaction.date,
+                Transaction.category_id, Transaction.amount_cents, Transaction.description
+            ).filter(Transaction.id.in_(target_ids), Transaction.user_id == user_id)
+            current = {row.id: SimpleNamespace(**row._asdict()) for row in rows}
+        
+        deltas = {}
+        stats_deltas = {}
+        results = []
+        created = []
+        updated = set()
+        deleted = set()
+        for index, operation in enumerate(operations):
+            if operation.op == 'create':
+                fields = operation.transaction
+                if fields.user_id is not None and fields.user_id != user_id:
+                    results.append(BatchOperationResult(
+                        index=index, op=operation.op, status=403, error="Cannot create transactions for another user"
+                    ))
+                    continue
+                row = SimpleNamespace(
+                    user_id=user_id,
+                    date=fields.date,
+                    category_id=category_ids[fields.category],
+                    amount_cents=to_cents(fields.amount),
+                    description=fields.description
+                )
+                result = BatchOperationResult(index=index, op=operation.op, status=201)
+                created.append((result, row))
+            else:
+                row = current.get(operation.id)
+                if row is None:
+                    results.append(BatchOperationResult(
+                        index=index, op=operation.op, status=404, id=operation.id, error="Transaction not found"
+                    ))
+                    continue
+                self.rollup_service.add_to_deltas(deltas, row, -1)
+                self.anomaly_service.add_to_deltas(stats_deltas, row, -1)
+                result = BatchOperationResult(index=index, op=operation.op, status=200, id=operation.id)
+                if operation.op == 'delete':
+                    del current[operation.id]
+                    updated.discard(operation.id)
+                    deleted.add(operation.id)
+                    results.append(result)
+                    continue
+                
+                update_data = operation.transaction.dict(exclude_unset=True)
+                if 'amount' in update_data:
+                    update_data['amount_cents'] = to_cents(update_data.pop('amount'))
+                if 'category' in update_data:
+                    update_data['category_id'] = category_ids[update_data.pop('category')]
+                for field, value in update_data.items():
+                    setattr(row, field, value)
+                updated.add(operation.id)
+            self.rollup_service.add_to_deltas(deltas, row, 1)
+            self.anomaly_service.add_to_deltas(stats_deltas, row, 1)
+            results.append(result)
+        
+        if created:
+            # With RETURNING the rows go out as multi-row INSERTs, which SQLite's
+            # full-text search triggers index far faster than one row per statement
+            new_ids = db.execute(
+                insert(Transaction).returning(Transaction.id, sort_by_parameter_order=True),
+                [vars(row) for _, row in created]
+            ).scalars().all()
+            for (result, _), new_id in zip(created, new_ids):
+                result.id = new_id
+        if updated:
+            db.execute(update(Transaction), [
+                {
+                    'id': transaction_id,
+                    'date': current[transaction_id].date,
+                    'category_id': current[transaction_id].category_id,
+                    'amount_cents': current[transaction_id].amount_cents,
+                    'description': current[transaction_id].description
+                } for transaction_id in updated
+            ])
+        if deleted:
+            db.execute(delete(Transaction).where(Transaction.id.in_(deleted)))
+        self.rollup_service.apply(db, deltas)
+        self.anomaly_service.apply(db, stats_deltas)
+        db.commit()
+        
+        written = [result.id for result in results if result.status in (200, 201) and result.id not in deleted]
+        stored = {}
+        if written:
+            stored = {
+                transaction.id: TransactionResponse.from_orm(transaction)
+                for transaction in db.query(Transaction).filter(Transaction.id.in_(written))
+            }
+        for result in results:
+            if result.status in (200, 201):
+                result.transaction = stored.get(result.id)
+        return results
+
+    async def get_categories(self, db: AsyncSession, user_id: int) -> List[str]:
+        """Get the user's categories, in name order"""
+        return await db.run_sync(self._get_categories, user_id)
+
+    def _get_categories(self, db: Session, user_id: int) -> List[str]:
+        # Maintained at write time by RollupService, so this never touches transactions
+        category_ids = [row.category_id for row in db.query(UserCategory.category_id).filter(UserCategory.user_id == user_id)]
+        return sorted(category_dictionary.names(db, category_ids).values())
@@ -0,0 +1,15 @@
+import os
+
+from .ttl_cache import TTLCache
+
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "1024"))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))
+
+class UserCache(TTLCache):
+    """Bounded LRU of authenticated user records keyed by JWT subject.
+
+    Entries expire after `ttl` seconds so changes made by other processes
+    are picked up; changes made here must call invalidate() after commit.
+    """
+
+user_cache = UserCache(max_entries=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
@@ -1,5 +1,5 @@
 import React, { useEffect, useState } from 'react'
-import { plaidAPI } from '../../services/api'
+import { jobsAPI, plaidAPI } from '../../services/api'
 
 declare global {
   interface Window {
@@ -20,7 +20,8 @@ const ConnectBankButton: React.FC = () => {
       token: linkToken,
       onSuccess: async (public_token: string) => {
         await plaidAPI.exchangePublicToken(public_token)
-        await plaidAPI.syncTransactions()
+        const { data } = await plaidAPI.syncTransactions()
+        await jobsAPI.waitForJob(data.job_id)
       },
     })
     handler.open()
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react'
 import { TrendingUp, DollarSign } from 'lucide-react'
-import { authAPI, uploadAPI } from '../services/api'
+import { authAPI, jobsAPI, uploadAPI } from '../services/api'
 
 const Header: React.FC = () => {
   const [email, setEmail] = useState('')
@@ -70,7 +70,8 @@ const Header: React.FC = () => {
     if (!file) return
     setUploading(true)
     try {
-      await uploadAPI.uploadCsv(file)
+      const { data } = await uploadAPI.uploadCsv(file)
+      await jobsAPI.waitForJob(data.job_id)
       window.location.reload()
     } finally {
       setUploading(false)
@@ -47,20 +47,14 @@ export const useAnalytics = (filters: AnalyticsFilters) => {
         params.categories = filters.categories.join(',')
       }
 
-      // Fetch all analytics data in parallel
-      const [metricsRes, monthlyRes, dailyRes, changesRes, trendsRes] = await Promise.all([
-        analyticsAPI.getMetrics(params),
-        analyticsAPI.getMonthlyStats(params),
-        analyticsAPI.getDailyAverages(params),
-        analyticsAPI.getPercentageChanges(params),
-        analyticsAPI.getTrends(params)
-      ])
+      // Fetch all analytics data in a single request
+      const { data } = await analyticsAPI.getDashboard(params)
 
-      setMetrics(metricsRes.data)
-      setMonthlyStats(monthlyRes.data)
-      setDailyAverages(dailyRes.data)
-      setPercentageChanges(changesRes.data)
-      setTrends(trendsRes.data)
+      setMetrics(data.metrics)
+      setMonthlyStats(data.monthly_stats)
+      setDailyAverages(data.daily_averages)
+      setPercentageChanges(data.percentage_changes)
+      setTrends(data.trends)
     } catch (err: any) {
       setError(err.response?.data?.detail || err.message || 'An error occurred')
       console.error('Error fetching analytics:', err)
@@ -11,31 +11,46 @@ export interface Transaction {
   updated_at?: string
 }
 
+export interface TransactionPage {
+  items: Transaction[]
+  next_cursor: string | null
+}
+
 interface TransactionFilters {
   start_date?: string
   end_date?: string
   categories?: string[]
+  limit?: number
 }
 
 export const useTransactions = (filters: TransactionFilters) => {
   const [transactions, setTransactions] = useState<Transaction[]>([])
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
 
+  const buildParams = (cursor?: string) => {
+    const params: any = {}
+    if (filters.start_date) params.start_date = filters.start_date
+    if (filters.end_date) params.end_date = filters.end_date
+    if (filters.categories && filters.categories.length > 0) {
+      params.categories = filters.categories.join(',')
+    }
+    if (filters.limit) params.limit = filters.limit
+    if (cursor) params.cursor = cursor
+    return params
+  }
+
+  // Load the first page, replacing anything already loaded
   const fetchTransactions = async () => {
     try {
       setLoading(true)
       setError(null)
 
-      const params: any = {}
-      if (filters.start_date) params.start_date = filters.start_date
-      if (filters.end_date) params.end_date = filters.end_date
-      if (filters.categories && filters.categories.length > 0) {
-        params.categories = filters.categories.join(',')
-      }
-
-      const response = await transactionAPI.getTransactions(params)
-      setTransactions(response.data)
+      const response = await transactionAPI.getTransactions(buildParams())
+      const page: TransactionPage = response.data
+      setTransactions(page.items)
+      setNextCursor(page.next_cursor)
     } catch (err: any) {
       setError(err.response?.data?.detail || err.message || 'An error occurred')
       console.error('Error fetching transactions:', err)
@@ -48,6 +63,23 @@ export const useTransactions = (filters: TransactionFilters) => {
     fetchTransactions()
   }, [filters.start_date, filters.end_date, filters.categories])
 
+  // Append the next page (for infinite scroll)
+  const loadMore = async () => {
+    if (!nextCursor || loading) return
+    try {
+      setLoading(true)
+      const response = await transactionAPI.getTransactions(buildParams(nextCursor))
+      const page: TransactionPage = response.data
+      setTransactions(prev => [...prev, ...page.items])
+      setNextCursor(page.next_cursor)
+    } catch (err: any) {
+      setError(err.response?.data?.detail || err.message || 'An error occurred')
+      console.error('Error fetching transactions:', err)
+    } finally {
+      setLoading(false)
+    }
+  }
+
   const createTransaction = async (data: {
     date: string
     category: string
@@ -91,6 +123,8 @@ export const useTransactions = (filters: TransactionFilters) => {
     transactions,
     loading,
     error,
+    hasMore: nextCursor !== null,
+    loadMore,
     refetch: fetchTransactions,
     createTransaction,
     updateTransaction,
@@ -38,13 +38,23 @@ api.interceptors.response.use(
 
 // Transaction API
 export const transactionAPI = {
-  // Get all transactions
+  // Get a page of transactions (pass next_cursor back as cursor for the next page)
   getTransactions: (params?: {
     start_date?: string
     end_date?: string
     categories?: string
+    limit?: number
+    cursor?: string
   }) => api.get('/transactions', { params }),
 
+  // Download transactions as NDJSON or CSV
+  exportTransactions: (params?: {
+    format?: 'ndjson' | 'csv'
+    start_date?: string
+    end_date?: string
+    categories?: string
+  }) => api.get('/transactions/export', { params, responseType: 'blob', timeout: 0 }),
+
   // Get transaction by ID
   getTransaction: (id: number) => api.get(`/transactions/${id}`),
 
@@ -108,11 +118,20 @@ export const analyticsAPI = {
     categories?: string
   }) => api.get('/analytics/trends', { params }),
 
+  // Get metrics, monthly stats, daily averages, changes and trends in one request
+  getDashboard: (params?: {
+    start_date?: string
+    end_date?: string
+    categories?: string
+  }) => api.get('/analytics/dashboard', { params }),
+
   // Get chart data
   getChartData: (chartType: string, params?: {
     start_date?: string
     end_date?: string
     categories?: string
+    granularity?: 'day' | 'week' | 'month' | 'auto'
+    max_points?: number
   }) => api.get('/analytics/chart-data', { 
     params: { 
       chart_type: chartType, 
@@ -140,12 +159,34 @@ export const authAPI = {
 
 // Upload CSV API
 export const uploadAPI = {
-  uploadCsv: (file: File, userId?: number) => {
+  uploadCsv: (file: File) => {
     const form = new FormData()
     form.append('file', file)
-    if (userId !== undefined) form.append('user_id', String(userId))
     return api.post('/upload-csv', form, {
       headers: { 'Content-Type': 'multipart/form-data' },
     })
   },
 }
+
+// Background jobs (CSV imports and Plaid syncs)
+export interface Job {
+  id: number
+  kind: string
+  status: 'queued' | 'running' | 'succeeded' | 'failed'
+  rows_processed: number
+  rows_failed: number
+  rows_per_second: number | null
+  errors: { row: number; error: string }[]
+  error: string | null
+}
+
+export const jobsAPI = {
+  getJob: (jobId: number) => api.get<Job>(`/jobs/${jobId}`),
+  waitForJob: async (jobId: number, intervalMs = 1000): Promise<Job> => {
+    for (;;) {
+      const { data } = await api.get<Job>(`/jobs/${jobId}`)
+      if (data.status === 'succeeded' || data.status === 'failed') return data
+      await new Promise((resolve) => setTimeout(resolve, intervalMs))
+    }
+  },
+}